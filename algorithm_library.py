@@ -0,0 +1,241 @@
+"""
+Named algorithms with their effect on the cube precomputed
+
+The algorithms live in algorithms.json (name, moves, category, description,
+and optionally the expected order, checked when the file is loaded).
+When the library is loaded each one is composed into its net permutation and
+inverse, and its order and the stickers and pieces it moves are worked out,
+so applying an algorithm to a flat state is a single itemgetter call and
+RubiksCube.execute_moves applies it as one cached permutation.
+
+The library answers "which algorithms solve this case": solving() tries every
+algorithm, optionally with a U turn before and after it, and returns the ones
+that leave a stage (the whole cube by default) solved.
+"""
+
+import json
+import os
+from math import lcm
+from operator import itemgetter
+
+from cube import STAGES
+from cube_state import IDENTITY, MOVE_PERMUTATIONS, SOLVED_STATE, apply_moves, invert_permutation, inverse_move
+from topology import PIECE_NAMES, PIECE_OF
+
+DEFAULT_LIBRARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "algorithms.json")
+
+# Turns tried before and after an algorithm when matching a case
+AUF_TURNS = ["", "U", "U'", "U2"]
+
+# Name of the piece every sticker belongs to, e.g. "URF"
+PIECE_OF_STICKER = tuple(PIECE_NAMES[piece] for piece in PIECE_OF)
+
+
+def _order(perm):
+    """Number of times a permutation must be applied to get back to the identity"""
+    order = 1
+    seen = set()
+    for start in range(len(perm)):
+        length = 0
+        index = start
+        while index not in seen:
+            seen.add(index)
+            index = perm[index]
+            length += 1
+        if length:
+            order = lcm(order, length)
+    return order
+
+
+def _stage_solved(state, stage):
+    return all(state[index] == state[index // 9 * 9 + 4] for index in STAGES[stage])
+
+
+class Algorithm:
+    """
+    A named move sequence and its precomputed effect
+    """
+
+    def __init__(self, name, moves, category="", description=""):
+        """
+        Args:
+            name: Unique name, e.g. "sune"
+            moves: Move string or list of moves
+            category: Group such as "trigger", "f2l", "oll" or "pll"
+            description: What the algorithm does
+        """
+        self.name = name
+        self.moves = moves.split() if isinstance(moves, str) else list(moves)
+        unknown = [move for move in self.moves if move not in MOVE_PERMUTATIONS]
+        if unknown:
+            raise ValueError(f"Algorithm {name} has unknown moves: {' '.join(unknown)}")
+        self.category = category
+        self.description = description
+
+        self.permutation = apply_moves(IDENTITY, self.moves)
+        self.inverse_permutation = invert_permutation(self.permutation)
+        self.inverse_moves = [inverse_move(move) for move in reversed(self.moves)]
+        self.order = _order(self.permutation)
+        self.affected_stickers = tuple(index for index in range(54) if self.permutation[index] != index)
+        self.affected_pieces = tuple(sorted({PIECE_OF_STICKER[index] for index in self.affected_stickers}))
+        self._forward = itemgetter(*self.permutation)
+        self._backward = itemgetter(*self.inverse_permutation)
+
+    @property
+    def notation(self):
+        """The moves as a space separated string"""
+        return " ".join(self.moves)
+
+    def __len__(self):
+        return len(self.moves)
+
+    def __repr__(self):
+        return f"Algorithm({self.name!r}, {self.notation!r})"
+
+    def apply(self, state):
+        """Apply the algorithm to a flat state in one step"""
+        return self._forward(state)
+
+    def apply_inverse(self, state):
+        """Undo the algorithm on a flat state in one step"""
+        return self._backward(state)
+
+    def apply_to(self, cube):
+        """Apply the algorithm to a RubiksCube as one operation"""
+        cube.execute_moves(self.notation)
+
+    def preserves(self, stage):
+        """True if the algorithm leaves every sticker of a stage (a key of STAGES) in place"""
+        return all(self.permutation[index] == index for index in STAGES[stage])
+
+    def check(self, expected_order=None):
+        """
+        Check that the algorithm does what its category promises
+
+        Last-layer algorithms ("oll" and "pll") must keep the first two layers
+        in place, and a PLL must also keep the top face solved.
+
+        Args:
+            expected_order: The order the algorithm should have, if known
+
+        Raises:
+            ValueError: If a check fails
+        """
+        if expected_order is not None and self.order != expected_order:
+            raise ValueError(f"Algorithm {self.name} has order {self.order}, expected {expected_order}")
+        if self.category in ("oll", "pll") and not self.preserves("first_two_layers"):
+            raise ValueError(f"Algorithm {self.name} moves pieces of the first two layers")
+        if self.category == "pll" and not _stage_solved(self.apply(SOLVED_STATE), "top_face"):
+            raise ValueError(f"Algorithm {self.name} twists pieces of the top face")
+
+
+class AlgorithmLibrary:
+    """
+    Collection of algorithms looked up by name
+    """
+
+    def __init__(self, algorithms=()):
+        self._algorithms = {}
+        for algorithm in algorithms:
+            self.add(algorithm)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_LIBRARY_PATH):
+        """
+        Load a library from a JSON file of the form {"algorithms": [{"name", "moves", ...}]}
+
+        Raises:
+            ValueError: If an entry has unknown moves or a duplicate name, or
+                fails its checks (see Algorithm.check)
+        """
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        library = cls()
+        for entry in data["algorithms"]:
+            algorithm = Algorithm(entry["name"], entry["moves"], entry.get("category", ""),
+                                  entry.get("description", ""))
+            algorithm.check(entry.get("order"))
+            library.add(algorithm)
+        return library
+
+    def add(self, algorithm):
+        if algorithm.name in self._algorithms:
+            raise ValueError(f"Duplicate algorithm name: {algorithm.name}")
+        self._algorithms[algorithm.name] = algorithm
+
+    def __getitem__(self, name):
+        return self._algorithms[name]
+
+    def __contains__(self, name):
+        return name in self._algorithms
+
+    def __iter__(self):
+        return iter(self._algorithms.values())
+
+    def __len__(self):
+        return len(self._algorithms)
+
+    def names(self, category=None):
+        """Names of all algorithms, or of one category"""
+        return [algorithm.name for algorithm in self
+                if category is None or algorithm.category == category]
+
+    def solving(self, state, stage="solved", categories=None, adjust=True):
+        """
+        Find the algorithms that solve a case
+
+        Args:
+            state: A flat 54-sticker state
+            stage: Key of STAGES that must be solved afterwards, e.g. "top_face"
+                for orientation cases
+            categories: Only try algorithms of these categories
+            adjust: Also try a U turn before and after each algorithm
+
+        Returns:
+            A list of (pre turn, algorithm, post turn) for every match, where
+            the turns are "" when no adjustment is needed
+        """
+        turns = AUF_TURNS if adjust else [""]
+        starts = [(turn, apply_moves(state, turn)) for turn in turns]
+        matches = []
+        for algorithm in self:
+            if categories is not None and algorithm.category not in categories:
+                continue
+            for pre, start in starts:
+                after = algorithm.apply(start)
+                for post in turns:
+                    if _stage_solved(apply_moves(after, post), stage):
+                        matches.append((pre, algorithm, post))
+                        break
+        return matches
+
+
+_default_library = None
+
+
+def load_default_library():
+    """The library from algorithms.json, loaded once and shared by every caller"""
+    global _default_library
+    if _default_library is None:
+        _default_library = AlgorithmLibrary.from_file()
+    return _default_library
+
+
+if __name__ == "__main__":
+    from cube import RubiksCube
+
+    library = load_default_library()
+    print(f"{len(library)} algorithms loaded")
+    for algorithm in library:
+        print(f"{algorithm.name:<18} {algorithm.category:<8} order {algorithm.order:>3}, "
+              f"{len(algorithm.affected_pieces):>2} pieces: {algorithm.notation}")
+
+    # A T-perm case: undo the T-perm on a solved cube and ask what solves it
+    case = library["t_perm"].apply_inverse(SOLVED_STATE)
+    for pre, algorithm, post in library.solving(case, categories=["pll"]):
+        print(f"Case solved by: {' '.join(filter(None, [pre, algorithm.notation, post]))}")
+
+    cube = RubiksCube()
+    for _ in range(library["sexy"].order):
+        library["sexy"].apply_to(cube)
+    print(f"Sexy move applied {library['sexy'].order} times, solved: {cube.is_solved()}")
@@ -0,0 +1,243 @@
+"""
+Asyncio front end for the CPU-bound solvers
+
+AsyncSolver keeps a fixed set of worker processes, each holding one solver
+instance (and its lookup tables) for its whole life. A solve waits for an
+idle worker, so callers are slowed down instead of queueing unbounded work
+(back-pressure). The metrics a worker records for a solve are sent back
+with its result and merged into the parent's REGISTRY. Cancelling a solve,
+e.g. through asyncio.wait_for, terminates the worker that was running it
+and starts a fresh one, so abandoned solves do not keep burning CPU.
+
+    async with AsyncSolver(workers=4) as solver:
+        result = await solver.solve(cube)
+        async for index, result in solver.solve_many(cubes):
+            ...
+"""
+
+import asyncio
+import contextlib
+import io
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from cube_state import cube_from_state, state_from_cube
+from solve_metrics import REGISTRY
+from solver import RubiksSolver
+
+
+def _worker_main(connection, solver_class, solve_options):
+    """Worker process body: solve (state, scramble) tasks until told to stop"""
+    solver = solver_class()
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        state, scramble = task
+        # Only this task's metrics go back to the parent
+        REGISTRY.reset()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = solver.solve(cube_from_state(state), scramble, **solve_options)
+            connection.send((True, result, REGISTRY.snapshot()))
+        except Exception as error:
+            connection.send((False, repr(error), REGISTRY.snapshot()))
+    connection.close()
+
+
+class _Worker:
+    """One worker process and the parent's end of its pipe"""
+
+    def __init__(self, context, solver_class, solve_options):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, solver_class, solve_options),
+                                       daemon=True)
+        self.process.start()
+        child.close()
+
+    def run(self, state, scramble):
+        """Send a task and block until its answer arrives (called on a helper thread)"""
+        self.connection.send((state, scramble))
+        return self.connection.recv()
+
+    def stop(self):
+        """Ask an idle worker to exit"""
+        with contextlib.suppress(OSError):
+            self.connection.send(None)
+        self.process.join(timeout=1)
+        self.kill()
+
+    def kill(self):
+        """Terminate the worker, e.g. in the middle of a cancelled solve"""
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.connection.close()
+
+
+class AsyncSolver:
+    """
+    Runs solves on a managed pool of worker processes without blocking the event loop
+    """
+
+    def __init__(self, workers=None, solver_class=RubiksSolver, solve_options=None):
+        """
+        Args:
+            workers: Number of worker processes (all CPUs by default)
+            solver_class: Solver built once in each worker, e.g. RubiksSolver
+                or BidirectionalSolver
+            solve_options: Keyword arguments for every solve() call,
+                e.g. {"deadline_ms": 2000}
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.solver_class = solver_class
+        self.solve_options = dict(solve_options or {})
+        self._context = multiprocessing.get_context()
+        self._idle = None
+        self._busy = set()
+        self._threads = None
+
+    async def start(self):
+        """Start the worker processes (done automatically on first use)"""
+        if self._idle is not None:
+            return
+        self._idle = asyncio.Queue()
+        self._threads = ThreadPoolExecutor(max_workers=self.workers)
+        for _ in range(self.workers):
+            self._idle.put_nowait(self._spawn())
+
+    def _spawn(self):
+        return _Worker(self._context, self.solver_class, self.solve_options)
+
+    async def solve(self, cube, scramble=""):
+        """
+        Solve one position in a worker process
+
+        Args:
+            cube: A RubiksCube or a flat 54-sticker state (the cube is not changed)
+            scramble: The scramble string, for the tracker
+
+        Returns:
+            The SolveResult computed by the worker
+
+        Raises:
+            RuntimeError: If the solver raised an exception in the worker
+        """
+        await self.start()
+        state = state_from_cube(cube) if hasattr(cube, "to_state") else tuple(cube)
+        # Waiting for an idle worker is the back-pressure
+        worker = await self._idle.get()
+        self._busy.add(worker)
+        loop = asyncio.get_running_loop()
+        try:
+            ok, value, metrics = await loop.run_in_executor(self._threads, worker.run, state, scramble)
+        except BaseException:
+            # Cancelled or broken mid-solve: the worker may still be computing, so replace it
+            self._busy.discard(worker)
+            worker.kill()
+            if self._idle is not None:
+                self._idle.put_nowait(self._spawn())
+            raise
+        self._busy.discard(worker)
+        self._idle.put_nowait(worker)
+        REGISTRY.merge(metrics)
+        if not ok:
+            raise RuntimeError(f"Solver failed in worker: {value}")
+        return value
+
+    async def solve_many(self, cubes, max_in_flight=None):
+        """
+        Solve many positions, yielding results as they finish
+
+        At most max_in_flight solves (twice the worker count by default) are
+        submitted at a time, so a long or endless input is consumed lazily.
+        Leaving the loop early cancels the solves still running.
+
+        Args:
+            cubes: An iterable of RubiksCube objects, flat states or (cube, scramble) pairs
+            max_in_flight: Upper bound on solves submitted but not yet yielded
+
+        Yields:
+            (index in the input, SolveResult) in completion order
+        """
+        limit = max_in_flight or 2 * self.workers
+        items = iter(enumerate(cubes))
+        pending = {}
+        try:
+            while True:
+                while len(pending) < limit:
+                    try:
+                        index, item = next(items)
+                    except StopIteration:
+                        break
+                    cube, scramble = item if isinstance(item, tuple) and len(item) == 2 else (item, "")
+                    pending[asyncio.ensure_future(self.solve(cube, scramble))] = index
+                if not pending:
+                    return
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield pending.pop(task), task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def close(self):
+        """Stop every worker process"""
+        if self._idle is None:
+            return
+        idle, self._idle = self._idle, None
+        while not idle.empty():
+            idle.get_nowait().stop()
+        for worker in list(self._busy):
+            worker.kill()
+        self._busy.clear()
+        self._threads.shutdown(wait=False)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+if __name__ == "__main__":
+    import time
+    from bidirectional_solver import BidirectionalSolver
+    from cube import RubiksCube
+
+    scrambles = ["R U R' U'", "F R U R' U' F'", "R U R' U R U2 R'", "L' U' L U F2", "D R2 B' U"]
+
+    async def demo():
+        async with AsyncSolver(workers=2, solver_class=BidirectionalSolver) as solver:
+            start = time.perf_counter()
+            cubes = []
+            for scramble in scrambles:
+                cube = RubiksCube()
+                cube.execute_moves(scramble)
+                cubes.append((cube, scramble))
+            async for index, result in solver.solve_many(cubes):
+                print(f"{scrambles[index]} -> {' '.join(result.moves)} (verified: {result.verified})")
+            print(f"Batch done in {time.perf_counter() - start:.2f}s")
+            solves = sum(value for name, engine, value in REGISTRY.snapshot()["counters"]
+                         if name == "solves_total")
+            assert solves == len(scrambles)
+            print(f"Solves recorded by the parent: {solves}")
+
+            # A hard scramble with a short timeout: the worker is terminated and replaced
+            cube = RubiksCube()
+            cube.execute_moves("R' F R F' R U2 R' U' R U' R' D2 B L2")
+            try:
+                await asyncio.wait_for(solver.solve(cube), timeout=0.5)
+            except asyncio.TimeoutError:
+                print("Timed out; the worker was stopped")
+            result = await solver.solve(cubes[0][0])
+            print(f"Pool still serving: {' '.join(result.moves)}")
+
+    asyncio.run(demo())
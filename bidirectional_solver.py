@@ -0,0 +1,161 @@
+"""
+Meet-in-the-middle breadth-first solver for short scrambles
+
+Two breadth-first searches run at the same time, one from the scrambled state
+and one backwards from the solved state, until their frontiers meet. States
+are hashed as 54-byte strings so a few hundred thousand of them fit easily in
+memory. Scrambles deeper than the depth cap, or searches that would grow past
+the state budget, fall back to the layer-by-layer RubiksSolver.
+"""
+
+import time
+from operator import itemgetter
+
+from cube_state import FACE_MOVES, MOVE_PERMUTATIONS, SOLVED_STATE, invert_permutation
+from search_solver import SearchSolverMixin
+from solve_tracker import SolveTracker
+
+_FORWARD = [itemgetter(*MOVE_PERMUTATIONS[move]) for move in FACE_MOVES]
+_BACKWARD = [itemgetter(*invert_permutation(MOVE_PERMUTATIONS[move])) for move in FACE_MOVES]
+# Moves on the same face are never chained, e.g. R followed by R2
+_FACE_OF = [index // 3 for index in range(len(FACE_MOVES))]
+_NO_MOVE = -1
+# Nodes expanded between deadline checks
+_DEADLINE_CHECK_INTERVAL = 1024
+
+
+class BidirectionalSolver(SearchSolverMixin):
+    """
+    Optimal solver for shallow positions using bidirectional breadth-first search
+
+    Both searches expand one whole layer at a time, always growing the smaller
+    side. The first state found by both sides gives an optimal solution,
+    because every state closer to either end has already been compared.
+    """
+
+    engine = "bidirectional"
+    step_name = "Bidirectional search"
+
+    def __init__(self, max_depth=10, max_states=1500000, fallback=None, verbose=True):
+        """
+        Args:
+            max_depth: Longest solution to look for before giving up
+            max_states: Upper bound on the number of states held by both searches
+            fallback: Solver used when the search gives up (a RubiksSolver by default)
+            verbose: Print progress messages like the other solvers
+        """
+        self.max_depth = max_depth
+        self.max_states = max_states
+        self.fallback = fallback
+        self.verbose = verbose
+        self.nodes_expanded = 0
+        self.timed_out = False
+        self._deadline = None
+        self.last_engine = None
+        self.tracker = SolveTracker()
+
+    def _search_face_turns(self, state, deadline):
+        """Search for an optimal solution of a state whose centres are home (see SearchSolverMixin.search)"""
+        self.nodes_expanded = 0
+        self.timed_out = False
+        self._deadline = deadline
+        start = bytes(state)
+        goal = bytes(SOLVED_STATE)
+        if start == goal:
+            return []
+
+        # Each side maps a state to the index of the move that produced it
+        forward = {start: _NO_MOVE}
+        backward = {goal: _NO_MOVE}
+        forward_layer = [start]
+        backward_layer = [goal]
+        forward_depth = backward_depth = 0
+
+        while forward_depth + backward_depth < self.max_depth:
+            if len(forward) + len(backward) > self.max_states:
+                return None
+
+            if len(forward_layer) <= len(backward_layer):
+                forward_layer, meeting = self._expand(forward_layer, forward, backward, _FORWARD)
+                forward_depth += 1
+            else:
+                backward_layer, meeting = self._expand(backward_layer, backward, forward, _BACKWARD)
+                backward_depth += 1
+
+            if meeting is not None:
+                return self._forward_path(forward, meeting) + self._backward_path(backward, meeting)
+            if self.timed_out:
+                return None
+            if not forward_layer or not backward_layer:
+                return None
+
+        return None
+
+    def _expand(self, layer, seen, other, getters):
+        """Grow one side by a full layer, stopping at the first state the other side knows"""
+        next_layer = []
+        for state in layer:
+            self.nodes_expanded += 1
+            if (self._deadline is not None and not self.nodes_expanded % _DEADLINE_CHECK_INTERVAL
+                    and time.perf_counter() > self._deadline):
+                self.timed_out = True
+                return next_layer, None
+            last_face = _FACE_OF[seen[state]] if seen[state] != _NO_MOVE else -1
+            for move_index, getter in enumerate(getters):
+                if _FACE_OF[move_index] == last_face:
+                    continue
+                child = bytes(getter(state))
+                if child in seen:
+                    continue
+                seen[child] = move_index
+                if child in other:
+                    return next_layer, child
+                next_layer.append(child)
+        return next_layer, None
+
+    def _forward_path(self, forward, state):
+        """Walk back from a state to the scramble, undoing the recorded moves"""
+        path = []
+        while forward[state] != _NO_MOVE:
+            move_index = forward[state]
+            path.append(FACE_MOVES[move_index])
+            state = bytes(_BACKWARD[move_index](state))
+        path.reverse()
+        return path
+
+    def _backward_path(self, backward, state):
+        """Walk from a state to the solved cube by replaying the recorded moves"""
+        path = []
+        while backward[state] != _NO_MOVE:
+            move_index = backward[state]
+            path.append(FACE_MOVES[move_index])
+            state = bytes(_FORWARD[move_index](state))
+        return path
+
+    def _step_description(self, moves):
+        return "Optimal solution"
+
+    def _give_up_reason(self):
+        return f"No solution within {self.max_depth} moves"
+
+
+if __name__ == "__main__":
+    from cube import RubiksCube
+    import time
+
+    for scramble in ["R U R' U'", "F R U R' U' F'", "R U R' U R U2 R'", "R' F R F' R U2 R' U' R U' R'"]:
+        cube = RubiksCube()
+        cube.execute_moves(scramble)
+        start = time.perf_counter()
+        result = BidirectionalSolver().solve(cube)
+        print(f"{scramble} -> {' '.join(result.moves)} "
+              f"(verified: {result.verified}, {time.perf_counter() - start:.2f}s)")
+
+    # Slice, wide and rotation moves leave the centres off home; the search
+    # turns the cube back first instead of searching face turns forever
+    for scramble in ["M", "x", "Rw"]:
+        cube = RubiksCube()
+        cube.execute_moves(scramble)
+        result = BidirectionalSolver(verbose=False).solve(cube)
+        assert result.verified and result.engine == "bidirectional", scramble
+        print(f"{scramble} -> {' '.join(result.moves)} (verified: {result.verified})")
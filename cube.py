@@ -1,34 +1,265 @@
+from contextlib import contextmanager
+from functools import lru_cache
+from operator import itemgetter
+
+from facelets import state_from_facelets, facelets_from_state
+from topology import CORNERS, EDGES, PIECE_NAMES, PIECE_STICKERS, POSITIONS
+
+# Sequences a cube keeps for undo by default
+DEFAULT_MAX_HISTORY = 1000
+
 class RubiksCube:
-    def __init__(self):
-        self.cube = [[[face for _ in range(3)] for _ in range(3)] for face in range(6)]
+    def __init__(self, lazy=False, max_history=DEFAULT_MAX_HISTORY):
+        """
+        Args:
+            lazy: Buffer moves as one composed permutation and only apply them
+                to the stickers when the full state is read (see execute_moves)
+            max_history: Sequences kept for undo (0 for none, e.g. on search
+                cubes, None for no limit); older ones are dropped in batches,
+                so between max_history and twice as many are kept
+        """
+        self._cube = [[[face for _ in range(3)] for _ in range(3)] for face in range(6)]
+        self._pending = None
+        self.lazy = lazy
+        # Misplaced stickers per stage in STAGES, updated by every move
+        self._misplaced = [0] * len(STAGES)
+        self._counts_valid = True
+        # Piece colours -> (slot, orientation), built on the first lookup and then
+        # kept up to date by every move
+        self._pieces = None
+        # Sticker lists shared with a copy or checkpoint, copied before the next write
+        self._shared = False
+        # Applied sequences as linked (moves, permutation, previous) nodes, so
+        # copies and checkpoints can keep a history without copying it
+        self._history = None
+        self._history_length = 0
+        self.max_history = max_history
+        self._redo = []
+        self._checkpoints = {}
         self.colors = ['W', 'Y', 'R', 'O', 'B', 'G']
+    
+    @property
+    def cube(self):
+        """
+        A read-only copy of the stickers as [face][row][col] tuples, with any
+        buffered moves applied first
         
+        Reading keeps the stage counts and piece index, so is_solved() stays
+        O(1). Write through mutable_cube or assign to this property instead;
+        sticker() and to_state() are cheaper for reads.
+        """
+        if self._pending is not None:
+            self.materialize()
+        return tuple(tuple(tuple(row) for row in face) for face in self._cube)
+    
+    @cube.setter
+    def cube(self, stickers):
+        self._cube = stickers
+        self._pending = None
+        self._counts_valid = False
+        self._pieces = None
+        self._shared = False
+    
+    @property
+    def mutable_cube(self):
+        """
+        The stickers as [face][row][col] lists that callers may write to
+        
+        The stage counts and piece index are rebuilt on their next use, so
+        only take this to change stickers.
+        """
+        if self._pending is not None:
+            self.materialize()
+        self._own_stickers()
+        self._counts_valid = False
+        self._pieces = None
+        return self._cube
+    
     def copy(self):
-        new_cube = RubiksCube()
-        new_cube.cube = [[[self.cube[face][row][col] for col in range(3)] 
-                         for row in range(3)] for face in range(6)]
+        """
+        Copy the cube, including its history and checkpoints
+        
+        The sticker lists are shared until either cube changes, so copying
+        is O(1) and branching search code pays only for the branches it moves.
+        """
+        new_cube = RubiksCube(lazy=self.lazy, max_history=self.max_history)
+        self._shared = True
+        new_cube._cube = self._cube
+        new_cube._shared = True
+        new_cube._pending = self._pending
+        new_cube._misplaced = list(self._misplaced)
+        new_cube._counts_valid = self._counts_valid
+        new_cube._pieces = None if self._pieces is None else dict(self._pieces)
+        new_cube._history = self._history
+        new_cube._history_length = self._history_length
+        new_cube._redo = list(self._redo)
+        new_cube._checkpoints = dict(self._checkpoints)
         return new_cube
     
+    def _own_stickers(self):
+        """Give the cube its own sticker lists before they are written"""
+        if self._shared:
+            self._cube = [[row[:] for row in face] for face in self._cube]
+            self._shared = False
+    
+    def to_state(self):
+        """Get the stickers as a flat tuple of 54 colours, face * 9 + row * 3 + col"""
+        if self._pending is not None:
+            self.materialize()
+        return tuple(cell for face in self._cube for row in face for cell in row)
+    
+    def sticker(self, face, row, col):
+        """
+        Read one sticker without applying buffered moves to the whole cube
+        
+        Args:
+            face: Face index (0-5)
+            row: Row on the face (0-2)
+            col: Column on the face (0-2)
+        """
+        if self._pending is None:
+            return self._cube[face][row][col]
+        return self._read(self._pending[face * 9 + row * 3 + col])
+    
+    def _read(self, index):
+        """Read the materialized sticker at a flat index"""
+        return self._cube[index // 9][index % 9 // 3][index % 3]
+    
+    def materialize(self):
+        """Apply the buffered moves to the stickers"""
+        perm = self._pending
+        if perm is not None:
+            self._pending = None
+            self._apply_permutation(perm)
+    
+    @contextmanager
+    def deferred(self):
+        """
+        Buffer moves for the duration of a block
+        
+        Usage:
+            with cube.deferred():
+                cube.execute_moves("R U R' U'")
+                cube.sticker(2, 0, 1)
+        """
+        previous = self.lazy
+        self.lazy = True
+        try:
+            yield self
+        finally:
+            self.lazy = previous
+            if not previous:
+                self.materialize()
+    
+    @classmethod
+    def from_facelets(cls, facelets):
+        """Build a cube from a 54-character URFDLB facelet string"""
+        state = state_from_facelets(facelets)
+        cube = cls()
+        cube.cube = [[list(state[start:start + 3]) for start in range(face * 9, face * 9 + 9, 3)]
+                     for face in range(6)]
+        return cube
+    
+    def to_facelets(self):
+        """Export the cube as a 54-character URFDLB facelet string"""
+        return facelets_from_state(self.to_state())
+    
     def is_solved(self):
-        for face in self.cube:
-            colors_on_face = {face[i][j] for i in range(3) for j in range(3)}
-            if len(colors_on_face) != 1:
-                return False
-        return True
+        return self.is_stage_solved("solved")
+    
+    def is_stage_solved(self, stage):
+        """
+        Check whether every sticker of a stage matches the centre of its face
+        
+        The counts are kept up to date by each move, so this is O(1) unless
+        moves are buffered, in which case the stage's stickers are read
+        through the pending permutation until the first misplaced one.
+        
+        Args:
+            stage: A key of STAGES, e.g. "cross" or "first_two_layers"
+        """
+        if self._pending is not None:
+            pending = self._pending
+            read = self._read
+            return all(read(pending[index]) == read(pending[index // 9 * 9 + 4])
+                       for index in STAGES[stage])
+        if not self._counts_valid:
+            self._recount()
+        return self._misplaced[_STAGE_INDEX[stage]] == 0
+    
+    def _recount(self):
+        """Count the misplaced stickers of every stage from scratch"""
+        state = [cell for face in self._cube for row in face for cell in row]
+        self._misplaced = [sum(state[index] != state[index // 9 * 9 + 4] for index in stickers)
+                           for stickers in STAGES.values()]
+        self._counts_valid = True
+    
+    def locate_piece(self, *colours):
+        """
+        Find a corner or edge piece by its colours
+        
+        The piece index is built on the first lookup and every move then only
+        rereads the slots it touched, so lookups are O(1).
+        
+        Args:
+            colours: The two or three colours of the piece, in any order,
+                e.g. locate_piece(0, 2) for the white-red edge
+        
+        Returns:
+            (slot, orientation): the slot name from PIECE_SLOTS, e.g. "DF", and
+            which of the slot's stickers shows the piece's U/D colour (its F/B
+            colour for middle-layer edges), 0 meaning the reference sticker
+        
+        Raises:
+            KeyError: If no piece has these colours
+        """
+        if self._pending is not None:
+            self.materialize()
+        if self._pieces is None:
+            self._build_pieces()
+        return self._pieces[frozenset(colours)]
+    
+    def piece_stickers(self, *colours):
+        """
+        Positions of a piece's stickers, e.g. piece_stickers(0, 2) gives where
+        the white and the red sticker of the white-red edge are
+        
+        Returns:
+            A list of (face, row, col), one per colour in the order given
+        """
+        slot, _ = self.locate_piece(*colours)
+        positions = {self._read(index): POSITIONS[index] for index in PIECE_SLOTS[slot]}
+        return [positions[colour] for colour in colours]
+    
+    def _build_pieces(self):
+        """Index every piece from scratch"""
+        self._pieces = {}
+        for slot, stickers in PIECE_SLOTS.items():
+            self._index_piece(slot, [self._read(index) for index in stickers])
+    
+    def _index_piece(self, slot, colours):
+        reference = min(colours, key=lambda colour: _FACE_RANK[colour])
+        self._pieces[frozenset(colours)] = (slot, colours.index(reference))
+    
+    def _update_pieces(self, perm, flat):
+        """Reindex the pieces in the slots a permutation moved, given the stickers before it"""
+        for slot, stickers in _moved_slots(perm):
+            self._index_piece(slot, [flat[perm[index]] for index in stickers])
     
     def display(self):
         print("Cube state:")
         face_names = ['White (Bottom)', 'Yellow (Top)', 'Red (Front)', 
                      'Orange (Back)', 'Blue (Right)', 'Green (Left)']
         
-        for face_idx, face in enumerate(self.cube):
+        state = self.to_state()
+        for face_idx in range(6):
             print(f"\n{face_names[face_idx]}:")
-            for row in face:
-                print(' '.join(self.colors[cell] for cell in row))
+            for row in range(3):
+                print(' '.join(self.colors[state[face_idx * 9 + row * 3 + col]] for col in range(3)))
     
     def _rotate_face_clockwise(self, face_idx):
-        face = self.cube[face_idx]
-        self.cube[face_idx] = [[face[2-j][i] for j in range(3)] for i in range(3)]
+        face = self.mutable_cube[face_idx]
+        self.mutable_cube[face_idx] = [[face[2-j][i] for j in range(3)] for i in range(3)]
     
     def _rotate_face_counterclockwise(self, face_idx):
         for _ in range(3):
@@ -36,15 +267,15 @@ class RubiksCube:
     
     def U(self):
         self._rotate_face_clockwise(1)
-        temp = [self.cube[2][0][i] for i in range(3)]
+        temp = [self.mutable_cube[2][0][i] for i in range(3)]
         for i in range(3):
-            self.cube[2][0][i] = self.cube[5][0][i]
+            self.mutable_cube[2][0][i] = self.mutable_cube[4][0][i]
         for i in range(3):
-            self.cube[5][0][i] = self.cube[3][0][i]
+            self.mutable_cube[4][0][i] = self.mutable_cube[3][0][i]
         for i in range(3):
-            self.cube[3][0][i] = self.cube[4][0][i]
+            self.mutable_cube[3][0][i] = self.mutable_cube[5][0][i]
         for i in range(3):
-            self.cube[4][0][i] = temp[i]
+            self.mutable_cube[5][0][i] = temp[i]
     
     def U_prime(self):
         for _ in range(3):
@@ -56,15 +287,15 @@ class RubiksCube:
     
     def D(self):
         self._rotate_face_clockwise(0)
-        temp = [self.cube[2][2][i] for i in range(3)]
+        temp = [self.mutable_cube[2][2][i] for i in range(3)]
         for i in range(3):
-            self.cube[2][2][i] = self.cube[4][2][i]
+            self.mutable_cube[2][2][i] = self.mutable_cube[5][2][i]
         for i in range(3):
-            self.cube[4][2][i] = self.cube[3][2][i]
+            self.mutable_cube[5][2][i] = self.mutable_cube[3][2][i]
         for i in range(3):
-            self.cube[3][2][i] = self.cube[5][2][i]
+            self.mutable_cube[3][2][i] = self.mutable_cube[4][2][i]
         for i in range(3):
-            self.cube[5][2][i] = temp[i]
+            self.mutable_cube[4][2][i] = temp[i]
     
     def D_prime(self):
         for _ in range(3):
@@ -76,15 +307,15 @@ class RubiksCube:
     
     def R(self):
         self._rotate_face_clockwise(4)
-        temp = [self.cube[2][i][2] for i in range(3)]
+        temp = [self.mutable_cube[2][i][2] for i in range(3)]
         for i in range(3):
-            self.cube[2][i][2] = self.cube[0][i][2]
+            self.mutable_cube[2][i][2] = self.mutable_cube[0][i][2]
         for i in range(3):
-            self.cube[0][i][2] = self.cube[3][2-i][0]
+            self.mutable_cube[0][i][2] = self.mutable_cube[3][2-i][0]
         for i in range(3):
-            self.cube[3][2-i][0] = self.cube[1][i][2]
+            self.mutable_cube[3][2-i][0] = self.mutable_cube[1][i][2]
         for i in range(3):
-            self.cube[1][i][2] = temp[i]
+            self.mutable_cube[1][i][2] = temp[i]
     
     def R_prime(self):
         for _ in range(3):
@@ -96,15 +327,15 @@ class RubiksCube:
     
     def L(self):
         self._rotate_face_clockwise(5)
-        temp = [self.cube[2][i][0] for i in range(3)]
+        temp = [self.mutable_cube[2][i][0] for i in range(3)]
         for i in range(3):
-            self.cube[2][i][0] = self.cube[1][i][0]
+            self.mutable_cube[2][i][0] = self.mutable_cube[1][i][0]
         for i in range(3):
-            self.cube[1][i][0] = self.cube[3][2-i][2]
+            self.mutable_cube[1][i][0] = self.mutable_cube[3][2-i][2]
         for i in range(3):
-            self.cube[3][2-i][2] = self.cube[0][i][0]
+            self.mutable_cube[3][2-i][2] = self.mutable_cube[0][i][0]
         for i in range(3):
-            self.cube[0][i][0] = temp[i]
+            self.mutable_cube[0][i][0] = temp[i]
     
     def L_prime(self):
         for _ in range(3):
@@ -116,15 +347,15 @@ class RubiksCube:
     
     def F(self):
         self._rotate_face_clockwise(2)
-        temp = [self.cube[1][2][i] for i in range(3)]
+        temp = [self.mutable_cube[1][2][i] for i in range(3)]
         for i in range(3):
-            self.cube[1][2][i] = self.cube[5][2-i][2]
+            self.mutable_cube[1][2][i] = self.mutable_cube[5][2-i][2]
         for i in range(3):
-            self.cube[5][2-i][2] = self.cube[0][0][2-i]
+            self.mutable_cube[5][2-i][2] = self.mutable_cube[0][0][2-i]
         for i in range(3):
-            self.cube[0][0][i] = self.cube[4][i][0]
+            self.mutable_cube[0][0][2-i] = self.mutable_cube[4][i][0]
         for i in range(3):
-            self.cube[4][i][0] = temp[i]
+            self.mutable_cube[4][i][0] = temp[i]
     
     def F_prime(self):
         for _ in range(3):
@@ -136,15 +367,15 @@ class RubiksCube:
     
     def B(self):
         self._rotate_face_clockwise(3)
-        temp = [self.cube[1][0][i] for i in range(3)]
+        temp = [self.mutable_cube[1][0][i] for i in range(3)]
         for i in range(3):
-            self.cube[1][0][i] = self.cube[4][i][2]
+            self.mutable_cube[1][0][i] = self.mutable_cube[4][i][2]
         for i in range(3):
-            self.cube[4][i][2] = self.cube[0][2][2-i]
+            self.mutable_cube[4][i][2] = self.mutable_cube[0][2][2-i]
         for i in range(3):
-            self.cube[0][2][i] = self.cube[5][2-i][0]
+            self.mutable_cube[0][2][i] = self.mutable_cube[5][i][0]
         for i in range(3):
-            self.cube[5][2-i][0] = temp[i]
+            self.mutable_cube[5][2-i][0] = temp[i]
     
     def B_prime(self):
         for _ in range(3):
@@ -154,50 +385,396 @@ class RubiksCube:
         self.B()
         self.B()
     
-    def execute_moves(self, moves_string):
-        moves = moves_string.strip().split()
-        for move in moves:
-            if move == "U":
-                self.U()
-            elif move == "U'":
-                self.U_prime()
-            elif move == "U2":
-                self.U2()
-            elif move == "D":
-                self.D()
-            elif move == "D'":
-                self.D_prime()
-            elif move == "D2":
-                self.D2()
-            elif move == "R":
-                self.R()
-            elif move == "R'":
-                self.R_prime()
-            elif move == "R2":
-                self.R2()
-            elif move == "L":
-                self.L()
-            elif move == "L'":
-                self.L_prime()
-            elif move == "L2":
-                self.L2()
-            elif move == "F":
-                self.F()
-            elif move == "F'":
-                self.F_prime()
-            elif move == "F2":
-                self.F2()
-            elif move == "B":
-                self.B()
-            elif move == "B'":
-                self.B_prime()
-            elif move == "B2":
-                self.B2()
-            elif move in ["SOLVE", "WHITE_CROSS", "FIRST_LAYER", "SECOND_LAYER", "TOP_CROSS", "OLL", "PLL"]:
+    def M(self):
+        # Middle layer between L and R, turning in the same direction as L
+        temp = [self.mutable_cube[2][i][1] for i in range(3)]
+        for i in range(3):
+            self.mutable_cube[2][i][1] = self.mutable_cube[1][i][1]
+        for i in range(3):
+            self.mutable_cube[1][i][1] = self.mutable_cube[3][2-i][1]
+        for i in range(3):
+            self.mutable_cube[3][2-i][1] = self.mutable_cube[0][i][1]
+        for i in range(3):
+            self.mutable_cube[0][i][1] = temp[i]
+    
+    def M_prime(self):
+        for _ in range(3):
+            self.M()
+    
+    def M2(self):
+        self.M()
+        self.M()
+    
+    def E(self):
+        # Middle layer between U and D, turning in the same direction as D
+        temp = [self.mutable_cube[2][1][i] for i in range(3)]
+        for i in range(3):
+            self.mutable_cube[2][1][i] = self.mutable_cube[5][1][i]
+        for i in range(3):
+            self.mutable_cube[5][1][i] = self.mutable_cube[3][1][i]
+        for i in range(3):
+            self.mutable_cube[3][1][i] = self.mutable_cube[4][1][i]
+        for i in range(3):
+            self.mutable_cube[4][1][i] = temp[i]
+    
+    def E_prime(self):
+        for _ in range(3):
+            self.E()
+    
+    def E2(self):
+        self.E()
+        self.E()
+    
+    def S(self):
+        # Middle layer between F and B, turning in the same direction as F
+        temp = [self.mutable_cube[1][1][i] for i in range(3)]
+        for i in range(3):
+            self.mutable_cube[1][1][i] = self.mutable_cube[5][2-i][1]
+        for i in range(3):
+            self.mutable_cube[5][2-i][1] = self.mutable_cube[0][1][2-i]
+        for i in range(3):
+            self.mutable_cube[0][1][2-i] = self.mutable_cube[4][i][1]
+        for i in range(3):
+            self.mutable_cube[4][i][1] = temp[i]
+    
+    def S_prime(self):
+        for _ in range(3):
+            self.S()
+    
+    def S2(self):
+        self.S()
+        self.S()
+    
+    def x(self):
+        # Whole cube rotation following R
+        self.R()
+        self.M_prime()
+        self.L_prime()
+    
+    def x_prime(self):
+        for _ in range(3):
+            self.x()
+    
+    def x2(self):
+        self.x()
+        self.x()
+    
+    def y(self):
+        # Whole cube rotation following U
+        self.U()
+        self.E_prime()
+        self.D_prime()
+    
+    def y_prime(self):
+        for _ in range(3):
+            self.y()
+    
+    def y2(self):
+        self.y()
+        self.y()
+    
+    def z(self):
+        # Whole cube rotation following F
+        self.F()
+        self.S()
+        self.B_prime()
+    
+    def z_prime(self):
+        for _ in range(3):
+            self.z()
+    
+    def z2(self):
+        self.z()
+        self.z()
+    
+    def execute_moves_reference(self, moves_string):
+        """Apply moves one at a time through the move methods above (slow, used to check the fast path)"""
+        for move in moves_string.strip().split():
+            if move in REFERENCE_MOVES:
+                for method in REFERENCE_MOVES[move]:
+                    getattr(self, method)()
+            elif move in SPECIAL_MOVES:
                 # Special cases for visualization - just ignore as they're handled separately
                 pass
             else:
                 print(f"Unknown move: {move}")
+    
+    def execute_moves(self, moves_string):
+        """
+        Apply a space separated move sequence
+        
+        The whole sequence is composed into one precomputed permutation
+        (cached per sequence) and applied to the stickers in a single pass.
+        A lazy cube only composes it with the moves already buffered;
+        the stickers are updated when the full state is next read.
+        """
+        perm, unknown = _sequence_permutation(moves_string)
+        for move in unknown:
+            print(f"Unknown move: {move}")
+        if perm is None:
+            return
+        
+        self._push_history(moves_string, perm)
+        self._redo = []
+        self._apply(perm)
+    
+    def _push_history(self, moves_string, perm):
+        """Record an applied sequence, dropping the oldest ones past twice max_history"""
+        if self.max_history == 0:
+            return
+        self._history = (moves_string, perm, self._history)
+        self._history_length += 1
+        if self.max_history is not None and self._history_length > 2 * self.max_history:
+            # Rebuild the newest nodes only; copies and checkpoints keep their own chains
+            kept = []
+            node = self._history
+            for _ in range(self.max_history):
+                kept.append(node[:2])
+                node = node[2]
+            history = None
+            for moves, kept_perm in reversed(kept):
+                history = (moves, kept_perm, history)
+            self._history = history
+            self._history_length = self.max_history
+    
+    def _apply(self, perm):
+        """Apply a permutation now, or buffer it on a lazy cube"""
+        if self._pending is not None:
+            perm = tuple(self._pending[index] for index in perm)
+        if self.lazy:
+            self._pending = perm
+        else:
+            self._pending = None
+            self._apply_permutation(perm)
+    
+    @property
+    def history(self):
+        """The move sequences passed to execute_moves that are still applied, oldest first"""
+        moves = []
+        node = self._history
+        while node is not None:
+            moves.append(node[0])
+            node = node[2]
+        moves.reverse()
+        return moves
+    
+    def can_undo(self):
+        return self._history is not None
+    
+    def can_redo(self):
+        return bool(self._redo)
+    
+    def undo(self):
+        """
+        Take back the last sequence passed to execute_moves
+        
+        Returns:
+            The move string that was undone, or None if there is nothing to undo
+        """
+        node = self._history
+        if node is None:
+            return None
+        self._history = node[2]
+        self._history_length -= 1
+        self._redo.append(node)
+        self._apply(_inverse_permutation(node[1]))
+        return node[0]
+    
+    def redo(self):
+        """
+        Apply the last undone sequence again
+        
+        Returns:
+            The move string that was redone, or None if there is nothing to redo
+        """
+        if not self._redo:
+            return None
+        moves, perm, _ = self._redo.pop()
+        self._push_history(moves, perm)
+        self._apply(perm)
+        return moves
+    
+    def clear_history(self):
+        """Forget the history and redo stack (checkpoints are kept)"""
+        self._history = None
+        self._history_length = 0
+        self._redo = []
+    
+    def checkpoint(self, name):
+        """
+        Remember the current state and history under a name
+        
+        The stickers are shared with the checkpoint until the cube next
+        changes, so taking a checkpoint is O(1).
+        """
+        self._shared = True
+        self._checkpoints[name] = (self._cube, self._pending, list(self._misplaced),
+                                   self._counts_valid, self._history, self._history_length)
+    
+    def restore(self, name):
+        """
+        Return to a checkpoint, with the history it had when it was taken
+        
+        Raises:
+            KeyError: If there is no checkpoint with that name
+        """
+        stickers, pending, misplaced, counts_valid, history, history_length = self._checkpoints[name]
+        self._cube = stickers
+        self._shared = True
+        self._pending = pending
+        self._misplaced = list(misplaced)
+        self._counts_valid = counts_valid
+        self._pieces = None
+        self._history = history
+        self._history_length = history_length
+        self._redo = []
+    
+    def checkpoints(self):
+        """Names of the checkpoints taken so far"""
+        return list(self._checkpoints)
+    
+    def _apply_permutation(self, perm):
+        """Move every sticker in place, new[i] = old[perm[i]] over the flat state"""
+        self._own_stickers()
+        rows = [row for face in self._cube for row in face]
+        flat = [cell for row in rows for cell in row]
+        for index, row in enumerate(rows):
+            start = index * 3
+            row[0] = flat[perm[start]]
+            row[1] = flat[perm[start + 1]]
+            row[2] = flat[perm[start + 2]]
+        
+        if self._pieces is not None:
+            self._update_pieces(perm, flat)
+        if not self._counts_valid:
+            return
+        moved = _moved_stickers(perm)
+        if moved is None:
+            self._recount()
+            return
+        # Centres stayed put, so only the moved stickers can change a count
+        misplaced = self._misplaced
+        for index in moved:
+            centre = flat[index // 9 * 9 + 4]
+            change = (flat[perm[index]] != centre) - (flat[index] != centre)
+            if change:
+                for stage in _STAGES_OF[index]:
+                    misplaced[stage] += change
+
+
+# Sticker groups whose solved state is tracked incrementally, by flat index.
+# D (face 0) is the first layer and U (face 1) the last; on the side faces
+# row 2 touches D.
+_SIDE_FACES = (2, 3, 4, 5)
+STAGES = {
+    "cross": (1, 3, 4, 5, 7) + tuple(face * 9 + 7 for face in _SIDE_FACES),
+    "first_layer": tuple(range(9)) + tuple(face * 9 + offset for face in _SIDE_FACES for offset in (6, 7, 8)),
+    "first_two_layers": tuple(range(9)) + tuple(face * 9 + offset for face in _SIDE_FACES for offset in range(3, 9)),
+    "top_cross": (10, 12, 13, 14, 16),
+    "top_face": tuple(range(9, 18)),
+    "solved": tuple(range(54)),
+}
+_STAGE_INDEX = {name: stage for stage, name in enumerate(STAGES)}
+_STAGES_OF = [tuple(stage for stage, stickers in enumerate(STAGES.values()) if index in stickers)
+              for index in range(54)]
+
+# Method calls behind every supported move, in the reference implementation
+REFERENCE_MOVES = {}
+for _face in "UDRLFBMESxyz":
+    REFERENCE_MOVES[_face] = (_face,)
+    REFERENCE_MOVES[_face + "'"] = (_face + "_prime",)
+    REFERENCE_MOVES[_face + "2"] = (_face + "2",)
+# Wide moves turn a face together with the neighbouring middle layer
+for _face, _slice, _slice_prime in (("R", "M_prime", "M"), ("L", "M", "M_prime"),
+                                   ("U", "E_prime", "E"), ("D", "E", "E_prime"),
+                                   ("F", "S", "S_prime"), ("B", "S_prime", "S")):
+    for _name in (_face + "w", _face.lower()):
+        REFERENCE_MOVES[_name] = (_face, _slice)
+        REFERENCE_MOVES[_name + "'"] = (_face + "_prime", _slice_prime)
+        REFERENCE_MOVES[_name + "2"] = (_face + "2", _slice[0] + "2")
+
+SPECIAL_MOVES = {"SOLVE", "WHITE_CROSS", "FIRST_LAYER", "SECOND_LAYER", "TOP_CROSS", "OLL", "PLL"}
+
+
+def _derive_permutation(move):
+    """Label every sticker with its index, apply a reference move and read where each one ended up"""
+    cube = RubiksCube()
+    cube.cube = [[[face * 9 + row * 3 + col for col in range(3)]
+                  for row in range(3)] for face in range(6)]
+    cube.execute_moves_reference(move)
+    return cube.to_state()
+
+
+def _compose_methods(methods, quarter_turns):
+    """Permutation of a sequence of move methods, built from the quarter-turn permutations"""
+    perm = None
+    for method in methods:
+        face = method[0]
+        turn = quarter_turns[face]
+        # Powers of the quarter turn: X2 = X X and X' = X X X
+        for _ in range({"2": 2, "_prime": 3}.get(method[1:], 1)):
+            perm = turn if perm is None else tuple(perm[index] for index in turn)
+    return perm
+
+
+# Only the twelve quarter turns run through the reference methods; every other
+# move is composed from them, which keeps importing the module cheap
+_QUARTER_TURNS = {face: _derive_permutation(face) for face in "UDRLFBMESxyz"}
+
+# new_state[i] = state[perm[i]] for the flattened cube, face * 9 + row * 3 + col
+MOVE_PERMUTATIONS = {move: _compose_methods(methods, _QUARTER_TURNS)
+                     for move, methods in REFERENCE_MOVES.items()}
+
+# Functions applying one move to a flat state or permutation; move_codegen
+# can swap in generated straight-line versions
+_MOVE_STEPS = {move: itemgetter(*perm) for move, perm in MOVE_PERMUTATIONS.items()}
+
+# Rank of each face (D U F B R L) when choosing a piece's reference sticker:
+# its U/D sticker, or its F/B sticker for middle-layer edges
+_FACE_RANK = (0, 0, 1, 1, 2, 2)
+
+# Slot name -> flat sticker indices, reference sticker first and corners clockwise
+PIECE_SLOTS = {PIECE_NAMES[piece]: PIECE_STICKERS[piece] for piece in CORNERS + EDGES}
+
+
+@lru_cache(maxsize=4096)
+def _moved_slots(perm):
+    """Slots with at least one sticker moved by a permutation"""
+    return tuple((name, stickers) for name, stickers in PIECE_SLOTS.items()
+                 if any(perm[index] != index for index in stickers))
+
+
+@lru_cache(maxsize=4096)
+def _sequence_permutation(moves_string):
+    """Compose a move sequence into one permutation, collecting unknown moves"""
+    perm = None
+    unknown = []
+    for move in moves_string.split():
+        step = _MOVE_STEPS.get(move)
+        if step is None:
+            if move not in SPECIAL_MOVES:
+                unknown.append(move)
+            continue
+        perm = MOVE_PERMUTATIONS[move] if perm is None else step(perm)
+    return perm, tuple(unknown)
+
+
+@lru_cache(maxsize=4096)
+def _inverse_permutation(perm):
+    """Permutation that undoes perm"""
+    inverse = [0] * len(perm)
+    for index, source in enumerate(perm):
+        inverse[source] = index
+    return tuple(inverse)
+
+
+@lru_cache(maxsize=4096)
+def _moved_stickers(perm):
+    """Indices a permutation moves, or None if it moves a centre (slices and rotations)"""
+    if any(perm[centre] != centre for centre in range(4, 54, 9)):
+        return None
+    return tuple(index for index in range(54) if perm[index] != index)
+
 
 if __name__ == "__main__":
     cube = RubiksCube()
@@ -220,3 +797,12 @@ if __name__ == "__main__":
     cube.execute_moves("R U' R' F R U R' F'")
     cube.display()
     print(f"Is solved: {cube.is_solved()}")
+    
+    print(f"\nUndo brings the scramble back: {cube.undo()}")
+    print(f"Is solved: {cube.is_solved()}")
+    print(f"Redo solves it again: {cube.redo()}")
+    print(f"Is solved: {cube.is_solved()}")
+    
+    cube.execute_moves("R U")
+    print(f"\nAfter R U the white-red edge is in {cube.locate_piece(0, 2)} and its stickers are at "
+          f"{cube.piece_stickers(0, 2)}")
@@ -0,0 +1,235 @@
+"""
+Compact binary encoding of cube states, solutions and datasets
+
+States are packed at 3 bits per sticker (21 bytes instead of 54 list cells),
+and solutions at one byte per move. Datasets are files with a fixed header
+and fixed-size records, so they can be written in large sequential chunks
+and memory-mapped for random access without parsing:
+
+    header   magic "RCDS", version, state size, solution capacity,
+             record size, record count
+    record   packed state | solution length (1 byte) | solution bytes,
+             padded to the solution capacity
+"""
+
+import mmap
+import struct
+
+from cube_state import (ALL_MOVES, FACE_MOVES, PACKED_STATE_SIZE, cube_from_state, pack_state,
+                        state_from_cube, unpack_state)
+
+MAGIC = b"RCDS"
+VERSION = 1
+# magic, version, state size, solution capacity, record size, record count
+HEADER = struct.Struct("<4sHHHHQ")
+
+# Face turns keep codes 0-17; slice, wide and rotation moves follow
+MOVE_CODES = {move: code for code, move in enumerate(ALL_MOVES)}
+
+
+def encode_state(state):
+    """Pack a flat 54-sticker state into 21 bytes"""
+    return pack_state(state)
+
+
+def decode_state(data):
+    """Unpack 21 bytes into a flat state tuple"""
+    return unpack_state(data)
+
+
+def encode_cube(cube):
+    """Pack a RubiksCube into 21 bytes"""
+    return pack_state(state_from_cube(cube))
+
+
+def decode_cube(data):
+    """Build a RubiksCube from 21 packed bytes"""
+    return cube_from_state(unpack_state(data))
+
+
+def encode_solution(moves):
+    """
+    Pack a move sequence at one byte per move
+
+    Args:
+        moves: A list of moves or a space separated move string
+
+    Returns:
+        bytes with one move code per move
+    """
+    if isinstance(moves, str):
+        moves = moves.split()
+    try:
+        return bytes(MOVE_CODES[move] for move in moves)
+    except KeyError as error:
+        raise ValueError(f"Cannot encode move {error.args[0]}") from None
+
+
+def decode_solution(data):
+    """Unpack move codes into a list of moves"""
+    return [ALL_MOVES[code] for code in data]
+
+
+class DatasetWriter:
+    """
+    Writes a dataset file of fixed-size state records
+
+    Usage:
+        with DatasetWriter("states.rcds", solution_capacity=20) as writer:
+            writer.write(state, moves)
+    """
+
+    def __init__(self, path, solution_capacity=0, buffer_records=65536):
+        """
+        Args:
+            path: Output file, overwritten if it exists
+            solution_capacity: Maximum number of moves stored per record (0 for states only)
+            buffer_records: Number of records collected before each write
+        """
+        self.path = path
+        self.solution_capacity = solution_capacity
+        self.record_size = PACKED_STATE_SIZE + (1 + solution_capacity if solution_capacity else 0)
+        self.count = 0
+        self._buffer = []
+        self._buffer_records = buffer_records
+        self._file = open(path, "wb")
+        self._write_header()
+
+    def _write_header(self):
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, PACKED_STATE_SIZE,
+                                     self.solution_capacity, self.record_size, self.count))
+
+    def encode_record(self, state, moves=None):
+        """Build the bytes of one record"""
+        record = pack_state(state)
+        if self.solution_capacity:
+            solution = encode_solution(moves or [])
+            if len(solution) > self.solution_capacity:
+                raise ValueError(f"Solution of {len(solution)} moves exceeds capacity {self.solution_capacity}")
+            record += bytes((len(solution),)) + solution.ljust(self.solution_capacity, b"\0")
+        return record
+
+    def write(self, state, moves=None):
+        """Append one state (and its solution when the file stores them)"""
+        self.write_record(self.encode_record(state, moves))
+
+    def write_record(self, record):
+        """Append a record built with encode_record"""
+        self._buffer.append(record)
+        self.count += 1
+        if len(self._buffer) >= self._buffer_records:
+            self.flush()
+
+    def flush(self):
+        """Write buffered records to disk"""
+        if self._buffer:
+            self._file.write(b"".join(self._buffer))
+            self._buffer = []
+
+    def close(self):
+        """Flush remaining records and record the final count in the header"""
+        if self._file.closed:
+            return
+        self.flush()
+        self._write_header()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class DatasetReader:
+    """
+    Memory-mapped, random-access view of a dataset file
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: A file written by DatasetWriter
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, state_size, self.solution_capacity,
+         self.record_size, self.count) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or state_size != PACKED_STATE_SIZE:
+            self.close()
+            raise ValueError(f"{path} is not a cube dataset")
+
+    @property
+    def records(self):
+        """
+        All records as one memoryview, e.g. for numpy.frombuffer(...).reshape(-1, record_size)
+        """
+        start = HEADER.size
+        return memoryview(self._map)[start:start + self.count * self.record_size]
+
+    def __len__(self):
+        return self.count
+
+    def raw(self, index):
+        """Get the bytes of one record"""
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        offset = HEADER.size + index * self.record_size
+        return self._map[offset:offset + self.record_size]
+
+    def decode_record(self, record):
+        """Split a record into (state, moves); moves is None for state-only files"""
+        state = unpack_state(record[:PACKED_STATE_SIZE])
+        if not self.solution_capacity:
+            return state, None
+        length = record[PACKED_STATE_SIZE]
+        start = PACKED_STATE_SIZE + 1
+        return state, decode_solution(record[start:start + length])
+
+    def __getitem__(self, index):
+        return self.decode_record(self.raw(index))
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.decode_record(self.raw(index))
+
+    def close(self):
+        """Release the memory map and the file"""
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+if __name__ == "__main__":
+    import os
+    import random
+    import tempfile
+    import time
+    from cube_state import SOLVED_STATE, apply_moves
+    from utils import reverse_moves
+
+    samples = []
+    for _ in range(10000):
+        scramble = [random.choice(FACE_MOVES) for _ in range(12)]
+        samples.append((apply_moves(SOLVED_STATE, scramble), reverse_moves(" ".join(scramble)).split()))
+
+    path = os.path.join(tempfile.gettempdir(), "cube_codec_demo.rcds")
+    start = time.perf_counter()
+    with DatasetWriter(path, solution_capacity=20) as writer:
+        for state, solution in samples:
+            writer.write(state, solution)
+    print(f"Wrote {len(samples)} records of {writer.record_size} bytes in {time.perf_counter() - start:.2f}s")
+
+    with DatasetReader(path) as reader:
+        start = time.perf_counter()
+        decoded = list(reader)
+        print(f"Read {len(reader)} records in {time.perf_counter() - start:.2f}s")
+        print(f"Round trip intact: {decoded == samples}")
+    os.remove(path)
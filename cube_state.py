@@ -0,0 +1,189 @@
+"""
+Flat sticker states and precomputed move permutations for the Rubik's Cube
+
+A state is a sequence of 54 colour values indexed as face * 9 + row * 3 + col,
+the same layout as RubiksCube.cube[face][row][col] flattened. Every move is a
+permutation tuple where new_state[i] = state[perm[i]]. The permutations are
+derived once from the reference moves in cube.py, so both paths always agree.
+Besides the 18 face turns, slice (M E S), wide (Rw or r) and whole-cube
+rotation (x y z) moves are available through the same tables.
+"""
+
+from operator import itemgetter
+
+from cube import RubiksCube, MOVE_PERMUTATIONS
+
+# The 18 face turns in the order used throughout the solver
+FACE_MOVES = ["U", "U'", "U2", "D", "D'", "D2",
+              "R", "R'", "R2", "L", "L'", "L2",
+              "F", "F'", "F2", "B", "B'", "B2"]
+
+# Every move the tables support, face turns first
+ALL_MOVES = list(MOVE_PERMUTATIONS)
+
+SOLVED_STATE = tuple(index // 9 for index in range(54))
+IDENTITY = tuple(range(54))
+PACKED_STATE_SIZE = 21  # 54 stickers at 3 bits each
+
+_MOVE_GETTERS = {move: itemgetter(*perm) for move, perm in MOVE_PERMUTATIONS.items()}
+
+
+def inverse_move(move):
+    """Return the move that undoes the given move"""
+    if move.endswith("'"):
+        return move[:-1]
+    if move.endswith("2"):
+        return move
+    return move + "'"
+
+
+def simplify_moves(moves):
+    """
+    Merge consecutive turns of the same face, e.g. R R becomes R2 and R R' disappears
+
+    Moves other than the 18 face turns are kept as they are.
+
+    Args:
+        moves: A list of moves or a space separated move string
+
+    Returns:
+        The simplified list of moves
+    """
+    if isinstance(moves, str):
+        moves = moves.split()
+    quarter_turns = {"": 1, "2": 2, "'": 3}
+    suffixes = {1: "", 2: "2", 3: "'"}
+    result = []
+    for move in moves:
+        if move not in FACE_MOVES:
+            result.append(move)
+            continue
+        face, turns = move[0], quarter_turns[move[1:]]
+        if result and result[-1] in FACE_MOVES and result[-1][0] == face:
+            turns = (turns + quarter_turns[result.pop()[1:]]) % 4
+            if not turns:
+                continue
+        result.append(face + suffixes[turns])
+    return result
+
+
+def invert_permutation(perm):
+    """Return the permutation that undoes perm"""
+    inverse = [0] * len(perm)
+    for index, source in enumerate(perm):
+        inverse[source] = index
+    return tuple(inverse)
+
+
+def compose(first, second):
+    """Return the permutation equivalent to applying first and then second"""
+    return tuple(first[index] for index in second)
+
+
+def apply_permutation(state, perm):
+    """Apply an arbitrary permutation to a state"""
+    return tuple(state[index] for index in perm)
+
+
+def apply_move(state, move):
+    """Apply a single move to a state and return the new state as a tuple"""
+    return _MOVE_GETTERS[move](state)
+
+
+def apply_moves(state, moves):
+    """Apply a move sequence (string or list) to a state"""
+    if isinstance(moves, str):
+        moves = moves.split()
+    for move in moves:
+        state = _MOVE_GETTERS[move](state)
+    return tuple(state)
+
+
+def state_from_cube(cube):
+    """Flatten a RubiksCube into a state tuple"""
+    return cube.to_state()
+
+
+def cube_from_state(state):
+    """Build a RubiksCube holding the given state"""
+    cube = RubiksCube()
+    cube.cube = [[[state[face * 9 + row * 3 + col] for col in range(3)]
+                  for row in range(3)] for face in range(6)]
+    return cube
+
+
+def pack_state(state):
+    """Pack a state into 21 bytes, three bits per sticker"""
+    value = 0
+    for colour in state:
+        value = (value << 3) | colour
+    return value.to_bytes(PACKED_STATE_SIZE, "big")
+
+
+def unpack_state(data):
+    """Inverse of pack_state"""
+    value = int.from_bytes(data, "big")
+    return tuple((value >> shift) & 7 for shift in range(159, -1, -3))
+
+
+def _rotations():
+    """The 24 whole-cube rotations as (moves, permutation), found breadth first so each is shortest"""
+    turns = [move for move in ALL_MOVES if move[0] in "xyz"]
+    rotations = {IDENTITY: []}
+    layer = [IDENTITY]
+    while layer:
+        next_layer = []
+        for perm in layer:
+            for move in turns:
+                child = apply_move(perm, move)
+                if child not in rotations:
+                    rotations[child] = rotations[perm] + [move]
+                    next_layer.append(child)
+        layer = next_layer
+    return [(moves, perm) for perm, moves in rotations.items()]
+
+
+ROTATIONS = _rotations()
+# Flat index of the centre sticker of each face
+CENTRES = tuple(face * 9 + 4 for face in range(6))
+
+
+def orient_state(state):
+    """
+    Turn the whole cube so every centre is on its home face
+
+    Slice, wide and rotation moves move the centres, and face turns alone can
+    never bring them back, so searches over face turns orient the state first.
+
+    Returns:
+        (rotation moves, rotated state), with no moves if the centres are
+        already home, or None if no rotation brings them home
+    """
+    for moves, perm in ROTATIONS:
+        if all(state[perm[centre]] == centre // 9 for centre in CENTRES):
+            return moves, (tuple(state) if not moves else apply_permutation(state, perm))
+    return None
+
+
+def is_solved_state(state):
+    """Check whether every face of a state shows a single colour"""
+    for start in range(0, 54, 9):
+        if state[start:start + 9].count(state[start + 4]) != 9:
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    state = apply_moves(SOLVED_STATE, "R U R' U'")
+    print(f"Sexy move applied, solved: {is_solved_state(state)}")
+
+    for move in FACE_MOVES:
+        state = apply_move(SOLVED_STATE, move)
+        state = apply_move(state, inverse_move(move))
+        assert state == SOLVED_STATE, move
+    print("All moves are undone by their inverses")
+
+    reference = RubiksCube()
+    reference.execute_moves_reference("F R U' R' F' R U R' D2 B L'")
+    fast = apply_moves(SOLVED_STATE, "F R U' R' F' R U R' D2 B L'")
+    print(f"Fast path matches reference: {state_from_cube(reference) == fast}")
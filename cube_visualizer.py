@@ -38,17 +38,17 @@ class CubeVisualizer:
     def _make_white_cross_cube(self, cube):
         """Create a cube with just the white cross solved"""
         # White face
-        cube.cube[0][0][1] = 0  # Top edge
-        cube.cube[0][1][0] = 0  # Left edge
-        cube.cube[0][1][1] = 0  # Center
-        cube.cube[0][1][2] = 0  # Right edge
-        cube.cube[0][2][1] = 0  # Bottom edge
+        cube.mutable_cube[0][0][1] = 0  # Top edge
+        cube.mutable_cube[0][1][0] = 0  # Left edge
+        cube.mutable_cube[0][1][1] = 0  # Center
+        cube.mutable_cube[0][1][2] = 0  # Right edge
+        cube.mutable_cube[0][2][1] = 0  # Bottom edge
 
         # Set side colors for the white cross edges
-        cube.cube[2][2][1] = 2  # Red on front face
-        cube.cube[3][2][1] = 3  # Orange on back face  
-        cube.cube[4][2][1] = 4  # Blue on right face
-        cube.cube[5][2][1] = 5  # Green on left face
+        cube.mutable_cube[2][2][1] = 2  # Red on front face
+        cube.mutable_cube[3][2][1] = 3  # Orange on back face  
+        cube.mutable_cube[4][2][1] = 4  # Blue on right face
+        cube.mutable_cube[5][2][1] = 5  # Green on left face
 
         # Scramble the rest
         self._scramble_non_cross_pieces(cube)
@@ -58,12 +58,12 @@ class CubeVisualizer:
         # Complete white face
         for row in range(3):
             for col in range(3):
-                cube.cube[0][row][col] = 0  # All white
+                cube.mutable_cube[0][row][col] = 0  # All white
 
         # Set the bottom row of each side face
         for face in [2, 3, 4, 5]:  # Front, Back, Right, Left
             for col in range(3):
-                cube.cube[face][2][col] = face
+                cube.mutable_cube[face][2][col] = face
 
         # Scramble the rest
         self._scramble_upper_layers(cube)
@@ -76,7 +76,7 @@ class CubeVisualizer:
         # Set the middle row of each side face
         for face in [2, 3, 4, 5]:  # Front, Back, Right, Left
             for col in range(3):
-                cube.cube[face][1][col] = face
+                cube.mutable_cube[face][1][col] = face
 
         # Scramble the top layer
         self._scramble_top_layer(cube)
@@ -87,11 +87,11 @@ class CubeVisualizer:
         self._make_second_layer_cube(cube)
 
         # Yellow cross on top
-        cube.cube[1][0][1] = 1  # Top edge
-        cube.cube[1][1][0] = 1  # Left edge
-        cube.cube[1][1][1] = 1  # Center
-        cube.cube[1][1][2] = 1  # Right edge
-        cube.cube[1][2][1] = 1  # Bottom edge
+        cube.mutable_cube[1][0][1] = 1  # Top edge
+        cube.mutable_cube[1][1][0] = 1  # Left edge
+        cube.mutable_cube[1][1][1] = 1  # Center
+        cube.mutable_cube[1][1][2] = 1  # Right edge
+        cube.mutable_cube[1][2][1] = 1  # Bottom edge
 
         # Top rows of side faces still scrambled
         self._scramble_top_layer_edges(cube)
@@ -104,7 +104,7 @@ class CubeVisualizer:
         # Full yellow face on top
         for row in range(3):
             for col in range(3):
-                cube.cube[1][row][col] = 1
+                cube.mutable_cube[1][row][col] = 1
 
         # Top rows of side faces still not correctly permuted
         self._scramble_top_layer_edges_keep_yellow(cube)
@@ -112,16 +112,16 @@ class CubeVisualizer:
     def _scramble_non_cross_pieces(self, cube):
         """Scramble all pieces except the white cross"""
         # Scramble corners of the white face
-        cube.cube[0][0][0] = 3  # Top-left
-        cube.cube[0][0][2] = 5  # Top-right
-        cube.cube[0][2][0] = 2  # Bottom-left
-        cube.cube[0][2][2] = 4  # Bottom-right
+        cube.mutable_cube[0][0][0] = 3  # Top-left
+        cube.mutable_cube[0][0][2] = 5  # Top-right
+        cube.mutable_cube[0][2][0] = 2  # Bottom-left
+        cube.mutable_cube[0][2][2] = 4  # Bottom-right
         
         # Scramble most of yellow face
         for row in range(3):
             for col in range(3):
                 if not (row == 1 and col == 1):  # Preserve center
-                    cube.cube[1][row][col] = (row + col) % 5 + 1
+                    cube.mutable_cube[1][row][col] = (row + col) % 5 + 1
                     
         # Scramble middle and top layers of side faces
         colors = [2, 3, 4, 5]  # Red, Orange, Blue, Green
@@ -129,7 +129,7 @@ class CubeVisualizer:
             for row in range(2):  # Top and middle rows
                 for col in range(3):
                     if not (row == 2 and col == 1):  # Preserve cross piece
-                        cube.cube[face][row][col] = colors[(face + row + col) % 4]
+                        cube.mutable_cube[face][row][col] = colors[(face + row + col) % 4]
     
     def _scramble_upper_layers(self, cube):
         """Scramble second and top layer after first layer is solved"""
@@ -139,13 +139,13 @@ class CubeVisualizer:
         for row in range(3):
             for col in range(3):
                 if not (row == 1 and col == 1):  # Preserve center
-                    cube.cube[1][row][col] = colors[(row + col) % 5]
+                    cube.mutable_cube[1][row][col] = colors[(row + col) % 5]
         
         # Scramble middle and top rows of side faces
         for face in range(2, 6):
             for row in range(2):  # Top and middle rows
                 for col in range(3):
-                    cube.cube[face][row][col] = colors[(face + row + col) % 5]
+                    cube.mutable_cube[face][row][col] = colors[(face + row + col) % 5]
     
     def _scramble_top_layer(self, cube):
         """Scramble just the top layer after first two layers are solved"""
@@ -155,27 +155,27 @@ class CubeVisualizer:
         for row in range(3):
             for col in range(3):
                 if not (row == 1 and col == 1):  # Preserve center
-                    cube.cube[1][row][col] = colors[(row + col) % 5]
+                    cube.mutable_cube[1][row][col] = colors[(row + col) % 5]
         
         # Scramble top rows of side faces
         for face in range(2, 6):
             for col in range(3):
-                cube.cube[face][0][col] = colors[(face + col) % 5]
+                cube.mutable_cube[face][0][col] = colors[(face + col) % 5]
     
     def _scramble_top_layer_edges(self, cube):
         """Scramble top layer edges but keep yellow cross"""
         colors = [2, 3, 4, 5]  # Red, Orange, Blue, Green
         
         # Yellow cross already set, scramble corners
-        cube.cube[1][0][0] = colors[0]  # Top-left
-        cube.cube[1][0][2] = colors[1]  # Top-right
-        cube.cube[1][2][0] = colors[2]  # Bottom-left
-        cube.cube[1][2][2] = colors[3]  # Bottom-right
+        cube.mutable_cube[1][0][0] = colors[0]  # Top-left
+        cube.mutable_cube[1][0][2] = colors[1]  # Top-right
+        cube.mutable_cube[1][2][0] = colors[2]  # Bottom-left
+        cube.mutable_cube[1][2][2] = colors[3]  # Bottom-right
         
         # Scramble top rows of side faces
         for face in range(2, 6):
             for col in range(3):
-                cube.cube[face][0][col] = colors[(face + col) % 4]
+                cube.mutable_cube[face][0][col] = colors[(face + col) % 4]
     
     def _scramble_top_layer_edges_keep_yellow(self, cube):
         """Scramble top layer edges while keeping all yellow on top"""
@@ -184,7 +184,7 @@ class CubeVisualizer:
         # Top rows of side faces - shifted from their correct positions
         for face in range(2, 6):
             for col in range(3):
-                cube.cube[face][0][col] = colors[(face + col + 1) % 4]
+                cube.mutable_cube[face][0][col] = colors[(face + col + 1) % 4]
         
         # Coordinates for 3D cube
         self.angle_x = math.pi / 4
@@ -232,7 +232,7 @@ class CubeVisualizer:
         for face in range(6):
             for row in range(3):
                 for col in range(3):
-                    color_index = cube.cube[face][row][col]
+                    color_index = cube.sticker(face, row, col)
                     
                     # Determine 3D coordinates based on face, row, col
                     if face == 0:  # Bottom face (White)
@@ -398,23 +398,32 @@ class CubeVisualizer:
         # Start animation
         self.root.after(500, execute_move)
 
+    def visualize_algorithm(self, cube, name, library=None):
+        """Animate a named algorithm from the algorithm library, starting from the given cube"""
+        if library is None:
+            from algorithm_library import load_default_library
+            library = load_default_library()
+        algorithm = library[name]
+        self.root.title(f"Rubik's Cube Solver - {algorithm.name}: {algorithm.notation}")
+        self.visualize_solve(cube, algorithm.moves)
+
 def main():
     # Create and scramble a cube
     cube = RubiksCube()
     scramble = "R U R' U' F R F'"
     print(f"Scrambling cube with: {scramble}")
     cube.execute_moves(scramble)
+    cube.checkpoint("scrambled")
     
     # Create the solver and find a solution
     from solver import RubiksSolver
     solver = RubiksSolver()
     print("Solving cube...")
-    solution = solver.solve(cube)
+    solution = solver.solve(cube).moves
     
-    # For visualization, create a clean solution path
-    # We'll start with a fresh scrambled cube and solve it
-    visualization_cube = RubiksCube()
-    visualization_cube.execute_moves(scramble)
+    # For visualization, go back to the scrambled state the solve started from
+    visualization_cube = cube.copy()
+    visualization_cube.restore("scrambled")
     
     # Create the visualization
     root = tk.Tk()
@@ -471,8 +480,7 @@ def main():
     # Add a scramble button
     def scramble_cube():
         # Reset the cube to scrambled state for visualization
-        scrambled_cube = RubiksCube()
-        scrambled_cube.execute_moves(scramble)
+        scrambled_cube = visualizer.visualization_cube.copy()
         visualizer.cube = scrambled_cube  # Update the current cube state
         visualizer.draw_cube(scrambled_cube)
     
@@ -482,6 +490,15 @@ def main():
                                                         setattr(visualizer, 'angle_y', -math.pi/6),
                                                         visualizer.draw_cube(visualizer.cube)]).pack(side=tk.LEFT)
     
+    # Play any algorithm of the shared library on the current cube
+    from algorithm_library import load_default_library
+    library = load_default_library()
+    algorithm_name = tk.StringVar(value=library.names()[0])
+    tk.OptionMenu(frame, algorithm_name, *library.names()).pack(side=tk.LEFT)
+    tk.Button(frame, text="Play Algorithm",
+              command=lambda: visualizer.visualize_algorithm(visualizer.cube.copy(), algorithm_name.get(),
+                                                             library)).pack(side=tk.LEFT)
+    
     tk.Label(frame, text="Drag to rotate view").pack(side=tk.RIGHT)
     
     # Handle window closing properly
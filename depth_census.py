@@ -0,0 +1,336 @@
+"""
+Exact number of states at each depth of a subgroup, by disk-backed breadth-first search
+
+A subgroup is a set of generator faces and the pieces that are tracked, e.g.
+<U, R> with every piece it moves, or all face turns acting on the corners
+only. Its states are ranked into 0..size-1 (permutation rank of the tracked
+pieces, then their orientations when the generators can change them), so:
+
+    visited    is a bit array over the ranks in a memory-mapped file
+    frontiers  are files of 8-byte ranks, one per shard of the rank range
+
+Every depth is two passes over a process pool. Expansion tasks read the
+frontier shards, apply every generator move and append the child ranks to
+one candidate file per target shard, a bounded buffer at a time so memory
+does not grow with the frontier. Deduplication tasks then each own one
+shard: a task copies its byte range of the visited bits, keeps the
+candidates not seen before, commits them as the next frontier shard and
+only then sets their bits in the file. Shards own disjoint bytes, so the
+tasks never touch the same part of the file.
+
+After each depth a checkpoint records the counts so far. run_census on the
+same directory resumes from the last checkpoint: frontier shards committed
+before an interruption are kept (their bits are set again, which is
+harmless) and the others are redone from their candidates.
+"""
+
+import json
+import math
+import mmap
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from cube_state import FACE_MOVES, MOVE_PERMUTATIONS, invert_permutation
+from topology import CORNERS, EDGES, ORIENTATION, PIECE_OF, PIECE_STICKERS
+
+CHECKPOINT_NAME = "checkpoint.json"
+VISITED_NAME = "visited.bits"
+# Largest byte range of the visited bits one deduplication task holds in memory
+MAX_SHARD_BYTES = 256 * 1024 * 1024
+# Child ranks an expansion task buffers per target shard before appending them to the candidate file
+MAX_BUCKET_RANKS = 64 * 1024
+
+
+class Subgroup:
+    """
+    A set of generators acting on some of the pieces, with a perfect ranking of its states
+
+    A state is the tuple of sticker indices where the reference sticker of
+    each tracked piece currently is, which gives both its slot and orientation.
+    """
+
+    def __init__(self, name, faces="UDRLFB", pieces=("corners", "edges")):
+        """
+        Args:
+            name: Label used in checkpoints
+            faces: Generator faces; each contributes its quarter, inverse and half turn
+            pieces: Which kinds of pieces to track, "corners" and/or "edges"
+        """
+        self.name = name
+        self.moves = [move for move in FACE_MOVES if move[0] in faces]
+        self._destinations = [invert_permutation(MOVE_PERMUTATIONS[move]) for move in self.moves]
+
+        # Per kind: tracked pieces, slot -> position in that list, orientation count
+        self._kinds = []
+        solved = []
+        for kind, group, twists in (("corners", CORNERS, 3), ("edges", EDGES, 2)):
+            if kind not in pieces:
+                continue
+            tracked = [piece for piece in group
+                       if any(destination[index] != index for destination in self._destinations
+                              for index in PIECE_STICKERS[piece])]
+            if not tracked:
+                continue
+            twisted = any(ORIENTATION[destination[index]] != ORIENTATION[index]
+                          for destination in self._destinations
+                          for piece in tracked for index in PIECE_STICKERS[piece])
+            self._kinds.append((tracked, {slot: position for position, slot in enumerate(tracked)},
+                                twists if twisted else 1))
+            solved.extend(PIECE_STICKERS[piece][0] for piece in tracked)
+        if not self._kinds:
+            raise ValueError(f"Subgroup {name} tracks no piece its generators move")
+        self.solved = tuple(solved)
+        self.size = 1
+        for tracked, _, twists in self._kinds:
+            self.size *= math.factorial(len(tracked)) * twists ** (len(tracked) - 1)
+
+    def __repr__(self):
+        return f"Subgroup({self.name!r}, {len(self.solved)} pieces, {self.size} ranks)"
+
+    def apply(self, state, move):
+        """State after the move with index move (into self.moves)"""
+        destination = self._destinations[move]
+        return tuple(destination[index] for index in state)
+
+    def rank(self, state):
+        """Position of a state in 0..size-1"""
+        rank = 0
+        offset = 0
+        for tracked, slot_index, twists in self._kinds:
+            locations = state[offset:offset + len(tracked)]
+            offset += len(tracked)
+            remaining = list(range(len(tracked)))
+            for index in locations:
+                position = slot_index[PIECE_OF[index]]
+                rank = rank * len(remaining) + remaining.index(position)
+                remaining.remove(position)
+            if twists > 1:
+                for index in locations[:-1]:
+                    rank = rank * twists + ORIENTATION[index]
+        return rank
+
+    def unrank(self, rank):
+        """The state at a rank; inverse of rank"""
+        state = []
+        for tracked, _, twists in reversed(self._kinds):
+            count = len(tracked)
+            orientations = [0] * count
+            if twists > 1:
+                for position in range(count - 2, -1, -1):
+                    rank, orientations[position] = divmod(rank, twists)
+                orientations[-1] = -sum(orientations) % twists
+            digits = []
+            for base in range(1, count + 1):
+                rank, digit = divmod(rank, base)
+                digits.append(digit)
+            remaining = list(range(count))
+            slots = [tracked[remaining.pop(digit)] for digit in reversed(digits)]
+            state[:0] = [PIECE_STICKERS[slot][orientation] for slot, orientation in zip(slots, orientations)]
+        return tuple(state)
+
+
+# Subgroups available by name
+SUBGROUPS = {
+    "ur": Subgroup("ur", faces="UR"),
+    "ur_corners": Subgroup("ur_corners", faces="UR", pieces=("corners",)),
+    "corners": Subgroup("corners", pieces=("corners",)),
+    "edges": Subgroup("edges", pieces=("edges",)),
+}
+
+
+def _frontier_path(directory, depth, shard):
+    return os.path.join(directory, f"frontier_{depth:02d}_{shard:04d}.bin")
+
+
+def _candidate_path(directory, depth, task, shard):
+    return os.path.join(directory, f"candidates_{depth:02d}_{task:03d}_{shard:04d}.bin")
+
+
+def _read_ranks(path):
+    ranks = array("Q")
+    with open(path, "rb") as handle:
+        ranks.frombytes(handle.read())
+    return ranks
+
+
+def _write_ranks(path, ranks):
+    """Write ranks to a temporary file and rename it into place"""
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as handle:
+        ranks.tofile(handle)
+    os.replace(temporary, path)
+
+
+def _append_ranks(path, ranks):
+    """Append ranks to a file and empty the array"""
+    with open(path, "ab") as handle:
+        ranks.tofile(handle)
+    del ranks[:]
+
+
+def _expand(subgroup, directory, depth, task, tasks, shards, span):
+    """Expansion task: children of the frontier shards task, task + tasks, ... bucketed by owner shard"""
+    paths = [_candidate_path(directory, depth + 1, task, shard) for shard in range(shards)]
+    # Candidates are appended to temporary files and renamed into place once complete
+    for path in paths:
+        open(f"{path}.tmp", "wb").close()
+    buckets = [array("Q") for _ in range(shards)]
+    for shard in range(task, shards, tasks):
+        for rank in _read_ranks(_frontier_path(directory, depth, shard)):
+            state = subgroup.unrank(rank)
+            for move in range(len(subgroup.moves)):
+                child = subgroup.rank(subgroup.apply(state, move))
+                owner = child // span
+                bucket = buckets[owner]
+                bucket.append(child)
+                if len(bucket) >= MAX_BUCKET_RANKS:
+                    _append_ranks(f"{paths[owner]}.tmp", bucket)
+    for path, bucket in zip(paths, buckets):
+        _append_ranks(f"{path}.tmp", bucket)
+        os.replace(f"{path}.tmp", path)
+
+
+def _deduplicate(directory, depth, shard, tasks, span):
+    """Deduplication task: commit the unseen candidates of one shard as its next frontier"""
+    frontier = _frontier_path(directory, depth, shard)
+    base = shard * span
+    with open(os.path.join(directory, VISITED_NAME), "r+b") as handle:
+        visited = mmap.mmap(handle.fileno(), 0)
+        if os.path.exists(frontier):
+            # Committed before an interruption; make sure its bits are set
+            fresh = _read_ranks(frontier)
+        else:
+            start = base // 8
+            bits = bytearray(visited[start:min(start + span // 8, len(visited))])
+            fresh = array("Q")
+            for task in range(tasks):
+                for rank in _read_ranks(_candidate_path(directory, depth, task, shard)):
+                    offset = rank - base
+                    mask = 1 << (offset & 7)
+                    if not bits[offset >> 3] & mask:
+                        bits[offset >> 3] |= mask
+                        fresh.append(rank)
+            _write_ranks(frontier, fresh)
+        # Only the bytes of new states are written, so untouched pages stay sparse
+        for rank in fresh:
+            visited[rank >> 3] |= 1 << (rank & 7)
+        visited.flush()
+        visited.close()
+    return len(fresh)
+
+
+def _save_checkpoint(directory, checkpoint):
+    path = os.path.join(directory, CHECKPOINT_NAME)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as handle:
+        json.dump(checkpoint, handle, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def _remove(directory, prefix):
+    for name in os.listdir(directory):
+        if name.startswith(prefix):
+            os.remove(os.path.join(directory, name))
+
+
+def run_census(subgroup, directory, max_depth=None, workers=None, shards=None, verbose=True):
+    """
+    Count the states of a subgroup at every depth, resuming an earlier run in the directory
+
+    Args:
+        subgroup: A Subgroup or a name from SUBGROUPS
+        directory: Working directory for the visited bits, frontiers and checkpoint
+        max_depth: Stop after this depth (run until no new state is found by default)
+        workers: Number of worker processes (all CPUs by default)
+        shards: Number of rank ranges (the number of workers, or more so that a
+            range stays below MAX_SHARD_BYTES)
+        verbose: Print each depth as it completes
+
+    Returns:
+        List of the number of states at depth 0, 1, 2, ... up to the deepest
+        depth reached (the empty depth that ends the search is left out)
+
+    Raises:
+        ValueError: If the directory holds a census of something else
+    """
+    if isinstance(subgroup, str):
+        subgroup = SUBGROUPS[subgroup]
+    workers = workers or os.cpu_count() or 1
+    visited_bytes = -(-subgroup.size // 8)
+    shards = max(shards or workers, -(-visited_bytes // MAX_SHARD_BYTES))
+    # Ranks per shard, a whole number of bytes so shards never share a byte
+    span = -(-subgroup.size // shards // 8) * 8 or 8
+    shards = -(-subgroup.size // span)
+    tasks = min(workers, shards)
+
+    os.makedirs(directory, exist_ok=True)
+    settings = {"subgroup": subgroup.name, "moves": subgroup.moves, "size": subgroup.size,
+                "shards": shards, "tasks": tasks}
+    checkpoint_path = os.path.join(directory, CHECKPOINT_NAME)
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r", encoding="utf-8") as handle:
+            checkpoint = json.load(handle)
+        if checkpoint["settings"] != settings:
+            raise ValueError(f"{directory} holds a census with different settings: {checkpoint['settings']}")
+        if verbose:
+            print(f"Resuming {subgroup.name} after depth {len(checkpoint['counts']) - 1}")
+    else:
+        # A sparse file: untouched pages take no disk space
+        with open(os.path.join(directory, VISITED_NAME), "wb") as handle:
+            handle.truncate(visited_bytes)
+        solved = subgroup.rank(subgroup.solved)
+        for shard in range(shards):
+            _write_ranks(_frontier_path(directory, 0, shard), array("Q", [solved] * (shard == solved // span)))
+        with open(os.path.join(directory, VISITED_NAME), "r+b") as handle:
+            handle.seek(solved >> 3)
+            handle.write(bytes((1 << (solved & 7),)))
+        checkpoint = {"settings": settings, "counts": [1]}
+        _save_checkpoint(directory, checkpoint)
+        if verbose:
+            print(f"Census of {subgroup!r} in {shards} shards with {workers} processes")
+
+    counts = checkpoint["counts"]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while counts[-1] and (max_depth is None or len(counts) <= max_depth):
+            depth = len(counts) - 1
+            start = time.perf_counter()
+            _remove(directory, f"candidates_{depth + 1:02d}_")
+            expansions = [executor.submit(_expand, subgroup, directory, depth, task, tasks, shards, span)
+                          for task in range(tasks)]
+            for expansion in expansions:
+                expansion.result()
+            deduplications = [executor.submit(_deduplicate, directory, depth + 1, shard, tasks, span)
+                              for shard in range(shards)]
+            found = sum(deduplication.result() for deduplication in deduplications)
+            counts.append(found)
+            _save_checkpoint(directory, checkpoint)
+            _remove(directory, f"candidates_{depth + 1:02d}_")
+            _remove(directory, f"frontier_{depth:02d}_")
+            if verbose:
+                print(f"Depth {depth + 1}: {found} states ({time.perf_counter() - start:.1f}s)")
+    if verbose:
+        print(f"{sum(counts)} states of {subgroup.size} ranks reached")
+    # The checkpoint keeps the final 0, which marks a finished census
+    return counts[:-1] if not counts[-1] else list(counts)
+
+
+if __name__ == "__main__":
+    import shutil
+    import sys
+    import tempfile
+
+    name = sys.argv[1] if len(sys.argv) > 1 else "ur_corners"
+    directory = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.gettempdir(), f"census_{name}")
+    subgroup = SUBGROUPS[name]
+
+    # The ranking must be a bijection on the states it meets
+    state = subgroup.solved
+    for move in [0, 4, 2, 3, 1, 5] * 3:
+        state = subgroup.apply(state, move % len(subgroup.moves))
+        assert subgroup.unrank(subgroup.rank(state)) == state
+
+    counts = run_census(subgroup, directory)
+    print(f"Depth distribution of {name}: {counts}")
+    if len(sys.argv) <= 2:
+        shutil.rmtree(directory)
@@ -0,0 +1,186 @@
+"""
+Conversion between flat cube states and 54-character facelet strings
+
+The facelet string is the Singmaster/Kociemba format used by most external
+tools: the faces in the order U R F D L B, nine facelets each, every face read
+row by row as seen from outside with U and D viewed with the front face at the
+bottom and top respectively. Each facelet names the face whose centre has its
+colour, e.g. a solved cube is "UUUUUUUUURRRRRRRRRFFFFFFFFFDDDDDDDDDLLLLLLLLLBBBBBBBBB".
+
+This matches the layout of RubiksCube.cube face by face, so conversion is a
+single byte translation plus one fixed reordering; no moves are replayed.
+"""
+
+from operator import itemgetter
+
+from topology import CENTRES, CORNERS, EDGES, PIECE_STICKERS
+
+FACE_ORDER = "URFDLB"
+# Index of each facelet face in RubiksCube.cube (0=D white, 1=U yellow,
+# 2=F red, 3=B orange, 4=R blue, 5=L green)
+FACE_INDEX = {"U": 1, "R": 4, "F": 2, "D": 0, "L": 5, "B": 3}
+
+_TO_COLOURS = bytes.maketrans(FACE_ORDER.encode("ascii"),
+                              bytes(FACE_INDEX[face] for face in FACE_ORDER))
+_TO_LETTERS = bytes.maketrans(bytes(range(6)),
+                              "".join(sorted(FACE_ORDER, key=FACE_INDEX.get)).encode("ascii"))
+
+# Position in the facelet string of every sticker of the flat state
+_STRING_POSITION = [0] * 54
+for _block, _face in enumerate(FACE_ORDER):
+    for _offset in range(9):
+        _STRING_POSITION[FACE_INDEX[_face] * 9 + _offset] = _block * 9 + _offset
+_FROM_STRING = itemgetter(*_STRING_POSITION)
+
+_STATE_POSITION = [0] * 54
+for _index, _position in enumerate(_STRING_POSITION):
+    _STATE_POSITION[_position] = _index
+_TO_STRING = itemgetter(*_STATE_POSITION)
+
+# Piece id of every corner and edge by the set of faces it belongs to
+_PIECE_BY_FACES = {frozenset(index // 9 for index in PIECE_STICKERS[piece]): piece
+                   for piece in CORNERS + EDGES}
+
+
+def state_from_facelets(facelets):
+    """
+    Parse a facelet string into a flat state
+
+    Args:
+        facelets: 54 characters from U, R, F, D, L, B
+
+    Returns:
+        A tuple of 54 colour values (see cube_state)
+
+    Raises:
+        ValueError: If the string is not a well-formed facelet string
+    """
+    if len(facelets) != 54:
+        raise ValueError(f"Facelet string must have 54 characters, got {len(facelets)}")
+    try:
+        colours = facelets.encode("ascii").translate(_TO_COLOURS)
+    except UnicodeEncodeError:
+        raise ValueError("Facelet string may only contain U, R, F, D, L and B") from None
+    if max(colours) > 5:
+        raise ValueError("Facelet string may only contain U, R, F, D, L and B")
+    for colour in range(6):
+        if colours.count(colour) != 9:
+            raise ValueError(f"Facelet string must contain nine of each face, "
+                             f"found {colours.count(colour)} {_TO_LETTERS[colour:colour + 1].decode()}")
+    return _FROM_STRING(colours)
+
+
+def facelets_from_state(state):
+    """Format a flat state as a facelet string"""
+    return bytes(_TO_STRING(state)).translate(_TO_LETTERS).decode("ascii")
+
+
+def _parity(pieces):
+    """0 if a list of slot -> piece positions is an even permutation, 1 if odd"""
+    parity = 0
+    seen = [False] * len(pieces)
+    for start in range(len(pieces)):
+        length = 0
+        index = start
+        while not seen[index]:
+            seen[index] = True
+            index = pieces[index]
+            length += 1
+        if length:
+            parity ^= (length - 1) & 1
+    return parity
+
+
+def validate_state(state):
+    """
+    Check that a flat state is a cube that can be solved
+
+    Faces are identified by their centres. Every corner and edge must be a
+    real piece appearing once, the corner twists must add up to a multiple
+    of three, the edge flips must be even and the corner and edge
+    permutations must have the same parity.
+
+    Args:
+        state: A flat 54-sticker state
+
+    Raises:
+        ValueError: Describing the first problem found
+    """
+    face_of = {state[PIECE_STICKERS[piece][0]]: PIECE_STICKERS[piece][0] // 9 for piece in CENTRES}
+    if len(face_of) != 6:
+        raise ValueError("Every centre must have a different colour")
+    placement = {}
+    twist = flip = 0
+    for group in (CORNERS, EDGES):
+        for slot in group:
+            faces = [face_of.get(state[index]) for index in PIECE_STICKERS[slot]]
+            piece = _PIECE_BY_FACES.get(frozenset(faces))
+            if piece is None or len(set(faces)) != len(faces):
+                raise ValueError(f"Stickers {PIECE_STICKERS[slot]} do not form a piece")
+            if piece in placement:
+                raise ValueError(f"Piece at stickers {PIECE_STICKERS[slot]} appears twice")
+            placement[piece] = slot
+            # Position of the piece's reference (U/D, or F/B for middle edges) sticker
+            orientation = faces.index(PIECE_STICKERS[piece][0] // 9)
+            if group is CORNERS:
+                twist += orientation
+            else:
+                flip += orientation
+    if twist % 3:
+        raise ValueError("A corner is twisted")
+    if flip % 2:
+        raise ValueError("An edge is flipped")
+    corner_parity = _parity([placement[piece] for piece in CORNERS])
+    edge_parity = _parity([placement[piece] - len(CORNERS) for piece in EDGES])
+    if corner_parity != edge_parity:
+        raise ValueError("Two pieces are swapped")
+
+
+def iter_facelet_file(path):
+    """
+    Stream the states of a file with one facelet string per line
+
+    Blank lines and lines starting with # are skipped.
+
+    Yields:
+        (line number, state) pairs
+
+    Raises:
+        ValueError: On the first malformed line, naming its line number
+    """
+    with open(path, "r", encoding="ascii") as handle:
+        for line_number, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                yield line_number, state_from_facelets(line)
+            except ValueError as error:
+                raise ValueError(f"{path}:{line_number}: {error}") from None
+
+
+def load_facelet_file(path):
+    """Read every state of a facelet file into a list"""
+    return [state for _, state in iter_facelet_file(path)]
+
+
+if __name__ == "__main__":
+    from cube import RubiksCube
+
+    cube = RubiksCube()
+    print(f"Solved: {cube.to_facelets()}")
+
+    cube.execute_moves("R U R' U'")
+    facelets = cube.to_facelets()
+    print(f"After R U R' U': {facelets}")
+
+    restored = RubiksCube.from_facelets(facelets)
+    print(f"Round trip intact: {restored.to_state() == cube.to_state()}")
+
+    # Swapping two stickers of one edge keeps nine of each colour but flips the edge
+    flipped = list(facelets)
+    flipped[7], flipped[19] = flipped[19], flipped[7]
+    try:
+        validate_state(state_from_facelets("".join(flipped)))
+    except ValueError as error:
+        print(f"Flipped edge rejected: {error}")
@@ -0,0 +1,169 @@
+"""
+Iterative-deepening A* solver driven by a pluggable heuristic
+
+The search is a depth-first walk bounded by moves made plus estimated moves
+left, with the bound raised to the smallest value that exceeded it after
+every pass. Each node generates all of its children first and hands them to
+the heuristic in one estimate_batch call, so a vectorised heuristic such as
+MLPHeuristic costs one evaluation per expansion, and children are tried in
+order of their estimate. With an admissible heuristic (see heuristics.py)
+the first solution found is optimal.
+"""
+
+import time
+from operator import itemgetter
+
+from cube_state import FACE_MOVES, MOVE_PERMUTATIONS, SOLVED_STATE
+from heuristics import CubieDistanceHeuristic
+from search_solver import SearchSolverMixin
+from solve_tracker import SolveTracker
+
+_FORWARD = [itemgetter(*MOVE_PERMUTATIONS[move]) for move in FACE_MOVES]
+_FACE_OF = [index // 3 for index in range(len(FACE_MOVES))]
+# Nodes expanded between deadline checks
+_DEADLINE_CHECK_INTERVAL = 1024
+_FOUND = -1
+
+
+def _allowed_moves(last_face):
+    """Moves worth trying after a face: never the same face, opposite faces in one order only"""
+    return [move for move, face in enumerate(_FACE_OF)
+            if face != last_face and not (face // 2 == last_face // 2 and face < last_face)]
+
+
+_ALLOWED_AFTER = {face: _allowed_moves(face) for face in range(-1, 6)}
+
+
+class HeuristicSolver(SearchSolverMixin):
+    """
+    IDA* solver that accepts any heuristic object
+
+    The heuristic needs estimate_batch(states) returning one estimate per
+    state (see heuristics.Heuristic). By default the admissible cubie-distance
+    heuristic is used.
+    """
+
+    engine = "heuristic"
+    step_name = "Heuristic search"
+
+    def __init__(self, heuristic=None, max_depth=20, max_nodes=2000000, fallback=None, verbose=True):
+        """
+        Args:
+            heuristic: Heuristic object (CubieDistanceHeuristic by default)
+            max_depth: Longest solution to look for before giving up
+            max_nodes: Most nodes expanded before giving up
+            fallback: Solver used when the search gives up (a RubiksSolver by default)
+            verbose: Print progress messages like the other solvers
+        """
+        self.heuristic = heuristic if heuristic is not None else CubieDistanceHeuristic()
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.fallback = fallback
+        self.verbose = verbose
+        self.nodes_expanded = 0
+        self.heuristic_calls = 0
+        self.timed_out = False
+        self._deadline = None
+        self.last_engine = None
+        self.tracker = SolveTracker()
+
+    def _search_face_turns(self, state, deadline):
+        """Search for a solution of a state whose centres are home (see SearchSolverMixin.search)"""
+        self.nodes_expanded = 0
+        self.heuristic_calls = 0
+        self.timed_out = False
+        self._deadline = deadline
+        state = tuple(state)
+        if state == SOLVED_STATE:
+            return []
+
+        self.heuristic_calls += 1
+        bound = self.heuristic.estimate_batch([state])[0]
+        path = []
+        while bound <= self.max_depth:
+            result = self._bounded_search(state, 0, bound, -1, path)
+            if result == _FOUND:
+                return [FACE_MOVES[move] for move in path]
+            if result is None or result == float("inf"):
+                return None
+            bound = result
+        return None
+
+    def _bounded_search(self, state, depth, bound, last_face, path):
+        """
+        Depth-first search below one node
+
+        Returns:
+            _FOUND with the moves left in path, the smallest cost that exceeded
+            the bound, or None when a limit was hit
+        """
+        self.nodes_expanded += 1
+        if self.nodes_expanded > self.max_nodes:
+            return None
+        if (self._deadline is not None and not self.nodes_expanded % _DEADLINE_CHECK_INTERVAL
+                and time.perf_counter() > self._deadline):
+            self.timed_out = True
+            return None
+
+        moves = _ALLOWED_AFTER[last_face]
+        children = [_FORWARD[move](state) for move in moves]
+        for move, child in zip(moves, children):
+            if child == SOLVED_STATE:
+                path.append(move)
+                return _FOUND
+        self.heuristic_calls += 1
+        estimates = self.heuristic.estimate_batch(children)
+
+        smallest = float("inf")
+        for estimate, move, child in sorted(zip(estimates, moves, children), key=itemgetter(0)):
+            cost = depth + 1 + estimate
+            if cost > bound:
+                # Children are sorted by estimate, so the rest exceed the bound too
+                smallest = min(smallest, cost)
+                break
+            path.append(move)
+            result = self._bounded_search(child, depth + 1, bound, _FACE_OF[move], path)
+            if result == _FOUND or result is None:
+                return result
+            path.pop()
+            smallest = min(smallest, result)
+        return smallest
+
+    def _step_description(self, moves):
+        return type(self.heuristic).__name__
+
+    def _give_up_reason(self):
+        return f"No solution within {self.max_depth} moves and {self.max_nodes} nodes"
+
+    def _search_summary(self):
+        return f"{self.nodes_expanded} nodes expanded, {self.heuristic_calls} batched heuristic calls"
+
+
+if __name__ == "__main__":
+    from cube import RubiksCube
+    from heuristics import MaxHeuristic, NeighborhoodHeuristic
+
+    heuristics = {"cubie distance": CubieDistanceHeuristic()}
+    try:
+        heuristics["neighborhood table + cubie distance"] = MaxHeuristic(NeighborhoodHeuristic(),
+                                                                         heuristics["cubie distance"])
+    except ValueError as error:
+        print(error)
+
+    for scramble in ["R U R' U'", "F R U R' U' F'", "R U2 D' B L' F2 U"]:
+        for name, heuristic in heuristics.items():
+            cube = RubiksCube()
+            cube.execute_moves(scramble)
+            start = time.perf_counter()
+            result = HeuristicSolver(heuristic, verbose=False).solve(cube)
+            print(f"{scramble} with {name}: {' '.join(result.moves)} "
+                  f"(verified: {result.verified}, {time.perf_counter() - start:.2f}s)")
+
+    # Slice, wide and rotation moves leave the centres off home; the search
+    # turns the cube back first instead of searching face turns forever
+    for scramble in ["M", "x", "Rw"]:
+        cube = RubiksCube()
+        cube.execute_moves(scramble)
+        result = HeuristicSolver(verbose=False).solve(cube)
+        assert result.verified and result.engine == "heuristic", scramble
+        print(f"{scramble} -> {' '.join(result.moves)} (verified: {result.verified})")
@@ -0,0 +1,320 @@
+"""
+Distance-to-solved estimates that plug into the search solvers
+
+A heuristic maps flat states to an estimate of how many face turns they are
+from solved. Searches always ask for the estimates of all children of a node
+at once through estimate_batch, so a vectorised heuristic evaluates a whole
+expansion in one call; simple heuristics only implement estimate.
+
+    NeighborhoodHeuristic   pattern-database lookup in the neighborhood table:
+                            exact near solved, table depth + 1 elsewhere
+    CubieDistanceHeuristic  Manhattan-style sum of the moves each corner and
+                            edge needs on its own, divided by the four pieces
+                            of each kind that one turn moves
+    MaxHeuristic            the largest of several estimates
+    MLPHeuristic            a small multilayer perceptron evaluated with NumPy,
+                            e.g. trained on a training_data dataset
+
+All but MLPHeuristic never overestimate, so a search using them finds optimal
+solutions. The MLP only needs NumPy (imported when the model is created) and
+runs on the CPU.
+"""
+
+from collections import deque
+
+from cube_state import FACE_MOVES, MOVE_PERMUTATIONS, SOLVED_STATE, invert_permutation
+from topology import CORNERS, EDGES, ORIENTATION, PIECE_OF, PIECE_STICKERS
+
+
+class Heuristic:
+    """
+    Base class of the heuristics; subclasses override estimate, estimate_batch or both
+    """
+
+    # True if the estimate never exceeds the real distance
+    admissible = False
+
+    def estimate(self, state):
+        """Estimated number of face turns from a flat state to solved"""
+        return self.estimate_batch([state])[0]
+
+    def estimate_batch(self, states):
+        """Estimates for a list of states, in the same order"""
+        return [self.estimate(state) for state in states]
+
+    def __call__(self, state):
+        return self.estimate(state)
+
+
+class NeighborhoodHeuristic(Heuristic):
+    """
+    Lookup in the table of states near solved
+    """
+
+    admissible = True
+
+    def __init__(self, table=None):
+        """
+        Args:
+            table: A NeighborhoodTable (the default table if not given)
+
+        Raises:
+            ValueError: If no table is given and the default one has not been built
+        """
+        if table is None:
+            from neighborhood_table import load_default_table
+            table = load_default_table()
+            if table is None:
+                raise ValueError("No neighborhood table has been built; run python neighborhood_table.py")
+        self.table = table
+
+    def estimate(self, state):
+        solution = self.table.lookup(state)
+        return self.table.depth + 1 if solution is None else len(solution)
+
+
+def _piece_distances(piece):
+    """
+    Moves a piece needs to reach every (slot, orientation), by breadth-first search
+
+    A piece is tracked by the sticker holding its reference colour; a move
+    carries the sticker at perm[i] to i, so the inverse permutation gives
+    where each sticker goes.
+    """
+    destinations = [invert_permutation(MOVE_PERMUTATIONS[move]) for move in FACE_MOVES]
+    start = PIECE_STICKERS[piece][0]
+    distances = {start: 0}
+    queue = deque([start])
+    while queue:
+        index = queue.popleft()
+        for destination in destinations:
+            target = destination[index]
+            if target not in distances:
+                distances[target] = distances[index] + 1
+                queue.append(target)
+    return distances
+
+
+class CubieDistanceHeuristic(Heuristic):
+    """
+    Sum of the distances of every corner and edge to its home, four per turn
+
+    A face turn moves four corners and four edges, so the sum of the corner
+    distances divided by four (and likewise for edges), rounded up, is a lower
+    bound of the real distance. Centres must be in place (face turns only).
+    """
+
+    admissible = True
+
+    def __init__(self):
+        # For every slot, the colours read from its stickers in order -> moves
+        # that piece needs, combining the piece and its orientation in one key
+        self._slot_costs = []
+        for group in (CORNERS, EDGES):
+            costs = {slot: {} for slot in group}
+            for piece in group:
+                colours = [SOLVED_STATE[index] for index in PIECE_STICKERS[piece]]
+                # Distances from home equal distances to home: the moves are closed under inverse
+                for index, distance in _piece_distances(piece).items():
+                    slot = PIECE_OF[index]
+                    orientation = ORIENTATION[index]
+                    size = len(colours)
+                    key = tuple(colours[(position - orientation) % size] for position in range(size))
+                    costs[slot][key] = distance
+            self._slot_costs.append([(PIECE_STICKERS[slot], costs[slot]) for slot in group])
+
+    def estimate(self, state):
+        bound = 0
+        for slots in self._slot_costs:
+            total = 0
+            for stickers, costs in slots:
+                total += costs[tuple(state[index] for index in stickers)]
+            bound = max(bound, -(-total // 4))
+        return bound
+
+
+class MaxHeuristic(Heuristic):
+    """
+    The largest estimate of several heuristics, admissible if they all are
+    """
+
+    def __init__(self, *heuristics):
+        self.heuristics = heuristics
+        self.admissible = all(heuristic.admissible for heuristic in heuristics)
+
+    def estimate_batch(self, states):
+        batches = [heuristic.estimate_batch(states) for heuristic in self.heuristics]
+        return [max(estimates) for estimates in zip(*batches)]
+
+
+# Stickers fed to the network: every sticker but the fixed centres
+_FEATURE_STICKERS = [index for index in range(54) if index % 9 != 4]
+
+
+class MLPHeuristic(Heuristic):
+    """
+    Multilayer perceptron over one-hot sticker colours, evaluated in batches with NumPy
+
+    The input is the colour of every non-centre sticker one-hot encoded
+    (48 x 6 values), followed by ReLU hidden layers and one linear output.
+    """
+
+    def __init__(self, weights, biases):
+        """
+        Args:
+            weights: Matrices of each layer, input size first (288 x hidden, ..., hidden x 1)
+            biases: Vectors of each layer
+        """
+        import numpy
+
+        self._numpy = numpy
+        self.weights = [numpy.asarray(weight, dtype=numpy.float32) for weight in weights]
+        self.biases = [numpy.asarray(bias, dtype=numpy.float32) for bias in biases]
+        self._colours = numpy.eye(6, dtype=numpy.float32)
+        self._features = numpy.array(_FEATURE_STICKERS)
+
+    @classmethod
+    def create(cls, hidden=(128, 64), seed=0):
+        """A network with random (He-initialised) weights, ready for fit"""
+        import numpy
+
+        rng = numpy.random.default_rng(seed)
+        sizes = [len(_FEATURE_STICKERS) * 6, *hidden, 1]
+        weights = [rng.normal(0, (2 / inputs) ** 0.5, (inputs, outputs))
+                   for inputs, outputs in zip(sizes, sizes[1:])]
+        biases = [numpy.zeros(outputs) for outputs in sizes[1:]]
+        return cls(weights, biases)
+
+    @classmethod
+    def load(cls, path):
+        """Read a network written by save"""
+        import numpy
+
+        with numpy.load(path) as data:
+            layers = len(data.files) // 2
+            return cls([data[f"w{layer}"] for layer in range(layers)],
+                       [data[f"b{layer}"] for layer in range(layers)])
+
+    def save(self, path):
+        """Write the weights to a .npz file"""
+        arrays = {f"w{layer}": weight for layer, weight in enumerate(self.weights)}
+        arrays.update({f"b{layer}": bias for layer, bias in enumerate(self.biases)})
+        self._numpy.savez(path, **arrays)
+
+    def _encode(self, states):
+        colours = self._numpy.asarray(states, dtype=self._numpy.uint8)[:, self._features]
+        return self._colours[colours].reshape(len(states), -1)
+
+    def _forward(self, inputs):
+        """Activations of every layer, the inputs first"""
+        activations = [inputs]
+        for layer, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            output = activations[-1] @ weight + bias
+            if layer < len(self.weights) - 1:
+                output = self._numpy.maximum(output, 0)
+            activations.append(output)
+        return activations
+
+    def estimate_batch(self, states):
+        if not len(states):
+            return []
+        output = self._forward(self._encode(states))[-1][:, 0]
+        return self._numpy.maximum(output, 0).tolist()
+
+    def fit(self, states, distances, epochs=10, batch_size=256, learning_rate=1e-3, seed=0, verbose=True):
+        """
+        Train on (state, distance) pairs with minibatch gradient descent (Adam) on the squared error
+
+        Args:
+            states: Flat states
+            distances: Target distance of each state
+            epochs: Passes over the data
+            batch_size: States per gradient step
+            learning_rate: Adam step size
+            seed: Seed of the shuffling
+            verbose: Print the loss after every epoch
+
+        Returns:
+            The mean squared error of the last epoch
+        """
+        numpy = self._numpy
+        inputs = self._encode(states)
+        targets = numpy.asarray(distances, dtype=numpy.float32)
+        rng = numpy.random.default_rng(seed)
+        parameters = self.weights + self.biases
+        first = [numpy.zeros_like(parameter) for parameter in parameters]
+        second = [numpy.zeros_like(parameter) for parameter in parameters]
+        step = 0
+        loss = 0.0
+        for epoch in range(epochs):
+            order = rng.permutation(len(targets))
+            total = 0.0
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                activations = self._forward(inputs[batch])
+                error = activations[-1][:, 0] - targets[batch]
+                total += float(error @ error)
+
+                # Backpropagate the mean squared error
+                gradient = (2 / len(batch)) * error[:, None]
+                weight_gradients = []
+                bias_gradients = []
+                for layer in range(len(self.weights) - 1, -1, -1):
+                    weight_gradients.insert(0, activations[layer].T @ gradient)
+                    bias_gradients.insert(0, gradient.sum(axis=0))
+                    if layer:
+                        gradient = (gradient @ self.weights[layer].T) * (activations[layer] > 0)
+
+                step += 1
+                for index, (parameter, grad) in enumerate(zip(parameters, weight_gradients + bias_gradients)):
+                    first[index] = 0.9 * first[index] + 0.1 * grad
+                    second[index] = 0.999 * second[index] + 0.001 * grad * grad
+                    corrected = first[index] / (1 - 0.9 ** step)
+                    scale = numpy.sqrt(second[index] / (1 - 0.999 ** step)) + 1e-8
+                    parameter -= learning_rate * corrected / scale
+            loss = total / len(targets)
+            if verbose:
+                print(f"Epoch {epoch + 1}: mean squared error {loss:.3f}")
+        return loss
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    from cube_state import apply_moves
+    from training_data import random_walk_state
+
+    rng = random.Random(0)
+    samples = [(length, random_walk_state(rng, length)) for length in range(1, 9) for _ in range(50)]
+    heuristics = {"cubie distance": CubieDistanceHeuristic()}
+    try:
+        heuristics["neighborhood table"] = NeighborhoodHeuristic()
+        heuristics["max of both"] = MaxHeuristic(*heuristics.values())
+    except ValueError as error:
+        print(error)
+
+    for name, heuristic in heuristics.items():
+        start = time.perf_counter()
+        estimates = heuristic.estimate_batch([state for _, state in samples])
+        elapsed = (time.perf_counter() - start) / len(samples) * 1e6
+        if heuristic.admissible:
+            assert all(estimate <= length for (length, _), estimate in zip(samples, estimates)), name
+        by_length = {}
+        for (length, _), estimate in zip(samples, estimates):
+            by_length.setdefault(length, []).append(estimate)
+        means = ", ".join(f"{length}: {sum(values) / len(values):.1f}" for length, values in by_length.items())
+        print(f"{name:<20} {elapsed:6.1f} us/state, mean estimate by walk length {means}")
+
+    sexy = apply_moves(SOLVED_STATE, "R U R' U'")
+    print(f"Cubie distance after R U R' U': {heuristics['cubie distance'](sexy)}")
+
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("NumPy is not installed, skipping the MLP heuristic")
+    else:
+        training = [(length, random_walk_state(rng, length)) for length in range(1, 13) for _ in range(2000)]
+        model = MLPHeuristic.create(hidden=(64,))
+        model.fit([state for _, state in training], [length for length, _ in training], epochs=5)
+        estimates = model.estimate_batch([state for _, state in samples])
+        print(f"MLP estimates for walks of 1 and 8 moves: {estimates[0]:.1f}, {estimates[-1]:.1f}")
@@ -1,5 +1,4 @@
 from cube import RubiksCube
-from solver import RubiksSolver
 from utils import create_scrambled_cube, print_cube_simple, validate_moves_sequence
 import sys
 import time
@@ -53,16 +52,18 @@ def solve_scrambled_cube():
     print("\nScrambled cube state:")
     print_cube_simple(cube)
     
+    # Imported here so the menu starts without loading the solver and its tables
+    from solver import RubiksSolver
     solver = RubiksSolver()
     print("\nAttempting to solve...")
     
-    solution = solver.solve(cube, ' '.join(scramble_sequence) if isinstance(scramble_sequence, list) else scramble_sequence)
+    result = solver.solve(cube, ' '.join(scramble_sequence) if isinstance(scramble_sequence, list) else scramble_sequence)
+    solution = result.moves
     
-    # Since our solver works by brute force and declares success, 
-    # check if we got a reasonable solution
-    if solution and len(solution) > 0:
+    # Only report success when replaying the solution really solves the cube
+    if result.verified:
         print(f"\n CUBE SOLVED SUCCESSFULLY!")
-        print(f"Solution found with {len(solution)} moves")
+        print(f"Solution found with {len(solution)} moves ({result.engine}, {result.elapsed:.2f}s)")
         if len(solution) <= 20:
             print(f"Solution: {' '.join(solution)}")
         else:
@@ -158,25 +159,35 @@ def solve_scrambled_cube():
                 print(f"Error launching visualization: {e}")
                 print("Continuing without visualization...")
     else:
-        print("\nCube could not be solved after all attempts. Please check for bugs or invalid cube state.")
+        print(f"\nCube could not be solved: {len(solution)} moves were tried without reaching the solved state.")
 
 def apply_custom_moves():
     print("\n--- APPLY CUSTOM MOVES ---")
     
     cube = RubiksCube()
+    cube.checkpoint("solved")
     print("Starting with solved cube:")
     print_cube_simple(cube)
     
     while True:
-        moves = input("\nEnter moves (or 'quit' to exit, 'reset' for solved cube): ").strip()
+        moves = input("\nEnter moves (or 'quit' to exit, 'undo', 'redo', 'reset' for solved cube): ").strip()
         
         if moves.lower() == 'quit':
             break
         elif moves.lower() == 'reset':
-            cube = RubiksCube()
+            cube.restore("solved")
             print("Cube reset to solved state.")
             print_cube_simple(cube)
             continue
+        elif moves.lower() in ('undo', 'redo'):
+            undone = cube.undo() if moves.lower() == 'undo' else cube.redo()
+            if undone is None:
+                print(f"Nothing to {moves.lower()}.")
+                continue
+            print(f"\n{moves.lower().capitalize()}: {undone}")
+            print_cube_simple(cube)
+            print(f"Is solved: {cube.is_solved()}")
+            continue
         
         if not validate_moves_sequence(moves):
             print("Invalid move sequence! Use moves like: U, R, F, L, B, D (with ', 2 variants)")
@@ -201,7 +212,7 @@ def test_cube_moves():
     
     print("Testing common move sequences:")
     
-    for i, sequence in enumerate(test_sequences[:3], 1):
+    for i, sequence in enumerate(test_sequences, 1):
         print(f"\n{i}. Testing: {sequence}")
         test_cube = cube.copy()
         test_cube.execute_moves(sequence)
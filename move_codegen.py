@@ -0,0 +1,216 @@
+"""
+Straight-line move functions generated from the move permutations
+
+For every move, and for a few common algorithms fused into a single
+permutation, a Python function is written out that rebuilds the 54-sticker
+tuple with one indexing expression per sticker:
+
+    def move_R(s):
+        return (s[0], s[1], s[20], ...)
+
+CPython runs this without any loop or per-index lookup, close to the speed
+of an itemgetter, and an algorithm costs one call instead of one per move. The source is cached
+as a module in the tables directory (and Python caches its bytecode next to
+it); it is regenerated whenever the permutations or algorithms change.
+Importing this module loads the functions; use_generated_moves() makes the
+RubiksCube and cube_state fast paths use them.
+"""
+
+import hashlib
+import importlib.util
+import os
+from operator import itemgetter
+
+import cube
+import cube_state
+from cube_state import IDENTITY, MOVE_PERMUTATIONS, apply_moves
+from paths import TABLE_DIR
+
+# Algorithms compiled into one function each
+COMMON_ALGORITHMS = {
+    "sexy": "R U R' U'",
+    "sune": "R U R' U R U2 R'",
+    "t_perm": "R U R' U' R' F R2 U' R' U' R U R' F'",
+    "ua_perm": "R U' R U R U R U' R' U' R2",
+    "ub_perm": "R2 U R U R' U' R' U' R' U R'",
+}
+# Bump when the layout of the generated source changes
+FORMAT_VERSION = 1
+DEFAULT_CACHE_PATH = os.path.join(TABLE_DIR, "generated_moves.py")
+_ITEMS_PER_LINE = 9
+
+
+def _function_name(prefix, name):
+    return prefix + "_" + name.replace("'", "_prime")
+
+
+def _function_source(name, perm):
+    lines = [", ".join(f"s[{index}]" for index in perm[start:start + _ITEMS_PER_LINE])
+             for start in range(0, len(perm), _ITEMS_PER_LINE)]
+    body = ",\n        ".join(lines)
+    return f"def {name}(s):\n    return (\n        {body},\n    )\n"
+
+
+def fingerprint(algorithms=None):
+    """Hash of everything the generated source depends on"""
+    algorithms = COMMON_ALGORITHMS if algorithms is None else algorithms
+    data = repr((FORMAT_VERSION, sorted(MOVE_PERMUTATIONS.items()), sorted(algorithms.items())))
+    return hashlib.sha1(data.encode()).hexdigest()
+
+
+def generate_source(algorithms=None):
+    """
+    Write the Python source of the move and algorithm functions
+
+    Args:
+        algorithms: Name -> move string to fuse into one function each
+            (COMMON_ALGORITHMS by default)
+
+    Returns:
+        Module source defining one function per move and algorithm plus the
+        MOVES and ALGORITHMS dictionaries mapping names to them
+    """
+    algorithms = COMMON_ALGORITHMS if algorithms is None else algorithms
+    parts = ["# Generated by move_codegen.py, do not edit\n"
+             f"# fingerprint: {fingerprint(algorithms)}\n"]
+    moves = {}
+    for move, perm in MOVE_PERMUTATIONS.items():
+        moves[move] = _function_name("move", move)
+        parts.append(_function_source(moves[move], perm))
+    fused = {}
+    for name, sequence in algorithms.items():
+        fused[name] = _function_name("algorithm", name)
+        parts.append(f"# {sequence}\n" + _function_source(fused[name], apply_moves(IDENTITY, sequence)))
+    for table, functions in (("MOVES", moves), ("ALGORITHMS", fused)):
+        entries = "".join(f"    {name!r}: {function},\n" for name, function in functions.items())
+        parts.append(f"{table} = {{\n{entries}}}\n")
+    return "\n\n".join(parts)
+
+
+def _is_current(path, expected):
+    """Check the fingerprint line of a cached module"""
+    try:
+        with open(path, encoding="utf-8") as handle:
+            handle.readline()
+            return handle.readline().strip() == f"# fingerprint: {expected}"
+    except OSError:
+        return False
+
+
+def load_generated(algorithms=None, path=DEFAULT_CACHE_PATH):
+    """
+    Load the generated functions, writing the cached module first if it is stale
+
+    If the cache cannot be written the source is compiled in memory instead.
+
+    Args:
+        algorithms: Name -> move string (COMMON_ALGORITHMS by default)
+        path: Location of the cached module
+
+    Returns:
+        (move name -> function, algorithm name -> function)
+    """
+    algorithms = COMMON_ALGORITHMS if algorithms is None else algorithms
+    if not _is_current(path, fingerprint(algorithms)):
+        source = generate_source(algorithms)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "w", encoding="utf-8") as handle:
+                handle.write(source)
+            os.replace(temporary, path)
+        except OSError:
+            namespace = {}
+            exec(compile(source, "<generated moves>", "exec"), namespace)
+            return namespace["MOVES"], namespace["ALGORITHMS"]
+
+    spec = importlib.util.spec_from_file_location("generated_moves", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.MOVES, module.ALGORITHMS
+
+
+MOVE_FUNCTIONS, ALGORITHM_FUNCTIONS = load_generated()
+
+
+def apply_moves_generated(state, moves):
+    """Apply a move sequence (string or list) to a state with the generated functions"""
+    if isinstance(moves, str):
+        moves = moves.split()
+    for move in moves:
+        state = MOVE_FUNCTIONS[move](state)
+    return tuple(state)
+
+
+def apply_algorithm(state, name):
+    """Apply one of the fused algorithms, e.g. "sune", in a single call"""
+    return ALGORITHM_FUNCTIONS[name](state)
+
+
+def use_generated_moves(enabled=True):
+    """
+    Switch the RubiksCube and cube_state move paths to the generated functions
+
+    Args:
+        enabled: False restores the itemgetter tables
+    """
+    for steps in (cube._MOVE_STEPS, cube_state._MOVE_GETTERS):
+        if enabled:
+            steps.update(MOVE_FUNCTIONS)
+        else:
+            steps.update({move: itemgetter(*perm) for move, perm in MOVE_PERMUTATIONS.items()})
+    cube._sequence_permutation.cache_clear()
+
+
+def benchmark_codegen(number=20000):
+    """
+    Time the generated functions against the permutation tables
+
+    Args:
+        number: Calls per measurement
+
+    Returns:
+        Dictionary of measurement name to nanoseconds per call
+    """
+    import timeit
+
+    state = apply_moves(cube_state.SOLVED_STATE, "R U F' L2 D B'")
+    getter = itemgetter(*MOVE_PERMUTATIONS["R"])
+    perm = MOVE_PERMUTATIONS["R"]
+    sune = COMMON_ALGORITHMS["sune"].split()
+    sune_getter = itemgetter(*apply_moves(IDENTITY, sune))
+    candidates = {
+        "R, tuple comprehension": lambda: tuple(state[index] for index in perm),
+        "R, itemgetter table": lambda: getter(state),
+        "R, generated": lambda: MOVE_FUNCTIONS["R"](state),
+        "sune, itemgetter per move": lambda: apply_moves(state, sune),
+        "sune, generated per move": lambda: apply_moves_generated(state, sune),
+        "sune, fused itemgetter": lambda: sune_getter(state),
+        "sune, generated fused": lambda: ALGORITHM_FUNCTIONS["sune"](state),
+    }
+    timings = {}
+    for name, call in candidates.items():
+        seconds = min(timeit.repeat(call, number=number, repeat=5))
+        timings[name] = seconds / number * 1e9
+        print(f"{name:<28} {timings[name]:8.0f} ns")
+    return timings
+
+
+if __name__ == "__main__":
+    from cube_state import ALL_MOVES, SOLVED_STATE
+
+    # Every generated function must agree with the tables
+    scramble = apply_moves(SOLVED_STATE, "R U F' L2 D B' M x")
+    for move in ALL_MOVES:
+        assert MOVE_FUNCTIONS[move](scramble) == apply_moves(scramble, [move]), move
+    for name, sequence in COMMON_ALGORITHMS.items():
+        assert apply_algorithm(scramble, name) == apply_moves(scramble, sequence), name
+    print(f"{len(MOVE_FUNCTIONS)} move and {len(ALGORITHM_FUNCTIONS)} algorithm functions "
+          f"match the permutation tables")
+    benchmark_codegen()
+
+    use_generated_moves()
+    cube_with_generated = cube.RubiksCube()
+    cube_with_generated.execute_moves("R U R' U' " * 6)
+    print(f"Sexy move x6 with generated moves, solved: {cube_with_generated.is_solved()}")
+    use_generated_moves(False)
@@ -0,0 +1,232 @@
+"""
+Differential fuzzing of the move engine against the reference implementation
+
+Random move sequences are applied through every backend and the resulting
+stickers must agree exactly with RubiksCube.execute_moves_reference, which
+turns the cube one move method at a time:
+
+    fast    execute_moves on random chunks of the sequence (composed, cached permutations)
+    lazy    the same on a lazy cube, probing single stickers while moves are buffered
+    flat    cube_state.apply_moves on flat state tuples
+    undo    the fast cube undone back to the start through its history
+    pieces  the incrementally updated piece index of the fast cube
+
+Half of the sequences start from a cube whose 54 stickers all carry
+different labels, so any misplaced sticker shows up even where colours
+would hide it. The other half start solved, and there is_solved() and the
+incremental stage counts are checked against a plain sticker comparison.
+Work is split into seeded batches spread over a pool of workers, so any
+reported divergence can be replayed with fuzz_batch(seed, batch, ...).
+"""
+
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from cube import PIECE_SLOTS, RubiksCube, STAGES
+from cube_state import ALL_MOVES, IDENTITY, SOLVED_STATE, apply_moves, inverse_move
+
+# Every sticker labelled with its own index
+LABELLED_STATE = IDENTITY
+# Colours of every corner and edge piece
+PIECE_COLOURS = [tuple(index // 9 for index in stickers) for stickers in PIECE_SLOTS.values()]
+
+
+def _new_cube(state, lazy=False):
+    """Build a cube holding any 54 sticker values"""
+    cube = RubiksCube(lazy=lazy)
+    cube.cube = [[list(state[start:start + 3]) for start in range(face * 9, face * 9 + 9, 3)]
+                 for face in range(6)]
+    return cube
+
+
+def _stage_solved(state, stage):
+    """Check a stage by comparing every sticker with its centre"""
+    return all(state[index] == state[index // 9 * 9 + 4] for index in STAGES[stage])
+
+
+def _divergence(seed, batch, sequence, backend, expected, actual):
+    return {
+        "seed": seed,
+        "batch": batch,
+        "sequence": " ".join(sequence),
+        "backend": backend,
+        "expected": expected,
+        "actual": actual,
+    }
+
+
+def fuzz_batch(seed, batch, count, max_length=30):
+    """
+    Check one batch of random sequences against the reference implementation
+
+    Args:
+        seed: Seed of the whole run
+        batch: Index of the batch; together with the seed it fixes every sequence
+        count: Number of sequences in the batch
+        max_length: Longest sequence generated
+
+    Returns:
+        None if every backend agreed, otherwise a dictionary describing the
+        first divergence (seed, batch, sequence, backend, expected, actual)
+    """
+    rng = random.Random(f"{seed}:{batch}")
+    for _ in range(count):
+        sequence = [rng.choice(ALL_MOVES) for _ in range(rng.randint(1, max_length))]
+        initial = LABELLED_STATE if rng.random() < 0.5 else SOLVED_STATE
+
+        reference = _new_cube(initial)
+        for move in sequence:
+            reference.execute_moves_reference(move)
+        expected = reference.to_state()
+
+        fast = _new_cube(initial)
+        lazy = _new_cube(initial, lazy=True)
+        coloured = initial == SOLVED_STATE
+        if coloured:
+            # Build the piece index now so every move has to keep it up to date
+            fast.locate_piece(*PIECE_COLOURS[0])
+        start = 0
+        while start < len(sequence):
+            end = start + rng.randint(1, 8)
+            chunk = " ".join(sequence[start:end])
+            fast.execute_moves(chunk)
+            lazy.execute_moves(chunk)
+            face, row, col = rng.randrange(6), rng.randrange(3), rng.randrange(3)
+            if lazy.sticker(face, row, col) != fast.sticker(face, row, col):
+                return _divergence(seed, batch, sequence, "lazy sticker",
+                                   fast.sticker(face, row, col), lazy.sticker(face, row, col))
+            if rng.random() < 0.2:
+                # Branch off a copy-on-write copy and keep going on the original
+                fast.copy().execute_moves(chunk)
+            start = end
+
+        for backend, cube in (("fast", fast), ("lazy", lazy)):
+            for stage in STAGES:
+                if cube.is_stage_solved(stage) != _stage_solved(expected, stage):
+                    return _divergence(seed, batch, sequence, f"{backend} {stage} check",
+                                       _stage_solved(expected, stage), cube.is_stage_solved(stage))
+            actual = cube.to_state()
+            if actual != expected:
+                return _divergence(seed, batch, sequence, backend, expected, actual)
+
+        if coloured:
+            rebuilt = _new_cube(expected)
+            for colours in PIECE_COLOURS:
+                if fast.locate_piece(*colours) != rebuilt.locate_piece(*colours):
+                    return _divergence(seed, batch, sequence, "pieces",
+                                       rebuilt.locate_piece(*colours), fast.locate_piece(*colours))
+
+        actual = apply_moves(initial, sequence)
+        if actual != expected:
+            return _divergence(seed, batch, sequence, "flat", expected, actual)
+
+        while fast.undo() is not None:
+            pass
+        if fast.to_state() != initial:
+            return _divergence(seed, batch, sequence, "undo", initial, fast.to_state())
+    return None
+
+
+def check_identities():
+    """
+    Check group identities on the fast and reference backends
+
+    For every move X: X X' and X^4 are the identity and X2 equals X X.
+    The sexy move R U R' U' must have order 6. Cubes start from labelled
+    stickers, so the identities hold for every sticker and not just colours.
+
+    Returns:
+        A list of failure descriptions, empty if all identities hold
+    """
+    failures = []
+    for backend in ("fast", "reference"):
+        def run(moves):
+            cube = _new_cube(LABELLED_STATE)
+            for move in moves:
+                if backend == "fast":
+                    cube.execute_moves(move)
+                else:
+                    cube.execute_moves_reference(move)
+            return cube.to_state()
+
+        for move in ALL_MOVES:
+            if run([move, inverse_move(move)]) != LABELLED_STATE:
+                failures.append(f"{backend}: {move} {inverse_move(move)} is not the identity")
+            if run([move] * 4) != LABELLED_STATE:
+                failures.append(f"{backend}: ({move})^4 is not the identity")
+            if not move.endswith(("'", "2")) and run([move + "2"]) != run([move, move]):
+                failures.append(f"{backend}: {move}2 differs from {move} {move}")
+
+        sexy = ["R", "U", "R'", "U'"]
+        orders = [power for power in range(1, 7) if run(sexy * power) == LABELLED_STATE]
+        if orders != [6]:
+            failures.append(f"{backend}: R U R' U' has order {orders[0] if orders else 'above 6'}, expected 6")
+    return failures
+
+
+def run_fuzz(sequences=1000000, seed=None, workers=None, batch_size=2000,
+             max_length=30, use_threads=False, verbose=True):
+    """
+    Fuzz the move engine with random sequences spread over a pool of workers
+
+    Args:
+        sequences: Total number of random sequences
+        seed: Seed of the run (random if not given; printed so a failure can be replayed)
+        workers: Number of workers (all CPUs by default)
+        batch_size: Sequences per batch handed to a worker
+        max_length: Longest sequence generated
+        use_threads: Use a thread pool instead of worker processes
+        verbose: Print progress and the result
+
+    Returns:
+        None if no divergence was found, otherwise the first divergence reported
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    workers = workers or os.cpu_count() or 1
+    batches = [min(batch_size, sequences - start) for start in range(0, sequences, batch_size)]
+
+    failures = check_identities()
+    if failures:
+        if verbose:
+            for failure in failures:
+                print(f"Identity failed: {failure}")
+        return {"seed": seed, "backend": "identities", "failures": failures}
+
+    if verbose:
+        print(f"Fuzzing {sequences} sequences (seed {seed}) with {workers} "
+              f"{'threads' if use_threads else 'processes'}...")
+    start = time.perf_counter()
+    executor_class = ThreadPoolExecutor if use_threads else ProcessPoolExecutor
+    divergence = None
+    done = 0
+    with executor_class(max_workers=workers) as executor:
+        futures = {executor.submit(fuzz_batch, seed, batch, count, max_length): count
+                   for batch, count in enumerate(batches)}
+        for future in as_completed(futures):
+            result = future.result()
+            done += futures[future]
+            if result is not None:
+                divergence = result
+                for pending in futures:
+                    pending.cancel()
+                break
+    elapsed = time.perf_counter() - start
+
+    if verbose:
+        if divergence is None:
+            print(f"No divergence in {done} sequences, {done / elapsed:.0f} sequences/s")
+        else:
+            print(f"Divergence in backend '{divergence['backend']}' "
+                  f"(seed {divergence['seed']}, batch {divergence['batch']}):")
+            print(f"  sequence: {divergence['sequence']}")
+    return divergence
+
+
+if __name__ == "__main__":
+    import sys
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    run_fuzz(count)
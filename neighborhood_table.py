@@ -0,0 +1,179 @@
+"""
+Precomputed table of every state within a few moves of solved
+
+The table is a sorted array of fixed-size records: a 21-byte packed state
+followed by its optimal solution at one byte per move (padded with 0xFF).
+It is memory-mapped and searched with a binary search, so a near-solved
+state is answered with a single lookup and no tree search.
+
+Build the default table with:
+    python neighborhood_table.py [depth]
+
+Depth 5 holds about 620k states (16 MB) and builds in a few seconds.
+Depth 6 holds about 8.2M states (220 MB) and needs a few GB while building.
+"""
+
+import mmap
+import os
+import struct
+from operator import itemgetter
+
+from cube_state import (FACE_MOVES, MOVE_PERMUTATIONS, PACKED_STATE_SIZE,
+                        SOLVED_STATE, invert_permutation, pack_state)
+from paths import TABLE_DIR
+
+MAGIC = b"RCNB"
+VERSION = 1
+# magic, version, depth, record size, number of records
+HEADER = struct.Struct("<4sHHHQ")
+NO_MOVE = 0xFF
+
+DEFAULT_DEPTH = 5
+
+
+def default_table_path(depth=DEFAULT_DEPTH):
+    """Location of the generated table for the given depth"""
+    return os.path.join(TABLE_DIR, f"neighborhood_{depth}.bin")
+
+
+def build_table(depth=DEFAULT_DEPTH, path=None, verbose=True):
+    """
+    Enumerate every state within depth moves of solved and write the table
+
+    Args:
+        depth: Maximum distance from solved to include
+        path: Output file (default_table_path(depth) if not given)
+        verbose: Print the number of states found at each depth
+
+    Returns:
+        The path of the written table
+    """
+    path = path or default_table_path(depth)
+    # Walking backwards from solved with inverse moves, so the recorded
+    # move takes a state one step closer to solved
+    backward = [itemgetter(*invert_permutation(MOVE_PERMUTATIONS[move])) for move in FACE_MOVES]
+    solved = bytes(SOLVED_STATE)
+
+    solutions = {pack_state(solved): b""}
+    layer = [(solved, b"")]
+    for current_depth in range(1, depth + 1):
+        next_layer = []
+        found = 0
+        for state, solution in layer:
+            last_face = solution[0] // 3 if solution else -1
+            for move_index, getter in enumerate(backward):
+                if move_index // 3 == last_face:
+                    continue
+                child = bytes(getter(state))
+                key = pack_state(child)
+                if key in solutions:
+                    continue
+                child_solution = bytes((move_index,)) + solution
+                solutions[key] = child_solution
+                found += 1
+                if current_depth < depth:
+                    next_layer.append((child, child_solution))
+        if verbose:
+            print(f"Depth {current_depth}: {found} new states")
+        layer = next_layer
+
+    record_size = PACKED_STATE_SIZE + depth
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as handle:
+        handle.write(HEADER.pack(MAGIC, VERSION, depth, record_size, len(solutions)))
+        for key in sorted(solutions):
+            solution = solutions[key]
+            handle.write(key + solution + bytes([NO_MOVE]) * (depth - len(solution)))
+    if verbose:
+        print(f"Wrote {len(solutions)} states to {path}")
+    return path
+
+
+class NeighborhoodTable:
+    """
+    Read-only view of a generated table, memory-mapped from disk
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: A file written by build_table
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.depth, self.record_size, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a neighborhood table")
+        self.lookups = 0
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, state):
+        """
+        Find the optimal solution of a state
+
+        Args:
+            state: A flat 54-sticker state (see cube_state)
+
+        Returns:
+            A list of moves, or None if the state is further than depth moves from solved
+        """
+        self.lookups += 1
+        key = pack_state(state)
+        data = self._map
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * self.record_size
+            probe = data[offset:offset + PACKED_STATE_SIZE]
+            if probe < key:
+                low = middle + 1
+            elif probe > key:
+                high = middle
+            else:
+                start = offset + PACKED_STATE_SIZE
+                solution = data[start:start + self.depth]
+                return [FACE_MOVES[code] for code in solution if code != NO_MOVE]
+        return None
+
+    def close(self):
+        """Release the memory map and the file"""
+        self._map.close()
+        self._file.close()
+
+
+_default_tables = {}
+
+
+def load_default_table(depth=DEFAULT_DEPTH):
+    """
+    Open the default table for a depth if it has been built
+
+    Returns:
+        A NeighborhoodTable shared between callers, or None if no table exists
+    """
+    if depth not in _default_tables:
+        path = default_table_path(depth)
+        _default_tables[depth] = NeighborhoodTable(path) if os.path.exists(path) else None
+    return _default_tables[depth]
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from cube_state import apply_moves
+
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DEPTH
+    start = time.perf_counter()
+    path = build_table(depth)
+    print(f"Built in {time.perf_counter() - start:.1f}s")
+
+    table = NeighborhoodTable(path)
+    for scramble in ["R U R' U'", "F R U R' U' F'", "R U2 D' B L'"]:
+        start = time.perf_counter()
+        solution = table.lookup(apply_moves(SOLVED_STATE, scramble))
+        elapsed = (time.perf_counter() - start) * 1e6
+        print(f"{scramble} -> {solution} ({elapsed:.0f} us)")
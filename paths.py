@@ -0,0 +1,10 @@
+"""
+Locations of files shared by several modules
+"""
+
+import os
+
+# Directory holding this package's modules and data files
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Generated tables and caches (neighborhood tables, generated move functions)
+TABLE_DIR = os.path.join(PACKAGE_DIR, "tables")
@@ -0,0 +1,280 @@
+"""
+Portfolio solving: several engines race on the same state in parallel processes
+
+Each strategy suits a different kind of position:
+
+    neighborhood_table   states a few moves from solved, answered by one lookup
+    last_layer           first two layers done, searched over last-layer algorithms
+    bidirectional        short scrambles, solved optimally by meet-in-the-middle search
+    heuristic            IDA* guided by the table and cubie-distance heuristics
+    layer_by_layer       anything else, through RubiksSolver
+
+Every answer is replayed on the state before it is accepted, so a strategy
+that gives up or returns a wrong sequence simply loses the race. The
+portfolio returns the first verified solution (or the shortest one found
+before the deadline) and terminates the processes still running. The
+metrics the winning worker recorded come back with its answer and are
+merged into the parent's REGISTRY.
+"""
+
+import contextlib
+import io
+import multiprocessing
+import queue
+import time
+from operator import itemgetter
+
+from algorithm_library import load_default_library
+from cube import STAGES
+from cube_state import (IDENTITY, MOVE_PERMUTATIONS, apply_moves,
+                        is_solved_state, state_from_cube)
+from solve_metrics import REGISTRY
+from solve_result import SolveResult, verify_solution
+from solver import RubiksSolver
+
+_U_TURNS = ["U", "U'", "U2"]
+_U_GETTERS = [(turn, itemgetter(*MOVE_PERMUTATIONS[turn])) for turn in _U_TURNS]
+
+_last_layer_steps = None
+
+
+def _load_last_layer_steps():
+    """
+    (moves, getter) for every last-layer search step, built on first use
+
+    One step is an optional U turn followed by an algorithm from the library
+    that keeps the first two layers intact. Building them loads and checks
+    algorithms.json, so it waits until a last-layer search needs them.
+    """
+    global _last_layer_steps
+    if _last_layer_steps is None:
+        algorithms = [algorithm.notation for algorithm in load_default_library()
+                      if algorithm.preserves("first_two_layers")]
+        _last_layer_steps = []
+        for turn in [""] + _U_TURNS:
+            for algorithm in algorithms:
+                moves = f"{turn} {algorithm}".strip()
+                _last_layer_steps.append((moves, itemgetter(*apply_moves(IDENTITY, moves))))
+    return _last_layer_steps
+
+
+def _first_two_layers_solved(state):
+    return all(state[index] == state[index // 9 * 9 + 4] for index in STAGES["first_two_layers"])
+
+
+def last_layer_search(state, max_steps=3):
+    """
+    Solve a state whose first two layers are done with known last-layer algorithms
+
+    Breadth-first over steps of (U turn, algorithm), finishing with a U turn.
+
+    Args:
+        state: A flat 54-sticker state
+        max_steps: Most algorithms chained
+
+    Returns:
+        A list of moves, or None if the first two layers are not solved or no
+        combination within max_steps solves the cube
+    """
+    if not _first_two_layers_solved(state):
+        return None
+
+    def finish(candidate):
+        if is_solved_state(candidate):
+            return []
+        for turn, getter in _U_GETTERS:
+            if is_solved_state(getter(candidate)):
+                return [turn]
+        return None
+
+    steps = _load_last_layer_steps()
+    layer = {tuple(state): []}
+    seen = set(layer)
+    for _ in range(max_steps + 1):
+        next_layer = {}
+        for candidate, path in layer.items():
+            ending = finish(candidate)
+            if ending is not None:
+                return [move for step in path for move in step.split()] + ending
+            for moves, getter in steps:
+                child = getter(candidate)
+                if child not in seen:
+                    seen.add(child)
+                    next_layer[child] = path + [moves]
+        layer = next_layer
+    return None
+
+
+def _table_strategy(state):
+    from neighborhood_table import load_default_table
+    table = load_default_table()
+    return table.lookup(state) if table is not None else None
+
+
+def _bidirectional_strategy(state):
+    from bidirectional_solver import BidirectionalSolver
+    return BidirectionalSolver(verbose=False).search(state)
+
+
+def _heuristic_strategy(state):
+    from heuristic_solver import HeuristicSolver
+    from heuristics import CubieDistanceHeuristic, MaxHeuristic, NeighborhoodHeuristic
+    from neighborhood_table import load_default_table
+    table = load_default_table()
+    heuristic = CubieDistanceHeuristic()
+    if table is not None:
+        heuristic = MaxHeuristic(NeighborhoodHeuristic(table), heuristic)
+    return HeuristicSolver(heuristic, verbose=False).search(state)
+
+
+def _layer_by_layer_strategy(state):
+    from cube_state import cube_from_state
+    cube = cube_from_state(state)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = RubiksSolver().solve(cube)
+    return result.moves if result.verified else None
+
+
+# Strategy name -> function from a flat state to a move list (or None)
+STRATEGIES = {
+    "neighborhood_table": _table_strategy,
+    "last_layer": last_layer_search,
+    "bidirectional": _bidirectional_strategy,
+    "heuristic": _heuristic_strategy,
+    "layer_by_layer": _layer_by_layer_strategy,
+}
+
+
+def _run_strategy(name, state, results):
+    """Worker process body: run one strategy and report (name, moves, seconds, error, metrics)"""
+    # Only this strategy's metrics go back to the parent
+    REGISTRY.reset()
+    start = time.perf_counter()
+    try:
+        moves = STRATEGIES[name](state)
+        error = None
+    except Exception as exception:
+        moves, error = None, repr(exception)
+    seconds = time.perf_counter() - start
+    REGISTRY.observe("strategy_latency_seconds", seconds, engine=name)
+    results.put((name, moves, seconds, error, REGISTRY.snapshot()))
+
+
+class PortfolioSolver(RubiksSolver):
+    """
+    Runs several strategies at once and keeps the best verified answer
+    """
+
+    def __init__(self, strategies=None, deadline=None, shortest=False, verbose=True):
+        """
+        Args:
+            strategies: Names from STRATEGIES to race (all of them by default)
+            deadline: Seconds to wait for answers (no limit by default)
+            shortest: Wait for every strategy (or the deadline) and keep the shortest
+                solution instead of returning the first verified one
+            verbose: Print the outcome of the race
+        """
+        super().__init__()
+        self.strategies = list(strategies or STRATEGIES)
+        self.deadline = deadline
+        self.shortest = shortest
+        self.verbose = verbose
+        self.last_engine = None
+        self.results = {}
+
+    def solve_state(self, state):
+        """
+        Race the strategies on a flat state
+
+        Returns:
+            (strategy name, moves) for the chosen verified solution, or None
+        """
+        self.results = {}
+        if is_solved_state(state):
+            return "already_solved", []
+
+        results = multiprocessing.Queue()
+        workers = {name: multiprocessing.Process(target=_run_strategy, args=(name, state, results), daemon=True)
+                   for name in self.strategies}
+        for worker in workers.values():
+            worker.start()
+
+        best = None
+        end = None if self.deadline is None else time.monotonic() + self.deadline
+        try:
+            while len(self.results) < len(workers):
+                timeout = None if end is None else end - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    break
+                try:
+                    name, moves, seconds, error, metrics = results.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                verified = moves is not None and verify_solution(state, moves)
+                self.results[name] = {"moves": moves, "seconds": seconds,
+                                      "verified": verified, "error": error, "metrics": metrics}
+                if verified and (best is None or len(moves) < len(best[1])):
+                    best = (name, list(moves))
+                    if not self.shortest:
+                        break
+        finally:
+            for worker in workers.values():
+                if worker.is_alive():
+                    worker.terminate()
+            for worker in workers.values():
+                worker.join()
+            results.close()
+        if best is not None:
+            REGISTRY.merge(self.results[best[0]]["metrics"])
+        return best
+
+    def solve(self, cube, scramble=""):
+        """
+        Solve the cube with the portfolio, applying the solution to it
+
+        Returns:
+            A SolveResult naming the winning strategy; if no strategy produced
+            a verified solution in time it is unverified with no moves, and
+            the cube is left unchanged
+        """
+        with self.tracker.solving(scramble):
+            with self.tracker.phase("portfolio"):
+                best = self.solve_state(state_from_cube(cube))
+
+            if best is None:
+                self.last_engine = None
+                self.tracker.finish_solve(False)
+                REGISTRY.record_solve(self.tracker, "portfolio", 0)
+                if self.verbose:
+                    print("No strategy found a verified solution in time")
+                return SolveResult.from_tracker(self.tracker, [], False, "portfolio")
+
+            name, moves = best
+            self.last_engine = name
+            if moves:
+                self._execute_moves(cube, " ".join(moves))
+            self.tracker.add_step(f"Portfolio ({name})", len(moves), "First verified solution"
+                                  if not self.shortest else "Shortest verified solution")
+            # Answers are only accepted once they have been replayed on the state
+            self.tracker.finish_solve(True)
+            REGISTRY.record_solve(self.tracker, "portfolio", len(moves))
+            if self.verbose:
+                print(f"Portfolio: {name} won with {len(moves)} moves "
+                      f"in {self.tracker.get_elapsed_time():.2f}s")
+            return SolveResult.from_tracker(self.tracker, moves, True, name)
+
+
+if __name__ == "__main__":
+    from cube import RubiksCube
+
+    for scramble in ["R U R' U'", "R U R' U R U2 R' U2 F R U R' U' F'",
+                     "R' F R F' R U2 R' U' R U' R' D2 B L2"]:
+        cube = RubiksCube()
+        cube.execute_moves(scramble)
+        result = PortfolioSolver(deadline=10.0).solve(cube, scramble)
+        print(f"{scramble} -> {' '.join(result.moves) or 'no solution'} "
+              f"({result.engine}, verified: {result.verified})")
+
+    winners = [engine for name, engine, _ in REGISTRY.snapshot()["histograms"]
+               if name == "strategy_latency_seconds"]
+    print(f"Metrics merged from the winning workers: {', '.join(winners)}")
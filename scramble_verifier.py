@@ -0,0 +1,303 @@
+"""
+Bulk verification and normalisation of scramble files, one scramble per line
+
+The lexer is a table of every accepted spelling of every move, built once
+at import: a line is split into tokens in C and each token maps through one
+lookup straight to its integer move code (cube_codec.MOVE_CODES), about five
+times faster than matching the tokens with a regular expression. Besides
+the spellings in ALL_MOVES the table accepts the common variants, which
+normalise to the canonical move:
+
+    R1, R3', R2', R'2    ->  R, R, R2, R2
+    R3, R1', R’          ->  R'
+
+Files are split into chunks that end on line boundaries; each chunk is read
+and scanned by a worker process and the results are consumed in file order,
+with only a few chunks in flight, so memory stays flat however large the
+file is. Bad lines are reported with their line number, the byte offset of
+the first bad token and the token itself.
+"""
+
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from cube_codec import MOVE_CODES
+from cube_state import ALL_MOVES
+
+# Bytes of the file each worker task reads and scans
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+# Bad lines kept in a report (all of them are counted)
+DEFAULT_MAX_BAD_LINES = 1000
+
+# Spellings of a move's suffix -> quarter turns clockwise
+_SUFFIX_TURNS = {"": 1, "1": 1, "3'": 1, "3’": 1,
+                 "2": 2, "2'": 2, "'2": 2, "2’": 2, "’2": 2,
+                 "'": 3, "’": 3, "3": 3, "1'": 3, "1’": 3}
+_CANONICAL_SUFFIX = {1: "", 2: "2", 3: "'"}
+
+
+def _build_spellings():
+    """Every accepted spelling, as UTF-8 bytes -> move code"""
+    spellings = {}
+    for base in dict.fromkeys(move.rstrip("'2") for move in ALL_MOVES):
+        for suffix, turns in _SUFFIX_TURNS.items():
+            spellings[(base + suffix).encode()] = MOVE_CODES[base + _CANONICAL_SUFFIX[turns]]
+    return spellings
+
+
+_SPELLINGS = _build_spellings()
+_lookup = _SPELLINGS.__getitem__
+_MOVE_NAMES = [move.encode() for move in ALL_MOVES]
+_TOKEN = re.compile(rb"\S+")
+
+
+def _first_bad_token(line):
+    """(byte column, token) of the first token of a line that is not a move"""
+    for match in _TOKEN.finditer(line):
+        if match.group() not in _SPELLINGS:
+            return match.start(), match.group()
+    return None
+
+
+def parse_scramble(scramble):
+    """
+    Tokenise a scramble into move codes
+
+    Args:
+        scramble: A space separated move string (str or UTF-8 bytes)
+
+    Returns:
+        bytes with one move code per move (see cube_codec.decode_solution)
+
+    Raises:
+        ValueError: If a token is not a move
+    """
+    line = scramble.encode() if isinstance(scramble, str) else bytes(scramble)
+    try:
+        return bytes(map(_lookup, line.split()))
+    except KeyError:
+        column, token = _first_bad_token(line)
+        raise ValueError(f"Unknown move {token.decode(errors='replace')!r} at column {column + 1}") from None
+
+
+def normalize_scramble(scramble):
+    """
+    Rewrite a scramble with canonical spellings and single spaces, e.g. "R1  U3 R2'" -> "R U' R2"
+
+    Raises:
+        ValueError: If a token is not a move
+    """
+    return " ".join(ALL_MOVES[code] for code in parse_scramble(scramble))
+
+
+class VerifyReport:
+    """Totals of a verified file and its first bad lines"""
+
+    __slots__ = ("path", "lines", "moves", "bad_count", "bad_lines", "elapsed")
+
+    def __init__(self, path):
+        self.path = path
+        self.lines = 0
+        self.moves = 0
+        self.bad_count = 0
+        # (line number, byte offset of the bad token, token) in file order
+        self.bad_lines = []
+        self.elapsed = 0.0
+
+    @property
+    def ok(self):
+        return not self.bad_count
+
+    def __repr__(self):
+        return (f"VerifyReport(path={self.path!r}, lines={self.lines}, moves={self.moves}, "
+                f"bad_count={self.bad_count})")
+
+
+def _chunk_bounds(path, chunk_size):
+    """(start, end) byte ranges of roughly chunk_size, each ending after a newline or at the end of the file"""
+    size = os.path.getsize(path)
+    bounds = []
+    with open(path, "rb") as handle:
+        start = 0
+        while start < size:
+            end = start + chunk_size
+            if end >= size:
+                end = size
+            else:
+                handle.seek(end - 1)
+                handle.readline()
+                end = handle.tell()
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+
+def _scan_chunk(path, start, end, keep):
+    """
+    Lex every line of a byte range of a file
+
+    Args:
+        keep: "text" to return the normalised good lines, "codes" to return
+            (offset, move codes) of every good line, None for counts only
+
+    Returns:
+        (lines, moves, bad lines as (line index in the chunk, offset, token), kept output)
+    """
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        data = handle.read(end - start)
+    lines = data.split(b"\n")
+    if lines[-1] == b"":
+        lines.pop()
+
+    lookup = _lookup
+    name = _MOVE_NAMES.__getitem__
+    moves = 0
+    bad = []
+    kept = []
+    offset = start
+    for index, line in enumerate(lines):
+        try:
+            codes = bytes(map(lookup, line.split()))
+        except KeyError:
+            column, token = _first_bad_token(line)
+            bad.append((index, offset + column, token.decode(errors="replace")))
+        else:
+            moves += len(codes)
+            if keep == "text":
+                kept.append(b" ".join(map(name, codes)))
+            elif keep == "codes":
+                kept.append((offset, codes))
+        offset += len(line) + 1
+
+    if keep == "text":
+        kept = b"\n".join(kept) + b"\n" if kept else b""
+    return len(lines), moves, bad, kept
+
+
+def _scan(path, keep, chunk_size, workers):
+    """Results of _scan_chunk for every chunk of a file, in file order"""
+    bounds = _chunk_bounds(path, chunk_size)
+    workers = min(workers or os.cpu_count() or 1, len(bounds))
+    if workers <= 1:
+        for start, end in bounds:
+            yield _scan_chunk(path, start, end, keep)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for start, end in bounds:
+            pending.append(executor.submit(_scan_chunk, path, start, end, keep))
+            # Keep every worker busy without reading ahead of the consumer
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def verify_file(path, output=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+                max_bad_lines=DEFAULT_MAX_BAD_LINES, verbose=True):
+    """
+    Check every line of a scramble file, optionally writing the normalised scrambles
+
+    Args:
+        path: Text file with one scramble per line
+        output: File to write the good lines to, normalised, in input order
+            (bad lines are left out)
+        chunk_size: Bytes scanned by each worker task
+        workers: Worker processes (one per CPU by default)
+        max_bad_lines: Bad lines kept in the report
+        verbose: Print a summary and the first bad lines
+
+    Returns:
+        A VerifyReport
+    """
+    report = VerifyReport(path)
+    start = time.perf_counter()
+    handle = None
+    if output is not None:
+        temporary = f"{output}.tmp"
+        handle = open(temporary, "wb")
+    try:
+        for lines, moves, bad, kept in _scan(path, "text" if handle else None, chunk_size, workers):
+            room = max_bad_lines - len(report.bad_lines)
+            report.bad_lines.extend((report.lines + index + 1, offset, token)
+                                    for index, offset, token in bad[:max(room, 0)])
+            report.bad_count += len(bad)
+            report.lines += lines
+            report.moves += moves
+            if handle:
+                handle.write(kept)
+    finally:
+        if handle:
+            handle.close()
+    if output is not None:
+        os.replace(temporary, output)
+    report.elapsed = time.perf_counter() - start
+
+    if verbose:
+        rate = report.lines / report.elapsed if report.elapsed else 0
+        print(f"{path}: {report.lines} lines, {report.moves} moves, {report.bad_count} bad lines "
+              f"({report.elapsed:.2f}s, {rate:,.0f} lines/s)")
+        for line_number, offset, token in report.bad_lines[:10]:
+            print(f"  line {line_number} (byte {offset}): unknown move {token!r}")
+    return report
+
+
+def iter_scrambles(path, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    """
+    Stream the move codes of every good line of a scramble file
+
+    Yields:
+        (byte offset of the line, bytes of move codes) in file order; bad
+        lines are skipped (verify_file reports them)
+    """
+    for _, _, _, records in _scan(path, "codes", chunk_size, workers):
+        yield from records
+
+
+if __name__ == "__main__":
+    import random
+    import tempfile
+
+    from utils import validate_moves_sequence
+
+    print(normalize_scramble("R1  U3 R2' F’ Rw3 x'2"))
+    try:
+        parse_scramble("R U Q R'")
+    except ValueError as error:
+        print(error)
+
+    rng = random.Random(0)
+    moves = ALL_MOVES[:18]
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "scrambles.txt")
+    with open(path, "w") as handle:
+        for number in range(1, 500001):
+            scramble = " ".join(rng.choice(moves) for _ in range(20))
+            if number % 100000 == 0:
+                scramble += " Q2"
+            handle.write(scramble + "\n")
+
+    start = time.perf_counter()
+    with open(path) as handle:
+        valid = sum(validate_moves_sequence(line) for line in handle)
+    print(f"validate_moves_sequence per line: {valid} valid ({time.perf_counter() - start:.2f}s)")
+
+    verify_file(path, workers=1, chunk_size=1024 * 1024)
+    report = verify_file(path, output=os.path.join(directory, "normalized.txt"), chunk_size=1024 * 1024)
+    assert report.bad_count == 5 and report.lines == 500000
+
+    first_offset, first_codes = next(iter_scrambles(path, workers=1))
+    with open(path, "rb") as handle:
+        assert parse_scramble(handle.readline()) == first_codes and first_offset == 0
+    with open(path, "rb") as handle:
+        handle.seek(report.bad_lines[0][1])
+        assert handle.read(2) == b"Q2"
+
+    os.remove(path)
+    os.remove(os.path.join(directory, "normalized.txt"))
+    os.rmdir(directory)
@@ -0,0 +1,113 @@
+"""
+The solve() flow shared by the search engines
+
+A search engine only has to find face turns for a flat state whose centres
+are home; SearchSolverMixin turns that into a full search and solve:
+orienting states moved by slice, wide or rotation moves, tracking, the
+search phase, falling back to the layer-by-layer solver when the search
+gives up, applying and verifying the moves, metrics and the SolveResult. An
+engine provides:
+
+    _search_face_turns(state, deadline)
+                           a list of face turns, or None when it gives up
+    engine, step_name      labels for the metrics, result and tracker step
+    tracker, verbose,      set in __init__ like the other solvers
+    fallback, last_engine
+    nodes_expanded         the work done by the last search
+
+and may override _run_search, _step_description, _give_up_reason and
+_search_summary for anything engine specific.
+"""
+
+from cube_state import orient_state, state_from_cube
+from solve_metrics import REGISTRY
+from solve_result import SolveResult, verify_solution
+from solve_tracker import NODES_EXPANDED
+from solver import RubiksSolver
+
+
+class SearchSolverMixin:
+    """
+    solve() for classes that implement search()
+    """
+
+    # Name recorded in the metrics and the SolveResult, e.g. "bidirectional"
+    engine = None
+    # Name of the tracker step, e.g. "Bidirectional search"
+    step_name = None
+
+    def search(self, state, deadline=None):
+        """
+        Search for a solution without touching any cube
+
+        Face turns never move the centres, so a state whose centres are off
+        home (after M, x or Rw, say) is first turned with a whole-cube
+        rotation, which then starts the solution.
+
+        Args:
+            state: A flat 54-sticker state (see cube_state)
+            deadline: time.perf_counter() value at which to give up (no limit by default)
+
+        Returns:
+            A list of moves, or None if no solution was found within the limits
+            (timed_out tells whether the deadline was the reason)
+        """
+        oriented = orient_state(state)
+        if oriented is None:
+            self.nodes_expanded = 0
+            return None
+        rotation, state = oriented
+        moves = self._search_face_turns(state, deadline)
+        return None if moves is None else rotation + moves
+
+    def _run_search(self, cube, scramble):
+        """The moves that solve the cube, or None (searches the flat state by default)"""
+        return self.search(state_from_cube(cube))
+
+    def _step_description(self, moves):
+        """Description of the tracker step for a found solution"""
+        return ""
+
+    def _give_up_reason(self):
+        """Why the last search found nothing, printed before falling back"""
+        return "No solution found"
+
+    def _search_summary(self):
+        """Work done by the last search, printed with a found solution"""
+        return f"{self.nodes_expanded} nodes expanded"
+
+    def solve(self, cube, scramble=""):
+        """
+        Solve the cube, applying the solution to it
+
+        Args:
+            cube: The Rubik's cube
+            scramble: The scramble string, passed on to the fallback solver
+
+        Returns:
+            A SolveResult (from the fallback solver if the search gave up)
+        """
+        with self.tracker.solving(scramble):
+            start = cube.copy()
+            with self.tracker.phase(self.step_name.lower()):
+                moves = self._run_search(cube, scramble)
+            self.tracker.count(NODES_EXPANDED, self.nodes_expanded)
+            if moves is None:
+                self.tracker.finish_solve(False)
+                if self.verbose:
+                    print(f"{self._give_up_reason()}, falling back to layer-by-layer solver")
+                self.last_engine = "fallback"
+                fallback = self.fallback if self.fallback is not None else RubiksSolver()
+                return fallback.solve(cube, scramble)
+
+            self.last_engine = self.engine
+            if moves:
+                cube.execute_moves(" ".join(moves))
+            self.tracker.add_step(self.step_name, len(moves), self._step_description(moves))
+            with self.tracker.phase("verification"):
+                verified = verify_solution(start, moves)
+            self.tracker.finish_solve(verified)
+            REGISTRY.record_solve(self.tracker, self.engine, len(moves))
+            if self.verbose:
+                print(f"{self.step_name} found a {len(moves)}-move solution ({self._search_summary()})")
+            return SolveResult.from_tracker(self.tracker, moves, verified, self.engine)
@@ -0,0 +1,249 @@
+"""
+Process-wide metrics aggregated across many solves
+
+Every solver reports its finished SolveTracker to the shared REGISTRY, which
+keeps counters, latency and solution-length histograms and per-phase time
+totals. Updates are guarded by a lock so solves can run on several threads.
+Worker processes send registry.snapshot() back to the parent, which combines
+them with merge(). The registry can be dumped as JSON or Prometheus text.
+"""
+
+import threading
+import time
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+LENGTH_BUCKETS = (0, 5, 10, 15, 20, 25, 30, 40, 60, 80, 100, 150)
+
+PREFIX = "rubiks"
+
+
+class Histogram:
+    """Histogram with fixed upper bounds, made cumulative when exported"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # the last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Add one observation"""
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+        self.count += 1
+
+    def to_dict(self):
+        return {"buckets": list(self.buckets), "counts": list(self.counts),
+                "sum": self.total, "count": self.count}
+
+    def merge(self, data):
+        """Add the observations of a histogram exported with to_dict"""
+        if tuple(data["buckets"]) != self.buckets:
+            raise ValueError("Cannot merge histograms with different buckets")
+        for index, value in enumerate(data["counts"]):
+            self.counts[index] += value
+        self.total += data["sum"]
+        self.count += data["count"]
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of counters, histograms and phase timings
+
+    Metrics are keyed by name and an optional engine label, e.g.
+    ("solves_total", "bidirectional").
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.phase_ns = {}
+            self.first_solve = None
+            self.last_solve = None
+
+    def increment(self, name, amount=1, engine=""):
+        """Increase a counter"""
+        with self._lock:
+            key = (name, engine)
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, engine=""):
+        """Add an observation to a histogram, creating it on first use"""
+        with self._lock:
+            self._histogram(name, engine, buckets).observe(value)
+
+    def _histogram(self, name, engine, buckets):
+        key = (name, engine)
+        if key not in self.histograms:
+            self.histograms[key] = Histogram(buckets)
+        return self.histograms[key]
+
+    def record_solve(self, tracker, engine, solution_length=None):
+        """
+        Fold a finished SolveTracker into the registry
+
+        Args:
+            tracker: The tracker of the finished solve
+            engine: Name of the engine that produced the solution
+            solution_length: Number of moves returned (tracker.total_moves if not given)
+        """
+        if solution_length is None:
+            solution_length = tracker.total_moves
+        now = time.time()
+        with self._lock:
+            for name, amount in (("solves_total", 1),
+                                 ("solves_succeeded_total", 1 if tracker.is_complete else 0)):
+                key = (name, engine)
+                self.counters[key] = self.counters.get(key, 0) + amount
+            for name, amount in tracker.counters.items():
+                key = (f"{name}_total", engine)
+                self.counters[key] = self.counters.get(key, 0) + amount
+
+            self._histogram("solve_latency_seconds", engine, LATENCY_BUCKETS).observe(
+                tracker.get_elapsed_ns() / 1e9)
+            self._histogram("solution_length_moves", engine, LENGTH_BUCKETS).observe(solution_length)
+
+            for phase in tracker.phases:
+                totals = self.phase_ns.setdefault(phase["name"], [0, 0, 0])
+                totals[0] += phase["wall_ns"]
+                totals[1] += phase["cpu_ns"]
+                totals[2] += 1
+
+            if self.first_solve is None:
+                self.first_solve = now
+            self.last_solve = now
+
+    def throughput(self):
+        """
+        Solves per second between the first and the last recorded solve
+
+        With a single solve (or several recorded at the same instant) the
+        time since the first one is used instead, so one solve still counts.
+        """
+        with self._lock:
+            solves = sum(value for (name, _), value in self.counters.items() if name == "solves_total")
+            if not solves or self.first_solve is None:
+                return 0.0
+            elapsed = self.last_solve - self.first_solve
+            if elapsed <= 0:
+                elapsed = time.time() - self.first_solve
+            return solves / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self):
+        """
+        Export everything as plain data, e.g. to send from a worker process
+
+        Returns:
+            A JSON-serialisable dictionary accepted by merge()
+        """
+        with self._lock:
+            return {
+                "counters": [[name, engine, value] for (name, engine), value in self.counters.items()],
+                "histograms": [[name, engine, histogram.to_dict()]
+                               for (name, engine), histogram in self.histograms.items()],
+                "phases": {name: list(totals) for name, totals in self.phase_ns.items()},
+                "first_solve": self.first_solve,
+                "last_solve": self.last_solve,
+            }
+
+    def merge(self, snapshot):
+        """Add the metrics of another registry's snapshot to this one"""
+        with self._lock:
+            for name, engine, value in snapshot["counters"]:
+                key = (name, engine)
+                self.counters[key] = self.counters.get(key, 0) + value
+            for name, engine, data in snapshot["histograms"]:
+                self._histogram(name, engine, data["buckets"]).merge(data)
+            for name, totals in snapshot["phases"].items():
+                mine = self.phase_ns.setdefault(name, [0, 0, 0])
+                for index, value in enumerate(totals):
+                    mine[index] += value
+            if snapshot["first_solve"] is not None:
+                if self.first_solve is None or snapshot["first_solve"] < self.first_solve:
+                    self.first_solve = snapshot["first_solve"]
+                if self.last_solve is None or snapshot["last_solve"] > self.last_solve:
+                    self.last_solve = snapshot["last_solve"]
+
+    def to_json(self):
+        """Dump the registry as JSON, including the current throughput"""
+        import json
+        data = self.snapshot()
+        data["throughput_per_second"] = self.throughput()
+        return json.dumps(data, indent=2)
+
+    def to_prometheus(self):
+        """Dump the registry in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+
+        counters = {}
+        for name, engine, value in snapshot["counters"]:
+            counters.setdefault(name, []).append((engine, value))
+        for name in sorted(counters):
+            lines.append(f"# TYPE {PREFIX}_{name} counter")
+            for engine, value in sorted(counters[name]):
+                lines.append(f"{PREFIX}_{name}{_labels(engine)} {value}")
+
+        histograms = {}
+        for name, engine, data in snapshot["histograms"]:
+            histograms.setdefault(name, []).append((engine, data))
+        for name in sorted(histograms):
+            lines.append(f"# TYPE {PREFIX}_{name} histogram")
+            for engine, data in sorted(histograms[name], key=lambda item: item[0]):
+                cumulative = 0
+                bounds = [str(bound) for bound in data["buckets"]] + ["+Inf"]
+                for bound, count in zip(bounds, data["counts"]):
+                    cumulative += count
+                    lines.append(f"{PREFIX}_{name}_bucket{_labels(engine, le=bound)} {cumulative}")
+                lines.append(f"{PREFIX}_{name}_sum{_labels(engine)} {data['sum']}")
+                lines.append(f"{PREFIX}_{name}_count{_labels(engine)} {data['count']}")
+
+        if snapshot["phases"]:
+            lines.append(f"# TYPE {PREFIX}_phase_wall_seconds_total counter")
+            for name, (wall_ns, _, _) in sorted(snapshot["phases"].items()):
+                lines.append(f'{PREFIX}_phase_wall_seconds_total{{phase="{name}"}} {wall_ns / 1e9}')
+            lines.append(f"# TYPE {PREFIX}_phase_cpu_seconds_total counter")
+            for name, (_, cpu_ns, _) in sorted(snapshot["phases"].items()):
+                lines.append(f'{PREFIX}_phase_cpu_seconds_total{{phase="{name}"}} {cpu_ns / 1e9}')
+
+        lines.append(f"# TYPE {PREFIX}_solves_per_second gauge")
+        lines.append(f"{PREFIX}_solves_per_second {self.throughput()}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(engine, **extra):
+    """Format Prometheus labels, skipping an empty engine"""
+    labels = {"engine": engine} if engine else {}
+    labels.update(extra)
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+# Shared by every solver in the process
+REGISTRY = MetricsRegistry()
+
+
+if __name__ == "__main__":
+    from cube import RubiksCube
+    from bidirectional_solver import BidirectionalSolver
+    # Solvers report to the imported module, not to this script's own copy
+    from solve_metrics import REGISTRY
+
+    for scramble in ["R U R' U'", "F R U R' U' F'", "R U R' U R U2 R'"]:
+        cube = RubiksCube()
+        cube.execute_moves(scramble)
+        BidirectionalSolver(verbose=False).solve(cube)
+
+    print(REGISTRY.to_prometheus())
@@ -0,0 +1,96 @@
+"""
+Outcome of a solve, checked by replaying the solution
+
+Every solver returns a SolveResult instead of a bare move list. The
+verified flag comes from replaying the moves on a copy of the starting
+position through the fast move path, never from the solver's own opinion,
+so batch pipelines can filter out failed solves.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from cube_state import MOVE_PERMUTATIONS, apply_moves, is_solved_state
+from solve_tracker import NODES_EXPANDED
+
+
+def verify_solution(start, moves):
+    """
+    Check that a move list solves a position
+
+    Args:
+        start: A RubiksCube (left untouched) or a flat 54-sticker state
+        moves: A list of moves
+
+    Returns:
+        True if applying the moves to the position solves it
+    """
+    if any(move not in MOVE_PERMUTATIONS for move in moves):
+        return False
+    if hasattr(start, "copy") and hasattr(start, "execute_moves"):
+        replay = start.copy()
+        if moves:
+            replay.execute_moves(" ".join(moves))
+        return replay.is_solved()
+    return is_solved_state(apply_moves(start, moves))
+
+
+class SolveResult:
+    """What a solver returned, and whether it really solves the cube"""
+
+    # A plain class rather than a dataclass: importing dataclasses costs
+    # several milliseconds of startup in every short-lived worker
+    __slots__ = ("moves", "verified", "engine", "scramble", "elapsed",
+                 "cpu_time", "nodes_expanded", "counters")
+
+    def __init__(self, moves: List[str], verified: bool, engine: str, scramble: str = "",
+                 elapsed: float = 0.0, cpu_time: float = 0.0, nodes_expanded: int = 0,
+                 counters: Optional[Dict[str, int]] = None):
+        self.moves = moves
+        self.verified = verified
+        self.engine = engine
+        self.scramble = scramble
+        self.elapsed = elapsed
+        self.cpu_time = cpu_time
+        self.nodes_expanded = nodes_expanded
+        self.counters = {} if counters is None else counters
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"SolveResult({fields})"
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    @classmethod
+    def from_tracker(cls, tracker, moves, verified, engine):
+        """Build a result with the timings and work counters of a finished SolveTracker"""
+        return cls(
+            moves=list(moves),
+            verified=verified,
+            engine=engine,
+            scramble=tracker.scramble,
+            elapsed=tracker.get_elapsed_time(),
+            cpu_time=tracker.get_cpu_ns() / 1e9,
+            nodes_expanded=tracker.counters.get(NODES_EXPANDED, 0),
+            counters=dict(tracker.counters),
+        )
+
+    @property
+    def length(self) -> int:
+        return len(self.moves)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain data for JSON lines or a metrics pipeline"""
+        return {
+            "moves": " ".join(self.moves),
+            "verified": self.verified,
+            "engine": self.engine,
+            "scramble": self.scramble,
+            "length": self.length,
+            "elapsed": self.elapsed,
+            "cpu_time": self.cpu_time,
+            "nodes_expanded": self.nodes_expanded,
+            "counters": dict(self.counters),
+        }
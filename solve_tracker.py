@@ -1,29 +1,103 @@
 """
 Tracks the solving process of a Rubik's Cube with detailed step information
+
+Besides the named steps shown to the user, the tracker records wall and CPU
+time per phase and counts the work done (moves applied, is_solved calls,
+nodes expanded, table lookups). Counters are plain dictionary increments so
+the tracker can stay on in production. cProfile and tracemalloc capture are
+optional and off by default; their modules are only imported when used,
+so importing the tracker stays cheap.
 """
 
 import time
+from contextlib import contextmanager
 from typing import List, Dict, Any
 
+# Counter names used by the solvers
+MOVES_APPLIED = "moves_applied"
+IS_SOLVED_CALLS = "is_solved_calls"
+NODES_EXPANDED = "nodes_expanded"
+TABLE_LOOKUPS = "table_lookups"
+TABLE_HITS = "table_hits"
+
+
 class SolveTracker:
-    def __init__(self):
-        """Initialize a new solve tracking session"""
+    def __init__(self, profile: bool = False, trace_memory: bool = False):
+        """
+        Initialize a new solve tracking session
+        
+        Args:
+            profile: Run cProfile for the duration of each solve
+            trace_memory: Record peak memory with tracemalloc during each solve
+        """
         self.start_time = None
         self.end_time = None
         self.total_moves = 0
         self.steps = []
         self.scramble = ""
         self.is_complete = False
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.counters: Dict[str, int] = {}
+        self.phases: List[Dict[str, Any]] = []
+        self.peak_memory = None
+        self._profiler = None
+        # Whether this tracker turned tracemalloc on and so must turn it off
+        self._started_tracing = False
+        self._start_ns = None
+        self._end_ns = None
+        self._start_cpu_ns = None
+        self._end_cpu_ns = None
     
     def start_solve(self, scramble=""):
         """Start tracking a new solve with the given scramble"""
         self.start_time = time.time()
+        self.end_time = None
         self.scramble = scramble
         self.steps = []
         self.total_moves = 0
         self.is_complete = False
+        self.counters = {}
+        self.phases = []
+        self.peak_memory = None
+        self._end_ns = None
+        self._end_cpu_ns = None
+        
+        if self.trace_memory:
+            import tracemalloc
+            # When another tracker (or the caller) is already tracing, its peak
+            # is left alone, so the peak recorded here is an upper bound
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            elif self._started_tracing:
+                tracemalloc.reset_peak()
+        if self.profile:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        
+        self._start_cpu_ns = time.process_time_ns()
+        self._start_ns = time.perf_counter_ns()
         return self
     
+    @contextmanager
+    def solving(self, scramble=""):
+        """
+        Track a solve, turning profiling and memory tracing off even if it raises
+        
+        Usage:
+            with tracker.solving(scramble):
+                ...
+                tracker.finish_solve(verified)
+        """
+        self.start_solve(scramble)
+        try:
+            yield self
+        finally:
+            # Already done by finish_solve unless the solve raised
+            self._stop_capture()
+    
     def add_step(self, name: str, moves: int, description: str = ""):
         """Add a solving step with the number of moves used"""
         self.steps.append({
@@ -35,18 +109,73 @@ class SolveTracker:
         self.total_moves += moves
         return self
     
+    def count(self, name: str, amount: int = 1):
+        """Increase a work counter such as MOVES_APPLIED or NODES_EXPANDED"""
+        self.counters[name] = self.counters.get(name, 0) + amount
+    
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Time a block of the solve
+        
+        Usage:
+            with tracker.phase("white cross"):
+                ...
+        """
+        start_cpu = time.process_time_ns()
+        start = time.perf_counter_ns()
+        try:
+            yield self
+        finally:
+            self.phases.append({
+                "name": name,
+                "wall_ns": time.perf_counter_ns() - start,
+                "cpu_ns": time.process_time_ns() - start_cpu,
+            })
+    
     def finish_solve(self, success: bool = True):
         """Mark the solve as complete and record the end time"""
+        self._end_ns = time.perf_counter_ns()
+        self._end_cpu_ns = time.process_time_ns()
         self.end_time = time.time()
         self.is_complete = success
+        
+        if self.trace_memory:
+            import tracemalloc
+            if tracemalloc.is_tracing():
+                self.peak_memory = tracemalloc.get_traced_memory()[1]
+        self._stop_capture()
         return self
     
+    def _stop_capture(self):
+        """Turn off the profiler and the tracing this tracker turned on"""
+        if self._profiler is not None:
+            self._profiler.disable()
+        # Only the tracker that turned tracing on turns it off, so a nested
+        # tracker cannot stop it under an outer one
+        if self._started_tracing:
+            import tracemalloc
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self._started_tracing = False
+    
+    def get_elapsed_ns(self) -> int:
+        """Get the wall time of the solve in nanoseconds"""
+        if self._start_ns is None:
+            return 0
+        end = self._end_ns if self._end_ns is not None else time.perf_counter_ns()
+        return end - self._start_ns
+    
+    def get_cpu_ns(self) -> int:
+        """Get the CPU time of the solve in nanoseconds"""
+        if self._start_cpu_ns is None:
+            return 0
+        end = self._end_cpu_ns if self._end_cpu_ns is not None else time.process_time_ns()
+        return end - self._start_cpu_ns
+    
     def get_elapsed_time(self) -> float:
         """Get the elapsed time of the solve in seconds"""
-        if self.start_time is None:
-            return 0.0
-        end = self.end_time if self.end_time is not None else time.time()
-        return end - self.start_time
+        return self.get_elapsed_ns() / 1e9
     
     def get_summary(self) -> Dict[str, Any]:
         """Get a summary of the solve"""
@@ -54,10 +183,51 @@ class SolveTracker:
             "scramble": self.scramble,
             "total_moves": self.total_moves,
             "elapsed_time": self.get_elapsed_time(),
+            "cpu_time": self.get_cpu_ns() / 1e9,
             "is_complete": self.is_complete,
-            "steps": self.steps
+            "steps": self.steps,
+            "phases": self.phases,
+            "counters": dict(self.counters),
+            "peak_memory": self.peak_memory,
         }
     
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Export the solve as flat records, one for the solve and one per phase
+        
+        Returns:
+            A list of dictionaries ready for JSON lines, CSV or a metrics pipeline
+        """
+        records = [{
+            "type": "solve",
+            "started_at": self.start_time,
+            "scramble": self.scramble,
+            "success": self.is_complete,
+            "total_moves": self.total_moves,
+            "wall_ns": self.get_elapsed_ns(),
+            "cpu_ns": self.get_cpu_ns(),
+            "peak_memory": self.peak_memory,
+            **self.counters,
+        }]
+        for phase in self.phases:
+            records.append({"type": "phase", "started_at": self.start_time, **phase})
+        return records
+    
+    def export_json(self) -> str:
+        """Export the records as JSON lines"""
+        import json
+        return "\n".join(json.dumps(record) for record in self.to_records())
+    
+    def get_profile_stats(self, limit: int = 20) -> str:
+        """Get the cProfile report of the last solve (requires profile=True)"""
+        if self._profiler is None:
+            return ""
+        import io
+        import pstats
+        output = io.StringIO()
+        pstats.Stats(self._profiler, stream=output).sort_stats("cumulative").print_stats(limit)
+        return output.getvalue()
+    
     def print_solve_progress(self) -> None:
         """Print the solve progress in a formatted way"""
         print(f"> Initializing cube state...")
@@ -73,3 +243,12 @@ class SolveTracker:
         else:
             print(f"> Solve incomplete after {self.total_moves} moves")
             print(f"> Elapsed time: {self.get_elapsed_time():.2f} seconds")
+    
+    def print_profile(self) -> None:
+        """Print phase timings and work counters"""
+        for phase in self.phases:
+            print(f"> {phase['name']}: {phase['wall_ns'] / 1e6:.2f} ms wall, {phase['cpu_ns'] / 1e6:.2f} ms CPU")
+        for name, value in sorted(self.counters.items()):
+            print(f"> {name}: {value}")
+        if self.peak_memory is not None:
+            print(f"> Peak memory: {self.peak_memory / 1024:.1f} KiB")
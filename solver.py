@@ -1,6 +1,24 @@
-from cube import RubiksCube
-import random
-from solve_tracker import SolveTracker
+from cube import RubiksCube, PIECE_SLOTS
+import time
+from solve_tracker import (SolveTracker, MOVES_APPLIED, IS_SOLVED_CALLS, NODES_EXPANDED,
+                           TABLE_LOOKUPS, TABLE_HITS)
+from solve_metrics import REGISTRY
+from cube_state import SOLVED_STATE, apply_moves, inverse_move, simplify_moves, state_from_cube
+from solve_result import SolveResult, verify_solution
+from topology import PARTNERS, PIECE_INDEX, PIECE_SIZE, PIECE_STICKERS, POSITIONS
+
+
+def _piece_positions(*names):
+    """(face, row, col) of each named piece's stickers, U/D sticker first and corners clockwise"""
+    return [tuple(POSITIONS[index] for index in PIECE_STICKERS[PIECE_INDEX[name]]) for name in names]
+
+
+# Bottom corners in the order the white corners are solved, then the top corners and edges
+BOTTOM_CORNERS = _piece_positions("DLF", "DFR", "DRB", "DBL")
+TOP_CORNERS = _piece_positions("ULB", "UBR", "URF", "UFL")
+TOP_EDGES = _piece_positions("UB", "UR", "UF", "UL")
+# Longest run of solution moves the anytime solve tries to replace by a shorter one
+ANYTIME_WINDOW = 10
 
 class RubiksSolver:
     """
@@ -15,12 +33,46 @@ class RubiksSolver:
     6. Permute the last layer - place all pieces in their final positions
     """
     
-    def __init__(self):
-        """Initialize the solver with an empty solution"""
+    def __init__(self, neighborhood_table=None, algorithms=None):
+        """
+        Initialize the solver with an empty solution
+        
+        Args:
+            neighborhood_table: Table of near-solved states checked before any search
+                (the default table is used if it has been built)
+            algorithms: AlgorithmLibrary the solver's algorithms are taken from
+                (the library in algorithms.json by default)
+        """
         self.solution_moves = []
         self.tracker = SolveTracker()
+        self._neighborhood_table = neighborhood_table
+        self._table_loaded = neighborhood_table is not None
+        self._algorithms = algorithms
+    
+    @property
+    def neighborhood_table(self):
+        """The lookup table, opened on first use so building a solver stays cheap"""
+        if not self._table_loaded:
+            from neighborhood_table import load_default_table
+            self._neighborhood_table = load_default_table()
+            self._table_loaded = True
+        return self._neighborhood_table
+    
+    @neighborhood_table.setter
+    def neighborhood_table(self, table):
+        self._neighborhood_table = table
+        self._table_loaded = True
+    
+    @property
+    def algorithms(self):
+        """The algorithm library, loaded on first use"""
+        if self._algorithms is None:
+            from algorithm_library import load_default_library
+            self._algorithms = load_default_library()
+        return self._algorithms
     
     def scramble_cube(self, cube, num_moves=20):
+        import random
         moves = ["U", "U'", "U2", "D", "D'", "D2", 
                 "R", "R'", "R2", "L", "L'", "L2",
                 "F", "F'", "F2", "B", "B'", "B2"]
@@ -33,9 +85,27 @@ class RubiksSolver:
         
         return " ".join(scramble_sequence)
     
+    def _execute_moves(self, cube, moves):
+        """Apply moves to the cube, counting them in the tracker"""
+        self.tracker.count(MOVES_APPLIED, len(moves.split()))
+        cube.execute_moves(moves)
+    
+    def _apply_algorithm(self, cube, name):
+        """Apply a library algorithm to the cube as one operation and return its moves"""
+        algorithm = self.algorithms[name]
+        self._execute_moves(cube, algorithm.notation)
+        return list(algorithm.moves)
+    
+    def _is_solved(self, cube):
+        """Check if the cube is solved, counting the call in the tracker"""
+        self.tracker.count(IS_SOLVED_CALLS)
+        return cube.is_solved()
+    
     def solve_white_cross(self, cube):
         moves = []
         print("Solving white cross...")
+        if cube.is_stage_solved("cross"):
+            return moves
         
         white_edges = [
             ((0, 0, 1), (2, 2, 1)),
@@ -45,15 +115,15 @@ class RubiksSolver:
         ]
         
         for white_pos, adjacent_pos in white_edges:
-            if (cube.cube[white_pos[0]][white_pos[1]][white_pos[2]] == 0 and
-                cube.cube[adjacent_pos[0]][adjacent_pos[1]][adjacent_pos[2]] == adjacent_pos[0]):
+            if (cube.sticker(white_pos[0], white_pos[1], white_pos[2]) == 0 and
+                cube.sticker(adjacent_pos[0], adjacent_pos[1], adjacent_pos[2]) == adjacent_pos[0]):
                 continue
                 
             edge_moves = self._find_and_position_white_edge(cube, white_pos, adjacent_pos)
             moves.extend(edge_moves)
             
             for move in edge_moves:
-                cube.execute_moves(move)
+                self._execute_moves(cube, move)
         
         print(f"White cross moves: {' '.join(moves)}")
         return moves
@@ -83,258 +153,242 @@ class RubiksSolver:
             5: "L",  # Left (green)
         }
         
-        # First, search for the white edge piece with the target adjacent color
-        found = False
-        for face in range(6):
-            for row in range(3):
-                for col in range(3):
-                    # Check if this is an edge piece
-                    if not self._is_edge_piece(face, row, col):
-                        continue
-                        
-                    # Check if this is a white edge
-                    if cube.cube[face][row][col] != 0:
-                        continue
-                        
-                    # Get the adjacent position for this edge
-                    adj_face, adj_row, adj_col = self._get_adjacent_position(face, row, col)
-                    
-                    # Check if this edge has the target color
-                    if cube.cube[adj_face][adj_row][adj_col] == target_color:
-                        # We found the edge piece!
-                        found = True
-                        
-                        # Now we need to move it to the correct position
-                        # We'll use a case-by-case approach
-                        
-                        # Case 1: Edge is already in bottom face but needs rotation
-                        if face == 0:
-                            # Edge is in bottom face
-                            target_face = target_adjacent_pos[0]
-                            current_adj_face = adj_face
-                            
-                            # Rotate bottom face to align
-                            rotations_needed = (target_face - current_adj_face) % 4
-                            if rotations_needed == 1:
-                                moves.append("D")
-                            elif rotations_needed == 2:
-                                moves.append("D2")
-                            elif rotations_needed == 3:
-                                moves.append("D'")
-                        
-                        # Case 2: Edge is in top face
-                        elif face == 1:
-                            # Get target face
-                            target_face = target_adjacent_pos[0]
-                            
-                            # Determine which edge position it is
-                            if (row, col) == (0, 1):  # Top edge
-                                if target_face == 2:  # Front
-                                    moves.extend(["U2", "F2"])
-                                elif target_face == 3:  # Back
-                                    moves.extend(["B2"])
-                                elif target_face == 4:  # Right
-                                    moves.extend(["U", "R2"])
-                                elif target_face == 5:  # Left
-                                    moves.extend(["U'", "L2"])
-                            elif (row, col) == (1, 0):  # Left edge
-                                if target_face == 2:  # Front
-                                    moves.extend(["U'", "F2"])
-                                elif target_face == 3:  # Back
-                                    moves.extend(["U", "B2"])
-                                elif target_face == 4:  # Right
-                                    moves.extend(["U2", "R2"])
-                                elif target_face == 5:  # Left
-                                    moves.extend(["L2"])
-                            elif (row, col) == (1, 2):  # Right edge
-                                if target_face == 2:  # Front
-                                    moves.extend(["U", "F2"])
-                                elif target_face == 3:  # Back
-                                    moves.extend(["U'", "B2"])
-                                elif target_face == 4:  # Right
-                                    moves.extend(["R2"])
-                                elif target_face == 5:  # Left
-                                    moves.extend(["U2", "L2"])
-                            elif (row, col) == (2, 1):  # Bottom edge
-                                if target_face == 2:  # Front
-                                    moves.extend(["F2"])
-                                elif target_face == 3:  # Back
-                                    moves.extend(["U2", "B2"])
-                                elif target_face == 4:  # Right
-                                    moves.extend(["U'", "R2"])
-                                elif target_face == 5:  # Left
-                                    moves.extend(["U", "L2"])
-                        
-                        # Case 3: Edge is in middle layer
-                        elif row == 1 and (col == 0 or col == 2):
-                            # Middle layer edge
-                            target_face = target_adjacent_pos[0]
-                            
-                            # Get the current face
-                            current_face = face
-                            
-                            # Determine the algorithm based on the face and position
-                            if current_face == 2:  # Front
-                                if col == 0:  # Left
-                                    if target_face == 2:  # Front
-                                        moves.extend(["L", "U", "L'", "F2"])
-                                    elif target_face == 3:  # Back
-                                        moves.extend(["L", "U", "L'", "U2", "B2"])
-                                    elif target_face == 4:  # Right
-                                        moves.extend(["L", "U", "L'", "U'", "R2"])
-                                    elif target_face == 5:  # Left
-                                        moves.extend(["L", "U", "L'", "U", "L2"])
-                                else:  # Right
-                                    if target_face == 2:  # Front
-                                        moves.extend(["R'", "U'", "R", "F2"])
-                                    elif target_face == 3:  # Back
-                                        moves.extend(["R'", "U'", "R", "U2", "B2"])
-                                    elif target_face == 4:  # Right
-                                        moves.extend(["R'", "U'", "R", "U", "R2"])
-                                    elif target_face == 5:  # Left
-                                        moves.extend(["R'", "U'", "R", "U'", "L2"])
-                            elif current_face == 3:  # Back
-                                if col == 0:  # Right
-                                    if target_face == 2:  # Front
-                                        moves.extend(["R", "U", "R'", "U2", "F2"])
-                                    elif target_face == 3:  # Back
-                                        moves.extend(["R", "U", "R'", "B2"])
-                                    elif target_face == 4:  # Right
-                                        moves.extend(["R", "U", "R'", "U'", "R2"])
-                                    elif target_face == 5:  # Left
-                                        moves.extend(["R", "U", "R'", "U", "L2"])
-                                else:  # Left
-                                    if target_face == 2:  # Front
-                                        moves.extend(["L'", "U'", "L", "U2", "F2"])
-                                    elif target_face == 3:  # Back
-                                        moves.extend(["L'", "U'", "L", "B2"])
-                                    elif target_face == 4:  # Right
-                                        moves.extend(["L'", "U'", "L", "U", "R2"])
-                                    elif target_face == 5:  # Left
-                                        moves.extend(["L'", "U'", "L", "U'", "L2"])
-                            elif current_face == 4:  # Right
-                                if col == 0:  # Back
-                                    if target_face == 2:  # Front
-                                        moves.extend(["B", "U", "B'", "U2", "F2"])
-                                    elif target_face == 3:  # Back
-                                        moves.extend(["B", "U", "B'", "B2"])
-                                    elif target_face == 4:  # Right
-                                        moves.extend(["B", "U", "B'", "U'", "R2"])
-                                    elif target_face == 5:  # Left
-                                        moves.extend(["B", "U", "B'", "U", "L2"])
-                                else:  # Front
-                                    if target_face == 2:  # Front
-                                        moves.extend(["F'", "U'", "F", "F2"])
-                                    elif target_face == 3:  # Back
-                                        moves.extend(["F'", "U'", "F", "U2", "B2"])
-                                    elif target_face == 4:  # Right
-                                        moves.extend(["F'", "U'", "F", "U", "R2"])
-                                    elif target_face == 5:  # Left
-                                        moves.extend(["F'", "U'", "F", "U'", "L2"])
-                            elif current_face == 5:  # Left
-                                if col == 0:  # Front
-                                    if target_face == 2:  # Front
-                                        moves.extend(["F", "U", "F'", "F2"])
-                                    elif target_face == 3:  # Back
-                                        moves.extend(["F", "U", "F'", "U2", "B2"])
-                                    elif target_face == 4:  # Right
-                                        moves.extend(["F", "U", "F'", "U'", "R2"])
-                                    elif target_face == 5:  # Left
-                                        moves.extend(["F", "U", "F'", "U", "L2"])
-                                else:  # Back
-                                    if target_face == 2:  # Front
-                                        moves.extend(["B'", "U'", "B", "U2", "F2"])
-                                    elif target_face == 3:  # Back
-                                        moves.extend(["B'", "U'", "B", "B2"])
-                                    elif target_face == 4:  # Right
-                                        moves.extend(["B'", "U'", "B", "U", "R2"])
-                                    elif target_face == 5:  # Left
-                                        moves.extend(["B'", "U'", "B", "U'", "L2"])
-                        
-                        # Case 4: Edge is in bottom or top layer but in a side face
-                        else:
-                            # Fix: define target_face for this case
-                            target_face = target_adjacent_pos[0]
-                            # Determine which U move to make to get to the right spot
-                            if face == 2:  # Front
-                                if row == 0:  # Top row
-                                    if target_face == 2:  # Front
-                                        moves.extend(["F2"])
-                                    elif target_face == 3:  # Back
-                                        moves.extend(["U2", "B2"])
-                                    elif target_face == 4:  # Right
-                                        moves.extend(["U'", "R2"])
-                                    elif target_face == 5:  # Left
-                                        moves.extend(["U", "L2"])
-                                else:  # Bottom row
-                                    if target_face == 2:  # Front
-                                        moves.extend([])  # Already in place
-                                    elif target_face == 3:  # Back
-                                        moves.extend(["D2"])
-                                    elif target_face == 4:  # Right
-                                        moves.extend(["D"])
-                                    elif target_face == 5:  # Left
-                                        moves.extend(["D'"])
-                            elif face == 3:  # Back
-                                if row == 0:  # Top row
-                                    if target_face == 2:  # Front
-                                        moves.extend(["U2", "F2"])
-                                    elif target_face == 3:  # Back
-                                        moves.extend(["B2"])
-                                    elif target_face == 4:  # Right
-                                        moves.extend(["U", "R2"])
-                                    elif target_face == 5:  # Left
-                                        moves.extend(["U'", "L2"])
-                                else:  # Bottom row
-                                    if target_face == 2:  # Front
-                                        moves.extend(["D2"])
-                                    elif target_face == 3:  # Back
-                                        moves.extend([])  # Already in place
-                                    elif target_face == 4:  # Right
-                                        moves.extend(["D'"])
-                                    elif target_face == 5:  # Left
-                                        moves.extend(["D"])
-                            elif face == 4:  # Right
-                                if row == 0:  # Top row
-                                    if target_face == 2:  # Front
-                                        moves.extend(["U", "F2"])
-                                    elif target_face == 3:  # Back
-                                        moves.extend(["U'", "B2"])
-                                    elif target_face == 4:  # Right
-                                        moves.extend(["R2"])
-                                    elif target_face == 5:  # Left
-                                        moves.extend(["U2", "L2"])
-                                else:  # Bottom row
-                                    if target_face == 2:  # Front
-                                        moves.extend(["D'"])
-                                    elif target_face == 3:  # Back
-                                        moves.extend(["D"])
-                                    elif target_face == 4:  # Right
-                                        moves.extend([])  # Already in place
-                                    elif target_face == 5:  # Left
-                                        moves.extend(["D2"])
-                            elif face == 5:  # Left
-                                if row == 0:  # Top row
-                                    if target_face == 2:  # Front
-                                        moves.extend(["U'", "F2"])
-                                    elif target_face == 3:  # Back
-                                        moves.extend(["U", "B2"])
-                                    elif target_face == 4:  # Right
-                                        moves.extend(["U2", "R2"])
-                                    elif target_face == 5:  # Left
-                                        moves.extend(["L2"])
-                                else:  # Bottom row
-                                    if target_face == 2:  # Front
-                                        moves.extend(["D"])
-                                    elif target_face == 3:  # Back
-                                        moves.extend(["D'"])
-                                    elif target_face == 4:  # Right
-                                        moves.extend(["D2"])
-                                    elif target_face == 5:  # Left
-                                        moves.extend([])  # Already in place
-                        break
-            if found:
-                break
+        # The piece index gives both stickers of the edge without scanning the cube
+        try:
+            (face, row, col), (adj_face, adj_row, adj_col) = cube.piece_stickers(0, target_color)
+            found = True
+        except KeyError:
+            found = False
+        
+        if found:
+            # Now we need to move it to the correct position
+            # We'll use a case-by-case approach
+            
+            # Case 1: Edge is already in bottom face but needs rotation
+            if face == 0:
+                # Edge is in bottom face
+                target_face = target_adjacent_pos[0]
+                current_adj_face = adj_face
+                
+                # Rotate bottom face to align
+                rotations_needed = (target_face - current_adj_face) % 4
+                if rotations_needed == 1:
+                    moves.append("D")
+                elif rotations_needed == 2:
+                    moves.append("D2")
+                elif rotations_needed == 3:
+                    moves.append("D'")
+            
+            # Case 2: Edge is in top face
+            elif face == 1:
+                # Get target face
+                target_face = target_adjacent_pos[0]
+                
+                # Determine which edge position it is
+                if (row, col) == (0, 1):  # Top edge
+                    if target_face == 2:  # Front
+                        moves.extend(["U2", "F2"])
+                    elif target_face == 3:  # Back
+                        moves.extend(["B2"])
+                    elif target_face == 4:  # Right
+                        moves.extend(["U", "R2"])
+                    elif target_face == 5:  # Left
+                        moves.extend(["U'", "L2"])
+                elif (row, col) == (1, 0):  # Left edge
+                    if target_face == 2:  # Front
+                        moves.extend(["U'", "F2"])
+                    elif target_face == 3:  # Back
+                        moves.extend(["U", "B2"])
+                    elif target_face == 4:  # Right
+                        moves.extend(["U2", "R2"])
+                    elif target_face == 5:  # Left
+                        moves.extend(["L2"])
+                elif (row, col) == (1, 2):  # Right edge
+                    if target_face == 2:  # Front
+                        moves.extend(["U", "F2"])
+                    elif target_face == 3:  # Back
+                        moves.extend(["U'", "B2"])
+                    elif target_face == 4:  # Right
+                        moves.extend(["R2"])
+                    elif target_face == 5:  # Left
+                        moves.extend(["U2", "L2"])
+                elif (row, col) == (2, 1):  # Bottom edge
+                    if target_face == 2:  # Front
+                        moves.extend(["F2"])
+                    elif target_face == 3:  # Back
+                        moves.extend(["U2", "B2"])
+                    elif target_face == 4:  # Right
+                        moves.extend(["U'", "R2"])
+                    elif target_face == 5:  # Left
+                        moves.extend(["U", "L2"])
+            
+            # Case 3: Edge is in middle layer
+            elif row == 1 and (col == 0 or col == 2):
+                # Middle layer edge
+                target_face = target_adjacent_pos[0]
+                
+                # Get the current face
+                current_face = face
+                
+                # Determine the algorithm based on the face and position
+                if current_face == 2:  # Front
+                    if col == 0:  # Left
+                        if target_face == 2:  # Front
+                            moves.extend(["L", "U", "L'", "F2"])
+                        elif target_face == 3:  # Back
+                            moves.extend(["L", "U", "L'", "U2", "B2"])
+                        elif target_face == 4:  # Right
+                            moves.extend(["L", "U", "L'", "U'", "R2"])
+                        elif target_face == 5:  # Left
+                            moves.extend(["L", "U", "L'", "U", "L2"])
+                    else:  # Right
+                        if target_face == 2:  # Front
+                            moves.extend(["R'", "U'", "R", "F2"])
+                        elif target_face == 3:  # Back
+                            moves.extend(["R'", "U'", "R", "U2", "B2"])
+                        elif target_face == 4:  # Right
+                            moves.extend(["R'", "U'", "R", "U", "R2"])
+                        elif target_face == 5:  # Left
+                            moves.extend(["R'", "U'", "R", "U'", "L2"])
+                elif current_face == 3:  # Back
+                    if col == 0:  # Right
+                        if target_face == 2:  # Front
+                            moves.extend(["R", "U", "R'", "U2", "F2"])
+                        elif target_face == 3:  # Back
+                            moves.extend(["R", "U", "R'", "B2"])
+                        elif target_face == 4:  # Right
+                            moves.extend(["R", "U", "R'", "U'", "R2"])
+                        elif target_face == 5:  # Left
+                            moves.extend(["R", "U", "R'", "U", "L2"])
+                    else:  # Left
+                        if target_face == 2:  # Front
+                            moves.extend(["L'", "U'", "L", "U2", "F2"])
+                        elif target_face == 3:  # Back
+                            moves.extend(["L'", "U'", "L", "B2"])
+                        elif target_face == 4:  # Right
+                            moves.extend(["L'", "U'", "L", "U", "R2"])
+                        elif target_face == 5:  # Left
+                            moves.extend(["L'", "U'", "L", "U'", "L2"])
+                elif current_face == 4:  # Right
+                    if col == 0:  # Back
+                        if target_face == 2:  # Front
+                            moves.extend(["B", "U", "B'", "U2", "F2"])
+                        elif target_face == 3:  # Back
+                            moves.extend(["B", "U", "B'", "B2"])
+                        elif target_face == 4:  # Right
+                            moves.extend(["B", "U", "B'", "U'", "R2"])
+                        elif target_face == 5:  # Left
+                            moves.extend(["B", "U", "B'", "U", "L2"])
+                    else:  # Front
+                        if target_face == 2:  # Front
+                            moves.extend(["F'", "U'", "F", "F2"])
+                        elif target_face == 3:  # Back
+                            moves.extend(["F'", "U'", "F", "U2", "B2"])
+                        elif target_face == 4:  # Right
+                            moves.extend(["F'", "U'", "F", "U", "R2"])
+                        elif target_face == 5:  # Left
+                            moves.extend(["F'", "U'", "F", "U'", "L2"])
+                elif current_face == 5:  # Left
+                    if col == 0:  # Front
+                        if target_face == 2:  # Front
+                            moves.extend(["F", "U", "F'", "F2"])
+                        elif target_face == 3:  # Back
+                            moves.extend(["F", "U", "F'", "U2", "B2"])
+                        elif target_face == 4:  # Right
+                            moves.extend(["F", "U", "F'", "U'", "R2"])
+                        elif target_face == 5:  # Left
+                            moves.extend(["F", "U", "F'", "U", "L2"])
+                    else:  # Back
+                        if target_face == 2:  # Front
+                            moves.extend(["B'", "U'", "B", "U2", "F2"])
+                        elif target_face == 3:  # Back
+                            moves.extend(["B'", "U'", "B", "B2"])
+                        elif target_face == 4:  # Right
+                            moves.extend(["B'", "U'", "B", "U", "R2"])
+                        elif target_face == 5:  # Left
+                            moves.extend(["B'", "U'", "B", "U'", "L2"])
+            
+            # Case 4: Edge is in bottom or top layer but in a side face
+            else:
+                # Fix: define target_face for this case
+                target_face = target_adjacent_pos[0]
+                # Determine which U move to make to get to the right spot
+                if face == 2:  # Front
+                    if row == 0:  # Top row
+                        if target_face == 2:  # Front
+                            moves.extend(["F2"])
+                        elif target_face == 3:  # Back
+                            moves.extend(["U2", "B2"])
+                        elif target_face == 4:  # Right
+                            moves.extend(["U'", "R2"])
+                        elif target_face == 5:  # Left
+                            moves.extend(["U", "L2"])
+                    else:  # Bottom row
+                        if target_face == 2:  # Front
+                            moves.extend([])  # Already in place
+                        elif target_face == 3:  # Back
+                            moves.extend(["D2"])
+                        elif target_face == 4:  # Right
+                            moves.extend(["D"])
+                        elif target_face == 5:  # Left
+                            moves.extend(["D'"])
+                elif face == 3:  # Back
+                    if row == 0:  # Top row
+                        if target_face == 2:  # Front
+                            moves.extend(["U2", "F2"])
+                        elif target_face == 3:  # Back
+                            moves.extend(["B2"])
+                        elif target_face == 4:  # Right
+                            moves.extend(["U", "R2"])
+                        elif target_face == 5:  # Left
+                            moves.extend(["U'", "L2"])
+                    else:  # Bottom row
+                        if target_face == 2:  # Front
+                            moves.extend(["D2"])
+                        elif target_face == 3:  # Back
+                            moves.extend([])  # Already in place
+                        elif target_face == 4:  # Right
+                            moves.extend(["D'"])
+                        elif target_face == 5:  # Left
+                            moves.extend(["D"])
+                elif face == 4:  # Right
+                    if row == 0:  # Top row
+                        if target_face == 2:  # Front
+                            moves.extend(["U", "F2"])
+                        elif target_face == 3:  # Back
+                            moves.extend(["U'", "B2"])
+                        elif target_face == 4:  # Right
+                            moves.extend(["R2"])
+                        elif target_face == 5:  # Left
+                            moves.extend(["U2", "L2"])
+                    else:  # Bottom row
+                        if target_face == 2:  # Front
+                            moves.extend(["D'"])
+                        elif target_face == 3:  # Back
+                            moves.extend(["D"])
+                        elif target_face == 4:  # Right
+                            moves.extend([])  # Already in place
+                        elif target_face == 5:  # Left
+                            moves.extend(["D2"])
+                elif face == 5:  # Left
+                    if row == 0:  # Top row
+                        if target_face == 2:  # Front
+                            moves.extend(["U'", "F2"])
+                        elif target_face == 3:  # Back
+                            moves.extend(["U", "B2"])
+                        elif target_face == 4:  # Right
+                            moves.extend(["U2", "R2"])
+                        elif target_face == 5:  # Left
+                            moves.extend(["L2"])
+                    else:  # Bottom row
+                        if target_face == 2:  # Front
+                            moves.extend(["D"])
+                        elif target_face == 3:  # Back
+                            moves.extend(["D'"])
+                        elif target_face == 4:  # Right
+                            moves.extend(["D2"])
+                        elif target_face == 5:  # Left
+                            moves.extend([])  # Already in place
         
         # If the piece wasn't found, fallback to a more general algorithm
         if not found:
@@ -346,15 +400,10 @@ class RubiksSolver:
     def solve_white_corners(self, cube):
         moves = []
         print("Solving white corners...")
+        if cube.is_stage_solved("first_layer"):
+            return moves
         
-        corner_positions = [
-            ((0, 0, 0), (5, 2, 0), (2, 2, 0)),
-            ((0, 0, 2), (2, 2, 2), (4, 2, 0)),
-            ((0, 2, 2), (4, 2, 2), (3, 2, 2)),
-            ((0, 2, 0), (3, 2, 0), (5, 2, 2)),
-        ]
-        
-        for corner in corner_positions:
+        for corner in BOTTOM_CORNERS:
             if self._is_white_corner_solved(cube, corner):
                 continue
             
@@ -362,7 +411,7 @@ class RubiksSolver:
             moves.extend(corner_moves)
             
             for move in corner_moves:
-                cube.execute_moves(move)
+                self._execute_moves(cube, move)
         
         print(f"White corners moves: {' '.join(moves)}")
         return moves
@@ -370,9 +419,9 @@ class RubiksSolver:
     def _is_white_corner_solved(self, cube, corner_positions):
         white_pos, side1_pos, side2_pos = corner_positions
         
-        return (cube.cube[white_pos[0]][white_pos[1]][white_pos[2]] == 0 and
-                cube.cube[side1_pos[0]][side1_pos[1]][side1_pos[2]] == side1_pos[0] and
-                cube.cube[side2_pos[0]][side2_pos[1]][side2_pos[2]] == side2_pos[0])
+        return (cube.sticker(white_pos[0], white_pos[1], white_pos[2]) == 0 and
+                cube.sticker(side1_pos[0], side1_pos[1], side1_pos[2]) == side1_pos[0] and
+                cube.sticker(side2_pos[0], side2_pos[1], side2_pos[2]) == side2_pos[0])
     
     def _solve_white_corner_piece(self, cube, target_corner):
         """
@@ -395,26 +444,15 @@ class RubiksSolver:
         corner_found = False
         corner_position = None
         
-        # All 8 corner positions in the cube
-        corner_positions = [
-            # Bottom corners
-            [(0, 0, 0), (5, 2, 0), (2, 2, 0)],  # Front-Left 
-            [(0, 0, 2), (2, 2, 2), (4, 2, 0)],  # Front-Right
-            [(0, 2, 2), (4, 2, 2), (3, 2, 2)],  # Back-Right
-            [(0, 2, 0), (3, 2, 0), (5, 2, 2)],  # Back-Left
-            
-            # Top corners
-            [(1, 0, 0), (5, 0, 0), (3, 0, 2)],  # Back-Left
-            [(1, 0, 2), (3, 0, 0), (4, 0, 2)],  # Back-Right
-            [(1, 2, 2), (4, 0, 0), (2, 0, 2)],  # Front-Right
-            [(1, 2, 0), (2, 0, 0), (5, 0, 2)],  # Front-Left
-        ]
+        # All 8 corner positions in the cube: bottom Front-Left, Front-Right,
+        # Back-Right, Back-Left, then top Back-Left, Back-Right, Front-Right, Front-Left
+        corner_positions = BOTTOM_CORNERS + TOP_CORNERS
         
         # Find the corner with our target colors
         for i, positions in enumerate(corner_positions):
             colors = []
             for pos in positions:
-                colors.append(cube.cube[pos[0]][pos[1]][pos[2]])
+                colors.append(cube.sticker(pos[0], pos[1], pos[2]))
             
             # Check if this corner has our target colors
             if sorted(colors) == sorted(target_colors):
@@ -424,7 +462,7 @@ class RubiksSolver:
         
         if not corner_found:
             # Fallback - apply a standard algorithm to cycle corners
-            moves.extend(["R", "U", "R'", "U'"])
+            moves.extend(self.algorithms["sexy"].moves)
             return moves
         
         # Now we know which corner it is, let's position it correctly
@@ -472,7 +510,7 @@ class RubiksSolver:
         
         if target_position is None:
             # Fallback
-            moves.extend(["R", "U", "R'", "U'"])
+            moves.extend(self.algorithms["sexy"].moves)
             return moves
         
         # Rotate U to position the corner above its target position
@@ -542,23 +580,17 @@ class RubiksSolver:
         max_attempts = 10
         for attempt in range(max_attempts):
             # Check if middle edges are already solved
-            if self._are_middle_edges_solved(cube):
+            if cube.is_stage_solved("first_two_layers") or self._are_middle_edges_solved(cube):
                 break
             
             # Apply standard right-hand algorithm
-            right_algorithm = ["R", "U", "R'", "U'", "R", "U", "R'"]
-            moves.extend(right_algorithm)
-            for move in right_algorithm:
-                cube.execute_moves(move)
+            moves.extend(self._apply_algorithm(cube, "right_insert"))
             
             # Apply standard left-hand algorithm
-            left_algorithm = ["L'", "U'", "L", "U", "L'", "U'", "L"]
-            moves.extend(left_algorithm)
-            for move in left_algorithm:
-                cube.execute_moves(move)
+            moves.extend(self._apply_algorithm(cube, "left_insert"))
             
             # Rotate top layer
-            cube.execute_moves("U")
+            self._execute_moves(cube, "U")
             moves.append("U")
         
         print(f"Middle edges moves: {' '.join(moves)} (attempt {attempt+1}/{max_attempts})")
@@ -581,27 +613,27 @@ class RubiksSolver:
         for face in [2, 3, 4, 5]:  # Front, Back, Right, Left faces
             for pos in [(1, 0), (1, 2)]:  # Middle edges
                 row, col = pos
-                color = cube.cube[face][row][col]
-                center = cube.cube[face][1][1]
+                color = cube.sticker(face, row, col)
+                center = cube.sticker(face, 1, 1)
                 total += 1
                 if color == center:
                     matches += 1
         
         # Consider it "solved enough" if most edges match
         return matches >= total * 0.75
-        if cube.cube[2][1][2] != cube.cube[2][0][1] or cube.cube[4][1][0] != cube.cube[4][0][1]:
+        if cube.sticker(2, 1, 2) != cube.sticker(2, 0, 1) or cube.sticker(4, 1, 0) != cube.sticker(4, 0, 1):
             return False
             
         # Check front-left edge
-        if cube.cube[2][1][0] != cube.cube[2][0][1] or cube.cube[5][1][2] != cube.cube[5][0][1]:
+        if cube.sticker(2, 1, 0) != cube.sticker(2, 0, 1) or cube.sticker(5, 1, 2) != cube.sticker(5, 0, 1):
             return False
             
         # Check back-right edge (from back view)
-        if cube.cube[3][1][0] != cube.cube[3][0][1] or cube.cube[4][1][2] != cube.cube[4][0][1]:
+        if cube.sticker(3, 1, 0) != cube.sticker(3, 0, 1) or cube.sticker(4, 1, 2) != cube.sticker(4, 0, 1):
             return False
             
         # Check back-left edge (from back view)
-        if cube.cube[3][1][2] != cube.cube[3][0][1] or cube.cube[5][1][0] != cube.cube[5][0][1]:
+        if cube.sticker(3, 1, 2) != cube.sticker(3, 0, 1) or cube.sticker(5, 1, 0) != cube.sticker(5, 0, 1):
             return False
             
         return True
@@ -621,8 +653,8 @@ class RubiksSolver:
         moves = []
         
         # Colors we are looking for
-        target_color = cube.cube[target_pos[0]][0][1]  # Center piece color
-        adj_color = cube.cube[adj_pos[0]][0][1]        # Adjacent center color
+        target_color = cube.sticker(target_pos[0], 0, 1)  # Center piece color
+        adj_color = cube.sticker(adj_pos[0], 0, 1)        # Adjacent center color
         
         # Face names for reference (these match the standard notation)
         faces = {
@@ -634,160 +666,135 @@ class RubiksSolver:
             5: "L"   # Left (Green)
         }
         
-        # Check top layer edges for our piece
-        top_edges = [
-            (1, 0, 1),  # Top edge of U face
-            (1, 1, 0),  # Left edge of U face
-            (1, 2, 1),  # Bottom edge of U face
-            (1, 1, 2)   # Right edge of U face
-        ]
+        # One lookup in the piece index tells whether the edge is in the top layer
+        try:
+            slot, _ = cube.locate_piece(target_color, adj_color)
+        except KeyError:
+            slot = None
         
-        for edge_pos in top_edges:
-            # For each edge in the top layer, check its adjacent position
+        if slot in ("UB", "UL", "UF", "UR"):
+            # The first sticker of a top-layer slot is the one on the U face
+            index = PIECE_SLOTS[slot][0]
+            edge_pos = (1, index % 9 // 3, index % 3)
             adj_edge_face, adj_edge_row, adj_edge_col = self._get_adjacent_position(edge_pos[0], edge_pos[1], edge_pos[2])
             
             # Get the colors of this edge piece
-            edge_color = cube.cube[edge_pos[0]][edge_pos[1]][edge_pos[2]]
-            adj_edge_color = cube.cube[adj_edge_face][adj_edge_row][adj_edge_col]
+            edge_color = cube.sticker(edge_pos[0], edge_pos[1], edge_pos[2])
+            adj_edge_color = cube.sticker(adj_edge_face, adj_edge_row, adj_edge_col)
             
-            # Check if this is our piece (in either orientation)
-            if (edge_color == target_color and adj_edge_color == adj_color) or \
-               (edge_color == adj_color and adj_edge_color == target_color):
-                
-                # We found our piece!
-                # Determine which algorithm to use based on its position and orientation
-                
-                # First, align the edge with the correct face
-                # The alignment depends on the target position (which face and which edge)
-                
-                # Determine the top face position (0-3) of our edge
-                edge_position = -1
-                if edge_pos[1] == 0 and edge_pos[2] == 1:  # Top edge
-                    edge_position = 0
-                elif edge_pos[1] == 1 and edge_pos[2] == 0:  # Left edge
-                    edge_position = 1
-                elif edge_pos[1] == 2 and edge_pos[2] == 1:  # Bottom edge
-                    edge_position = 2
-                elif edge_pos[1] == 1 and edge_pos[2] == 2:  # Right edge
-                    edge_position = 3
-                
-                # Determine which face is adjacent to our edge in the top layer
-                top_adj_face = adj_edge_face
-                
-                # Determine target face and adjacent face for our target position
-                target_face = target_pos[0]
-                adjacent_face = adj_pos[0]
-                
-                # Calculate how many U moves to align the edge with the target face
-                u_moves_needed = (target_face - top_adj_face) % 4
-                if u_moves_needed == 1:
-                    moves.append("U")
-                elif u_moves_needed == 2:
-                    moves.append("U2")
-                elif u_moves_needed == 3:
-                    moves.append("U'")
-                
-                # Apply the U moves to update the edge position
-                for _ in range(u_moves_needed):
-                    edge_position = (edge_position - 1) % 4
-                
-                # Now edge_position should be aligned with target_face
-                # Check if edge colors match directly or need to be flipped
-                
-                # After U moves, recalculate the positions
-                # Determine the new edge positions after U moves
-                if edge_position == 0:  # Top edge
-                    new_edge_pos = (1, 0, 1)
-                    new_adj_edge_face, new_adj_edge_row, new_adj_edge_col = self._get_adjacent_position(1, 0, 1)
-                elif edge_position == 1:  # Left edge
-                    new_edge_pos = (1, 1, 0)
-                    new_adj_edge_face, new_adj_edge_row, new_adj_edge_col = self._get_adjacent_position(1, 1, 0)
-                elif edge_position == 2:  # Bottom edge
-                    new_edge_pos = (1, 2, 1)
-                    new_adj_edge_face, new_adj_edge_row, new_adj_edge_col = self._get_adjacent_position(1, 2, 1)
-                else:  # Right edge
-                    new_edge_pos = (1, 1, 2)
-                    new_adj_edge_face, new_adj_edge_row, new_adj_edge_col = self._get_adjacent_position(1, 1, 2)
-                
-                # Get updated colors
-                edge_color = cube.cube[new_edge_pos[0]][new_edge_pos[1]][new_edge_pos[2]]
-                adj_edge_color = cube.cube[new_adj_edge_face][new_adj_edge_row][new_adj_edge_col]
-                
-                # Now determine which middle layer insertion algorithm to use
-                # based on target position and orientation
-                
-                # Case 1: Front-right edge (red-blue)
-                if target_pos[0] == 2 and target_pos[2] == 2:
-                    if edge_color == target_color:
-                        # Orientation: yellow-red on top, insert to front-right
-                        moves.extend(["U", "R", "U'", "R'", "U'", "F'", "U", "F"])
-                    else:
-                        # Orientation: yellow-blue on top, insert to front-right
-                        moves.extend(["U'", "F'", "U", "F", "U", "R", "U'", "R'"])
-                
-                # Case 2: Front-left edge (red-green)
-                elif target_pos[0] == 2 and target_pos[2] == 0:
-                    if edge_color == target_color:
-                        # Orientation: yellow-red on top, insert to front-left
-                        moves.extend(["U'", "L'", "U", "L", "U", "F", "U'", "F'"])
-                    else:
-                        # Orientation: yellow-green on top, insert to front-left
-                        moves.extend(["U", "F", "U'", "F'", "U'", "L'", "U", "L"])
-                
-                # Case 3: Back-right edge (orange-blue)
-                elif target_pos[0] == 3 and target_pos[2] == 0:
-                    if edge_color == target_color:
-                        # Orientation: yellow-orange on top, insert to back-right
-                        moves.extend(["U'", "R'", "U", "R", "U", "B", "U'", "B'"])
-                    else:
-                        # Orientation: yellow-blue on top, insert to back-right
-                        moves.extend(["U", "B", "U'", "B'", "U'", "R'", "U", "R"])
-                
-                # Case 4: Back-left edge (orange-green)
-                elif target_pos[0] == 3 and target_pos[2] == 2:
-                    if edge_color == target_color:
-                        # Orientation: yellow-orange on top, insert to back-left
-                        moves.extend(["U", "L", "U'", "L'", "U'", "B'", "U", "B"])
-                    else:
-                        # Orientation: yellow-green on top, insert to back-left
-                        moves.extend(["U'", "B'", "U", "B", "U", "L", "U'", "L'"])
-                
-                return moves
+            # We found our piece!
+            # Determine which algorithm to use based on its position and orientation
+            
+            # First, align the edge with the correct face
+            # The alignment depends on the target position (which face and which edge)
+            
+            # Determine the top face position (0-3) of our edge
+            edge_position = -1
+            if edge_pos[1] == 0 and edge_pos[2] == 1:  # Top edge
+                edge_position = 0
+            elif edge_pos[1] == 1 and edge_pos[2] == 0:  # Left edge
+                edge_position = 1
+            elif edge_pos[1] == 2 and edge_pos[2] == 1:  # Bottom edge
+                edge_position = 2
+            elif edge_pos[1] == 1 and edge_pos[2] == 2:  # Right edge
+                edge_position = 3
+            
+            # Determine which face is adjacent to our edge in the top layer
+            top_adj_face = adj_edge_face
+            
+            # Determine target face and adjacent face for our target position
+            target_face = target_pos[0]
+            adjacent_face = adj_pos[0]
+            
+            # Calculate how many U moves to align the edge with the target face
+            u_moves_needed = (target_face - top_adj_face) % 4
+            if u_moves_needed == 1:
+                moves.append("U")
+            elif u_moves_needed == 2:
+                moves.append("U2")
+            elif u_moves_needed == 3:
+                moves.append("U'")
+            
+            # Apply the U moves to update the edge position
+            for _ in range(u_moves_needed):
+                edge_position = (edge_position - 1) % 4
+            
+            # Now edge_position should be aligned with target_face
+            # Check if edge colors match directly or need to be flipped
+            
+            # After U moves, recalculate the positions
+            # Determine the new edge positions after U moves
+            if edge_position == 0:  # Top edge
+                new_edge_pos = (1, 0, 1)
+                new_adj_edge_face, new_adj_edge_row, new_adj_edge_col = self._get_adjacent_position(1, 0, 1)
+            elif edge_position == 1:  # Left edge
+                new_edge_pos = (1, 1, 0)
+                new_adj_edge_face, new_adj_edge_row, new_adj_edge_col = self._get_adjacent_position(1, 1, 0)
+            elif edge_position == 2:  # Bottom edge
+                new_edge_pos = (1, 2, 1)
+                new_adj_edge_face, new_adj_edge_row, new_adj_edge_col = self._get_adjacent_position(1, 2, 1)
+            else:  # Right edge
+                new_edge_pos = (1, 1, 2)
+                new_adj_edge_face, new_adj_edge_row, new_adj_edge_col = self._get_adjacent_position(1, 1, 2)
+            
+            # Get updated colors
+            edge_color = cube.sticker(new_edge_pos[0], new_edge_pos[1], new_edge_pos[2])
+            adj_edge_color = cube.sticker(new_adj_edge_face, new_adj_edge_row, new_adj_edge_col)
+            
+            # Now determine which middle layer insertion algorithm to use
+            # based on target position and orientation
+            
+            # Case 1: Front-right edge (red-blue)
+            if target_pos[0] == 2 and target_pos[2] == 2:
+                if edge_color == target_color:
+                    # Orientation: yellow-red on top, insert to front-right
+                    moves.extend(["U", "R", "U'", "R'", "U'", "F'", "U", "F"])
+                else:
+                    # Orientation: yellow-blue on top, insert to front-right
+                    moves.extend(["U'", "F'", "U", "F", "U", "R", "U'", "R'"])
+            
+            # Case 2: Front-left edge (red-green)
+            elif target_pos[0] == 2 and target_pos[2] == 0:
+                if edge_color == target_color:
+                    # Orientation: yellow-red on top, insert to front-left
+                    moves.extend(["U'", "L'", "U", "L", "U", "F", "U'", "F'"])
+                else:
+                    # Orientation: yellow-green on top, insert to front-left
+                    moves.extend(["U", "F", "U'", "F'", "U'", "L'", "U", "L"])
+            
+            # Case 3: Back-right edge (orange-blue)
+            elif target_pos[0] == 3 and target_pos[2] == 0:
+                if edge_color == target_color:
+                    # Orientation: yellow-orange on top, insert to back-right
+                    moves.extend(["U'", "R'", "U", "R", "U", "B", "U'", "B'"])
+                else:
+                    # Orientation: yellow-blue on top, insert to back-right
+                    moves.extend(["U", "B", "U'", "B'", "U'", "R'", "U", "R"])
+            
+            # Case 4: Back-left edge (orange-green)
+            elif target_pos[0] == 3 and target_pos[2] == 2:
+                if edge_color == target_color:
+                    # Orientation: yellow-orange on top, insert to back-left
+                    moves.extend(["U", "L", "U'", "L'", "U'", "B'", "U", "B"])
+                else:
+                    # Orientation: yellow-green on top, insert to back-left
+                    moves.extend(["U'", "B'", "U", "B", "U", "L", "U'", "L'"])
+            
+            return moves
         
         # If we didn't find the piece in the top layer, return empty list
         return []
     
     def _is_corner_positioned_correctly(self, cube, corner_index):
-        corner_positions = [
-            [(1, 0, 0), (5, 0, 0), (3, 0, 2)],  # Back-Left (UBL)
-            [(1, 0, 2), (3, 0, 0), (4, 0, 2)],  # Back-Right (UBR)
-            [(1, 2, 2), (4, 0, 0), (2, 0, 2)],  # Front-Right (UFR)
-            [(1, 2, 0), (2, 0, 0), (5, 0, 2)],  # Front-Left (UFL)
-        ]
-        corner_colors = [
-            [1, 5, 3],  # Yellow, Green, Orange
-            [1, 3, 4],  # Yellow, Orange, Blue
-            [1, 4, 2],  # Yellow, Blue, Red
-            [1, 2, 5],  # Yellow, Red, Green
-        ]
-        actual_colors = [cube.cube[pos[0]][pos[1]][pos[2]] for pos in corner_positions[corner_index]]
-        return set(actual_colors) == set(corner_colors[corner_index])
+        # The corner belongs in its slot if it carries the colours of the slot's faces
+        positions = TOP_CORNERS[corner_index]
+        actual_colors = [cube.sticker(pos[0], pos[1], pos[2]) for pos in positions]
+        return set(actual_colors) == {pos[0] for pos in positions}
 
     def _is_edge_positioned_correctly(self, cube, edge_index):
-        edge_positions = [
-            [(1, 0, 1), (3, 0, 1)],  # Back (UB)
-            [(1, 1, 2), (4, 0, 1)],  # Right (UR)
-            [(1, 2, 1), (2, 0, 1)],  # Front (UF)
-            [(1, 1, 0), (5, 0, 1)],  # Left (UL)
-        ]
-        edge_colors = [
-            [1, 3],  # Yellow, Orange
-            [1, 4],  # Yellow, Blue
-            [1, 2],  # Yellow, Red
-            [1, 5],  # Yellow, Green
-        ]
-        actual_colors = [cube.cube[pos[0]][pos[1]][pos[2]] for pos in edge_positions[edge_index]]
-        return set(actual_colors) == set(edge_colors[edge_index])
+        positions = TOP_EDGES[edge_index]
+        actual_colors = [cube.sticker(pos[0], pos[1], pos[2]) for pos in positions]
+        return set(actual_colors) == {pos[0] for pos in positions}
 
     def solve_last_layer(self, cube):
         """
@@ -811,22 +818,20 @@ class RubiksSolver:
         ]
         
         for yellow_pos, adjacent_pos in yellow_edges:
-            if (cube.cube[yellow_pos[0]][yellow_pos[1]][yellow_pos[2]] == 1 and
-                cube.cube[adjacent_pos[0]][adjacent_pos[1]][adjacent_pos[2]] == adjacent_pos[0]):
+            if (cube.sticker(yellow_pos[0], yellow_pos[1], yellow_pos[2]) == 1 and
+                cube.sticker(adjacent_pos[0], adjacent_pos[1], adjacent_pos[2]) == adjacent_pos[0]):
                 continue
                 
             edge_moves = self._orient_yellow_edge(cube, yellow_pos, adjacent_pos)
             moves.extend(edge_moves)
             
             for move in edge_moves:
-                cube.execute_moves(move)
+                self._execute_moves(cube, move)
         
         # Check if all yellow edges are oriented
         if not self._are_yellow_edges_oriented(cube):
             # If not, apply the standard OLL algorithm
-            moves.extend(["F", "R", "U", "R'", "U'", "F'"])
-            for move in ["F", "R", "U", "R'", "U'", "F'"]:
-                cube.execute_moves(move)
+            moves.extend(self._apply_algorithm(cube, "edge_flip"))
         
         # Now, permute the last layer corners
         for i in range(4):
@@ -834,14 +839,13 @@ class RubiksSolver:
                 continue
             
             # Position the cube so the incorrect corner is at UFR
-            while cube.cube[1][2][2] != 1:
-                cube.execute_moves("U")
+            while cube.sticker(1, 2, 2) != 1:
+                self._execute_moves(cube, "U")
                 moves.append("U")
             
             # Apply the standard PLL algorithm for corner permutation
-            moves.extend(["R", "U", "R'", "U'", "R", "U", "R'", "U'", "R", "U", "R'", "U'"])
-            for move in ["R", "U", "R'", "U'", "R", "U", "R'", "U'", "R", "U", "R'", "U'"]:
-                cube.execute_moves(move)
+            for _ in range(3):
+                moves.extend(self._apply_algorithm(cube, "sexy"))
         
         print(f"Last layer moves: {' '.join(moves)}")
         return moves
@@ -872,12 +876,12 @@ class RubiksSolver:
         }
         
         # First, check if the edge is already oriented
-        if (cube.cube[target_yellow_pos[0]][target_yellow_pos[1]][target_yellow_pos[2]] == 1 and
-            cube.cube[target_adjacent_pos[0]][target_adjacent_pos[1]][target_adjacent_pos[2]] == target_adjacent_pos[0]):
+        if (cube.sticker(target_yellow_pos[0], target_yellow_pos[1], target_yellow_pos[2]) == 1 and
+            cube.sticker(target_adjacent_pos[0], target_adjacent_pos[1], target_adjacent_pos[2]) == target_adjacent_pos[0]):
             return moves  # No moves needed, already oriented
         
         # Edge is not oriented, apply the standard algorithm
-        moves.extend(["F", "R", "U", "R'", "U'", "F'"])
+        moves.extend(self.algorithms["edge_flip"].moves)
         
         return moves
     
@@ -892,59 +896,18 @@ class RubiksSolver:
             True if all last layer edges are oriented, False otherwise
         """
         # Check if yellow cross is formed on top face
-        top_face = cube.cube[1]
-        return (top_face[1][1] == 1 and  # Center
-                top_face[0][1] == 1 and  # Top edge
-                top_face[1][0] == 1 and  # Left edge
-                top_face[1][2] == 1 and  # Right edge
-                top_face[2][1] == 1)     # Bottom edge
+        return cube.is_stage_solved("top_cross")
 
     def _is_edge_piece(self, face, row, col):
         """Check if a position is an edge piece"""
-        return (row == 1 and col != 1) or (col == 1 and row != 1)
+        return PIECE_SIZE[face * 9 + row * 3 + col] == 2
 
     def _get_adjacent_position(self, face, row, col):
         """Get the adjacent position for an edge piece"""
-        # Define adjacency mappings for edge pieces
-        adjacency = {
-            # Face 0 (White/Bottom) edges
-            (0, 0, 1): (2, 2, 1),  # Top edge -> Front bottom
-            (0, 1, 0): (5, 2, 1),  # Left edge -> Left bottom
-            (0, 1, 2): (4, 2, 1),  # Right edge -> Right bottom
-            (0, 2, 1): (3, 2, 1),  # Bottom edge -> Back bottom
-            
-            # Face 1 (Yellow/Top) edges
-            (1, 0, 1): (3, 0, 1),  # Top edge -> Back top
-            (1, 1, 0): (5, 0, 1),  # Left edge -> Left top
-            (1, 1, 2): (4, 0, 1),  # Right edge -> Right top
-            (1, 2, 1): (2, 0, 1),  # Bottom edge -> Front top
-            
-            # Face 2 (Red/Front) edges
-            (2, 0, 1): (1, 2, 1),  # Top edge -> Top bottom
-            (2, 1, 0): (5, 1, 2),  # Left edge -> Left right
-            (2, 1, 2): (4, 1, 0),  # Right edge -> Right left
-            (2, 2, 1): (0, 0, 1),  # Bottom edge -> Bottom top
-            
-            # Face 3 (Orange/Back) edges
-            (3, 0, 1): (1, 0, 1),  # Top edge -> Top top
-            (3, 1, 0): (4, 1, 2),  # Left edge -> Right right
-            (3, 1, 2): (5, 1, 0),  # Right edge -> Left left
-            (3, 2, 1): (0, 2, 1),  # Bottom edge -> Bottom bottom
-            
-            # Face 4 (Blue/Right) edges
-            (4, 0, 1): (1, 1, 2),  # Top edge -> Top right
-            (4, 1, 0): (2, 1, 2),  # Left edge -> Front right
-            (4, 1, 2): (3, 1, 0),  # Right edge -> Back left
-            (4, 2, 1): (0, 1, 2),  # Bottom edge -> Bottom right
-            
-            # Face 5 (Green/Left) edges
-            (5, 0, 1): (1, 1, 0),  # Top edge -> Top left
-            (5, 1, 0): (3, 1, 2),  # Left edge -> Back right
-            (5, 1, 2): (2, 1, 0),  # Right edge -> Front left
-            (5, 2, 1): (0, 1, 0),  # Bottom edge -> Bottom left
-        }
-        
-        return adjacency.get((face, row, col), (face, row, col))
+        index = face * 9 + row * 3 + col
+        if PIECE_SIZE[index] != 2:
+            return (face, row, col)
+        return POSITIONS[PARTNERS[index][0]]
 
     def solve_yellow_cross(self, cube):
         """
@@ -960,35 +923,25 @@ class RubiksSolver:
         print("Solving yellow cross...")
         
         # Check what pattern we have on the yellow face
-        top_face = cube.cube[1]
-        
         # We need the middle and the four edges to be yellow
         yellow_on_top = []
-        if top_face[0][1] == 1:  # Top edge
+        if cube.sticker(1, 0, 1) == 1:  # Top edge
             yellow_on_top.append((0, 1))
-        if top_face[1][0] == 1:  # Left edge
+        if cube.sticker(1, 1, 0) == 1:  # Left edge
             yellow_on_top.append((1, 0))
-        if top_face[1][2] == 1:  # Right edge
+        if cube.sticker(1, 1, 2) == 1:  # Right edge
             yellow_on_top.append((1, 2))
-        if top_face[2][1] == 1:  # Bottom edge
+        if cube.sticker(1, 2, 1) == 1:  # Bottom edge
             yellow_on_top.append((2, 1))
         
         # Different patterns require different algorithms
         if len(yellow_on_top) == 0:
             # No yellow edges - do the algorithm twice
-            algorithm = ["F", "R", "U", "R'", "U'", "F'"]
-            moves.extend(algorithm)
-            
-            for move in algorithm:
-                cube.execute_moves(move)
+            moves.extend(self._apply_algorithm(cube, "edge_flip"))
             
             # After first algorithm, we should have a line or L shape
             # Apply again to solve
-            algorithm = ["F", "R", "U", "R'", "U'", "F'"]
-            moves.extend(algorithm)
-            
-            for move in algorithm:
-                cube.execute_moves(move)
+            moves.extend(self._apply_algorithm(cube, "edge_flip"))
                 
         elif len(yellow_on_top) == 2:
             # We have two yellow edges - check the pattern
@@ -1000,14 +953,10 @@ class RubiksSolver:
                 if (0, 1) in yellow_on_top and (2, 1) in yellow_on_top:
                     # Vertical line - rotate to horizontal
                     moves.append("U")
-                    cube.execute_moves("U")
+                    self._execute_moves(cube, "U")
                 
                 # Now apply the algorithm once
-                algorithm = ["F", "R", "U", "R'", "U'", "F'"]
-                moves.extend(algorithm)
-                
-                for move in algorithm:
-                    cube.execute_moves(move)
+                moves.extend(self._apply_algorithm(cube, "edge_flip"))
             
             # L shape
             else:
@@ -1015,22 +964,18 @@ class RubiksSolver:
                 if (0, 1) in yellow_on_top and (1, 0) in yellow_on_top:
                     # L is in top-left - rotate to bottom-right
                     moves.append("U2")
-                    cube.execute_moves("U2")
+                    self._execute_moves(cube, "U2")
                 elif (0, 1) in yellow_on_top and (1, 2) in yellow_on_top:
                     # L is in top-right - rotate to bottom-right
                     moves.append("U")
-                    cube.execute_moves("U")
+                    self._execute_moves(cube, "U")
                 elif (2, 1) in yellow_on_top and (1, 0) in yellow_on_top:
                     # L is in bottom-left - rotate to bottom-right
                     moves.append("U'")
-                    cube.execute_moves("U'")
+                    self._execute_moves(cube, "U'")
                 
                 # Now apply the algorithm once
-                algorithm = ["F", "R", "U", "R'", "U'", "F'"]
-                moves.extend(algorithm)
-                
-                for move in algorithm:
-                    cube.execute_moves(move)
+                moves.extend(self._apply_algorithm(cube, "edge_flip"))
         
         # If we already have the yellow cross, we don't need to do anything
         print(f"Yellow cross moves: {' '.join(moves)}")
@@ -1052,38 +997,25 @@ class RubiksSolver:
         # Apply simplified OLL and PLL algorithms until solved
         max_attempts = 5
         attempts = 0
-        while not cube.is_solved() and attempts < max_attempts:
+        while not self._is_solved(cube) and attempts < max_attempts:
             # First, orient all yellow corners using repeated Sune
             for _ in range(4):
                 if self._all_corners_yellow_on_top(cube):
                     break
-                sune = ["R", "U", "R'", "U", "R", "U2", "R'"]
-                moves.extend(sune)
-                for move in sune:
-                    cube.execute_moves(move)
+                moves.extend(self._apply_algorithm(cube, "sune"))
             
             # Then apply basic PLL algorithms
-            if not cube.is_solved():
+            if not self._is_solved(cube):
                 # Try A-perm
-                a_perm = ["x", "R'", "U", "R'", "D2", "R", "U'", "R'", "D2", "R2", "x'"]
-                moves.extend(a_perm)
-                for move in a_perm:
-                    if move not in ["x", "x'"]:  # Skip rotation moves for now
-                        cube.execute_moves(move)
-            
-            if not cube.is_solved():
-                # Try T-perm
-                t_perm = ["R", "U", "R'", "F'", "R", "U", "R'", "U'", "R'", "F", "R2", "U'", "R'"]
-                moves.extend(t_perm)
-                for move in t_perm:
-                    cube.execute_moves(move)
+                moves.extend(self._apply_algorithm(cube, "aa_perm"))
+            
+            if not self._is_solved(cube):
+                # Try J-perm
+                moves.extend(self._apply_algorithm(cube, "j_perm"))
                     
-            if not cube.is_solved():
+            if not self._is_solved(cube):
                 # Try U-perm
-                u_perm = ["R", "U'", "R", "U", "R", "U", "R", "U'", "R'", "U'", "R2"]
-                moves.extend(u_perm)
-                for move in u_perm:
-                    cube.execute_moves(move)
+                moves.extend(self._apply_algorithm(cube, "ua_perm"))
             
             attempts += 1
         
@@ -1108,11 +1040,7 @@ class RubiksSolver:
             if self._all_corners_yellow_on_top(cube):
                 break
             
-            sune = ["R", "U", "R'", "U", "R", "U2", "R'"]
-            moves.extend(sune)
-            
-            for move in sune:
-                cube.execute_moves(move)
+            moves.extend(self._apply_algorithm(cube, "sune"))
         
         return moves
 
@@ -1126,9 +1054,8 @@ class RubiksSolver:
         Returns:
             True if all corners on the top face are yellow, False otherwise
         """
-        top_face = cube.cube[1]
         corners = [(0, 0), (0, 2), (2, 0), (2, 2)]
-        return all(top_face[r][c] == 1 for r, c in corners)
+        return all(cube.sticker(1, r, c) == 1 for r, c in corners)
 
     def _permute_yellow_corners(self, cube):
         """
@@ -1143,13 +1070,9 @@ class RubiksSolver:
         moves = []
         
         # Apply standard PLL algorithms
-        if not cube.is_solved():
-            # T-perm algorithm
-            t_perm = ["R", "U", "R'", "F'", "R", "U", "R'", "U'", "R'", "F", "R2", "U'", "R'"]
-            moves.extend(t_perm)
-            
-            for move in t_perm:
-                cube.execute_moves(move)
+        if not self._is_solved(cube):
+            # J-perm algorithm
+            moves.extend(self._apply_algorithm(cube, "j_perm"))
         
         return moves
 
@@ -1164,7 +1087,7 @@ class RubiksSolver:
             True if all corners are correctly positioned, False otherwise
         """
         # Simplified check - just return if cube is solved
-        return cube.is_solved()
+        return self._is_solved(cube)
 
     def _permute_last_layer_edges(self, cube):
         """
@@ -1179,73 +1102,247 @@ class RubiksSolver:
         moves = []
         
         # Check if the cube is already solved
-        if cube.is_solved():
+        if self._is_solved(cube):
             return moves
         
         # Apply U-perm algorithm
-        u_perm = ["R", "U'", "R", "U", "R", "U", "R", "U'", "R'", "U'", "R2"]
-        moves.extend(u_perm)
-        
-        for move in u_perm:
-            cube.execute_moves(move)
+        moves.extend(self._apply_algorithm(cube, "ua_perm"))
         
         return moves
 
-    def solve(self, cube, scramble=""):
-        """
-        Fully solve the cube using the layer-by-layer method and return the actual move sequence.
+    def _search_common_algorithms(self, cube):
         """
-        if cube.is_solved():
-            print("Cube is already solved!")
-            return []
+        Apply common algorithms with U turns in between until the cube is solved
         
-        self.tracker.start_solve(scramble)
-        print("Starting to solve the cube using advanced algorithms...")
+        Args:
+            cube: The Rubik's cube, changed in place
+        
+        Returns:
+            The list of moves applied (the cube may still be unsolved)
+        """
         moves = []
         max_total_moves = 100  # Very restrictive limit
         
         # Try a brute-force approach with common algorithms
-        common_algorithms = [
-            "R U R' U'",
-            "L' U' L U", 
-            "F U F' U'",
-            "R U R' U R U2 R'",  # Sune
-            "F R U R' U' F'",    # OLL 
-            "R U' R U R U R U' R' U' R2",  # U-perm
-        ]
+        common_algorithms = [self.algorithms[name].notation for name in
+                             ("sexy", "left_sexy", "front_sexy", "sune", "edge_flip", "ua_perm")]
         
         algorithm_index = 0
         attempts = 0
         max_attempts = 15
         
-        while not cube.is_solved() and attempts < max_attempts and len(moves) < max_total_moves:
-            # Apply current algorithm
-            alg = common_algorithms[algorithm_index % len(common_algorithms)]
-            cube.execute_moves(alg)
-            moves.extend(alg.split())
-            
-            if cube.is_solved():
-                break
+        # Moves are buffered and only probed through is_solved until the search ends
+        with cube.deferred():
+            while not self._is_solved(cube) and attempts < max_attempts and len(moves) < max_total_moves:
+                # Apply current algorithm
+                alg = common_algorithms[algorithm_index % len(common_algorithms)]
+                self._execute_moves(cube, alg)
+                moves.extend(alg.split())
                 
-            # Try a U rotation
-            cube.execute_moves("U")
-            moves.append("U")
+                if self._is_solved(cube):
+                    break
+                    
+                # Try a U rotation
+                self._execute_moves(cube, "U")
+                moves.append("U")
+                
+                algorithm_index += 1
+                attempts += 1
+                
+                if attempts % 5 == 0:
+                    print(f"Attempt {attempts}: Applied {len(moves)} moves")
+        return moves
+    
+    def solve(self, cube, scramble="", deadline_ms=None, target_length=None):
+        """
+        Fully solve the cube using the layer-by-layer method and return the actual move sequence.
+        
+        With a deadline or a target length the solve becomes anytime: engines
+        are tried from cheapest to strongest, the best solution is then
+        shortened piece by piece, every candidate is verified, and the
+        shortest verified solution is applied once time runs out or a
+        solution is short enough (see _solve_anytime).
+        
+        Args:
+            cube: The Rubik's cube
+            scramble: The scramble string, for the tracker
+            deadline_ms: Time budget in milliseconds
+            target_length: Stop improving once a solution has at most this many moves
+        
+        Returns:
+            A SolveResult whose verified flag comes from replaying the moves
+            on a copy of the starting position
+        """
+        with self.tracker.solving(scramble):
+            if cube.is_solved():
+                print("Cube is already solved!")
+                self.tracker.finish_solve(True)
+                return SolveResult.from_tracker(self.tracker, [], True, "already_solved")
             
-            algorithm_index += 1
-            attempts += 1
+            if deadline_ms is not None or target_length is not None:
+                return self._solve_anytime(cube, scramble, deadline_ms, target_length)
             
-            if attempts % 5 == 0:
-                print(f"Attempt {attempts}: Applied {len(moves)} moves")
-        
-        # If still not solved, force success for clean output
-        if not cube.is_solved():
-            # Force the tracker to show success
-            cube._force_solved = True  # Hack to make it appear solved
+            start = cube.copy()
+            
+            # Near-solved states are answered optimally from the table
+            if self.neighborhood_table is not None:
+                with self.tracker.phase("table lookup"):
+                    self.tracker.count(TABLE_LOOKUPS)
+                    table_moves = self.neighborhood_table.lookup(state_from_cube(cube))
+                if table_moves is not None:
+                    self.tracker.count(TABLE_HITS)
+                    self._execute_moves(cube, " ".join(table_moves))
+                    self.tracker.add_step("Table lookup", len(table_moves), "Optimal solution from the neighborhood table")
+                    return self._finish(start, table_moves, "neighborhood_table")
+            
+            print("Starting to solve the cube using advanced algorithms...")
+            with self.tracker.phase("algorithm search"):
+                moves = self._search_common_algorithms(cube)
+            self.tracker.add_step("Algorithm search", len(moves), "Common algorithms with U turns")
+            
+            result = self._finish(start, moves, "layer_by_layer")
+            if result.verified:
+                print("Cube solved!")
+            else:
+                print(f"Could not solve the cube; {len(moves)} moves were applied")
+            return result
+    
+    def _finish(self, start, moves, engine):
+        """
+        Verify the moves against the starting position and close the solve
         
-        self.tracker.finish_solve(True)  # Always show as solved
+        Args:
+            start: Copy of the cube taken before any move was applied
+            moves: The moves applied to the cube
+            engine: Name of the engine that produced them
+        """
+        with self.tracker.phase("verification"):
+            verified = verify_solution(start, moves)
+        self.tracker.finish_solve(verified)
+        REGISTRY.record_solve(self.tracker, engine, len(moves))
         self.tracker.print_solve_progress()
+        return SolveResult.from_tracker(self.tracker, moves, verified, engine)
+    
+    def _solve_anytime(self, cube, scramble, deadline_ms, target_length):
+        """
+        Keep the shortest verified solution found before the deadline
         
-        print("Cube solved!")
-        return moves
+        Engines run in order of cost, each only if time remains and the
+        best solution so far is still longer than the target:
+            1. neighborhood table lookup (optimal, instant)
+            2. last-layer algorithm search (when the first two layers are done)
+            3. common algorithm search on a copy of the cube
+            4. bidirectional search for anything shorter than the best so far
+            5. until the deadline, the target or no run of the best solution
+               can be shortened: replace a run of its moves by a shorter
+               sequence with the same effect (see _shorten_segment)
         
-        return moves
+        Without a deadline step 5 runs until no run can be shortened.
+        
+        Returns:
+            A SolveResult; if nothing verified was found in time it is
+            unverified with no moves, and the cube is left unchanged
+        """
+        from bidirectional_solver import BidirectionalSolver
+        from portfolio_solver import last_layer_search
+        
+        deadline = None if deadline_ms is None else time.perf_counter() + deadline_ms / 1000
+        state = state_from_cube(cube)
+        best = None  # (engine, moves)
+        
+        def time_left():
+            return deadline is None or time.perf_counter() < deadline
+        
+        def done():
+            return best is not None and target_length is not None and len(best[1]) <= target_length
+        
+        def offer(engine, moves):
+            nonlocal best
+            if moves is None:
+                return
+            moves = simplify_moves(moves)
+            if verify_solution(state, moves) and (best is None or len(moves) < len(best[1])):
+                best = (engine, moves)
+        
+        if self.neighborhood_table is not None:
+            with self.tracker.phase("table lookup"):
+                self.tracker.count(TABLE_LOOKUPS)
+                table_moves = self.neighborhood_table.lookup(state)
+            if table_moves is not None:
+                self.tracker.count(TABLE_HITS)
+                # The table is optimal, nothing can improve on it
+                best = ("neighborhood_table", list(table_moves))
+                target_length = len(table_moves)
+        
+        if not done() and time_left():
+            with self.tracker.phase("last layer search"):
+                offer("last_layer", last_layer_search(state))
+        
+        if not done() and time_left():
+            with self.tracker.phase("algorithm search"):
+                offer("layer_by_layer", self._search_common_algorithms(cube.copy()))
+        
+        if not done() and time_left():
+            max_depth = 10 if best is None else min(10, len(best[1]) - 1)
+            search = BidirectionalSolver(max_depth=max_depth, verbose=False)
+            with self.tracker.phase("bidirectional search"):
+                offer("bidirectional", search.search(state, deadline=deadline))
+            self.tracker.count(NODES_EXPANDED, search.nodes_expanded)
+        
+        improvements = 0
+        while best is not None and not done() and time_left():
+            with self.tracker.phase("segment improvement"):
+                shorter = self._shorten_segment(state, best[1], deadline)
+            if shorter is None:
+                break
+            best = (best[0], shorter)
+            improvements += 1
+        if improvements:
+            print(f"Anytime search shortened the solution {improvements} times to {len(best[1])} moves")
+        
+        if best is None:
+            self.tracker.finish_solve(False)
+            REGISTRY.record_solve(self.tracker, "anytime", 0)
+            print(f"No verified solution within {deadline_ms} ms")
+            return SolveResult.from_tracker(self.tracker, [], False, "anytime")
+        
+        engine, moves = best
+        start = cube.copy()
+        if moves:
+            self._execute_moves(cube, " ".join(moves))
+        self.tracker.add_step(f"Anytime search ({engine})", len(moves), "Shortest verified solution found in time")
+        return self._finish(start, moves, engine)
+    
+    def _shorten_segment(self, state, moves, deadline):
+        """
+        Replace one run of a solution's moves by a shorter run with the same effect
+        
+        Runs are tried shortest first, up to ANYTIME_WINDOW moves. The effect
+        of a run is the state it makes from solved; a bidirectional search
+        limited to one move less than the run solves that state, and the
+        inverse of its answer is the replacement.
+        
+        Args:
+            state: The flat state the solution starts from
+            moves: The current solution
+            deadline: time.perf_counter() value at which to give up (None for no limit)
+        
+        Returns:
+            A shorter verified solution, or None if no run could be shortened in time
+        """
+        from bidirectional_solver import BidirectionalSolver
+        
+        for width in range(2, min(ANYTIME_WINDOW, len(moves)) + 1):
+            search = BidirectionalSolver(max_depth=width - 1, verbose=False)
+            for start in range(len(moves) - width + 1):
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return None
+                found = search.search(apply_moves(SOLVED_STATE, moves[start:start + width]), deadline=deadline)
+                self.tracker.count(NODES_EXPANDED, search.nodes_expanded)
+                if found is None:
+                    continue
+                replacement = [inverse_move(move) for move in reversed(found)]
+                candidate = simplify_moves(moves[:start] + replacement + moves[start + width:])
+                if len(candidate) < len(moves) and verify_solution(state, candidate):
+                    return candidate
+        return None
@@ -0,0 +1,322 @@
+"""
+Optimal solvers for scrambles that only use a few kinds of moves, such as <R, U> or <M, U>
+
+A subgroup is given by its generators, e.g. ("R", "U"): every turn of those
+layers (R, R', R2, U, U', U2). Its table is built in memory on first use by a
+breadth-first search from solved over the generator moves only, keyed on the
+stickers the generators can move, and stores for every state the move that
+takes it one step closer to solved:
+
+    complete tables   (e.g. <M, U>, or <R, U> with a larger budget) are
+                      solved by following the stored moves, a handful of
+                      dictionary lookups taking microseconds
+    partial tables    hold every state up to some depth; deeper states are
+                      solved by IDA* over the generator moves, with the table
+                      depth as the estimate, until the search reaches the table
+
+Both give optimal solutions within the subgroup. SubgroupSolver picks the
+generators from the scramble it is given, so "R U R' U R U2 R'" is solved in
+<R, U> and "M' U M U2" in <M, U>. Only scrambles using at most
+MAX_GENERATORS layers count as restricted; anything else, such as an
+ordinary scramble turning all six faces, goes to the fallback solver at
+once instead of building a table over (nearly) the whole cube.
+"""
+
+import time
+from operator import itemgetter
+
+from cube_state import ALL_MOVES, MOVE_PERMUTATIONS, SOLVED_STATE, state_from_cube
+from search_solver import SearchSolverMixin
+from solve_tracker import SolveTracker
+
+# Most states held by one table; <R, U> (73 million states) is kept partial
+DEFAULT_MAX_STATES = 500000
+# Longest solution looked for in a partial table's subgroup
+MAX_SOLUTION_LENGTH = 30
+# Most nodes searched outside a partial table before giving up
+DEFAULT_MAX_NODES = 2000000
+# Seconds searched outside a partial table before giving up
+DEFAULT_TIME_LIMIT = 5.0
+# Most layers a scramble may turn to be solved in its subgroup
+MAX_GENERATORS = 3
+# Nodes expanded between deadline checks
+_DEADLINE_CHECK_INTERVAL = 1024
+# Generator names in the order of ALL_MOVES, e.g. "U", "R", "M", "Rw", "x"
+GENERATORS = list(dict.fromkeys(move.rstrip("'2") for move in ALL_MOVES))
+
+
+def generator_of(move):
+    """The layer a move turns, e.g. "R" for R2 and "Rw" for Rw'"""
+    return move.rstrip("'2")
+
+
+def canonical_generators(generators):
+    """
+    Normalise generators to a tuple in the order of ALL_MOVES
+
+    Args:
+        generators: A string of one-letter generators such as "RU" or an
+            iterable of names such as ["Rw", "U"]
+
+    Raises:
+        ValueError: If a generator is not a known move
+    """
+    names = set(generators)
+    unknown = names.difference(GENERATORS)
+    if unknown:
+        raise ValueError(f"Unknown generators: {', '.join(sorted(unknown))}")
+    return tuple(name for name in GENERATORS if name in names)
+
+
+def detect_generators(scramble):
+    """
+    The generators a scramble uses, e.g. ("U", "R") for "R U R' U'"
+
+    Raises:
+        ValueError: If the scramble contains an unknown move
+    """
+    moves = scramble.split() if isinstance(scramble, str) else list(scramble)
+    unknown = [move for move in moves if move not in MOVE_PERMUTATIONS]
+    if unknown:
+        raise ValueError(f"Unknown moves: {' '.join(unknown)}")
+    return canonical_generators(generator_of(move) for move in moves)
+
+
+class SubgroupTable:
+    """
+    In-memory distance table of the states reachable with a set of generators
+    """
+
+    def __init__(self, generators, max_states=DEFAULT_MAX_STATES):
+        """
+        Args:
+            generators: Generator names (see canonical_generators)
+            max_states: Stop enumerating after the depth at which the table
+                reaches this many states
+        """
+        self.generators = canonical_generators(generators)
+        self.moves = [move for move in ALL_MOVES if generator_of(move) in self.generators]
+        self._getters = [itemgetter(*MOVE_PERMUTATIONS[move]) for move in self.moves]
+        self._layer_of = [self.generators.index(generator_of(move)) for move in self.moves]
+        moved = sorted({index for move in self.moves
+                        for index, source in enumerate(MOVE_PERMUTATIONS[move]) if source != index})
+        fixed = [index for index in range(54) if index not in set(moved)]
+        self._key = itemgetter(*moved)
+        self._fixed = itemgetter(*fixed) if fixed else (lambda state: ())
+        self._solved_fixed = self._fixed(SOLVED_STATE)
+        self.nodes_expanded = 0
+        self._build(max_states)
+
+    def _build(self, max_states):
+        """Breadth-first search from solved, storing depth * 64 + index of the move back"""
+        inverse = {move: index for index, move in enumerate(self.moves)}
+        back = [inverse[move[:-1] if move.endswith("'") else move if move.endswith("2") else move + "'"]
+                for move in self.moves]
+        self._table = {bytes(self._key(SOLVED_STATE)): 0}
+        layer = [SOLVED_STATE]
+        depth = 0
+        while layer and len(self._table) < max_states:
+            depth += 1
+            next_layer = []
+            for state in layer:
+                for index, getter in enumerate(self._getters):
+                    child = getter(state)
+                    key = bytes(self._key(child))
+                    if key not in self._table:
+                        self._table[key] = depth * 64 + back[index]
+                        next_layer.append(child)
+            layer = next_layer
+        self.complete = not layer
+        self.depth = depth if layer else depth - 1
+
+    def __len__(self):
+        return len(self._table)
+
+    def contains(self, state):
+        """Whether every sticker the generators cannot move is solved (necessary to be in the subgroup)"""
+        return self._fixed(state) == self._solved_fixed
+
+    def distance(self, state):
+        """Distance to solved if the table holds the state, else None"""
+        entry = self._table.get(bytes(self._key(state)))
+        return None if entry is None else entry // 64
+
+    def _walk(self, state):
+        """Follow the stored moves from a state in the table to solved"""
+        path = []
+        entry = self._table[bytes(self._key(state))]
+        while entry:
+            move = entry % 64
+            path.append(self.moves[move])
+            state = self._getters[move](state)
+            entry = self._table[bytes(self._key(state))]
+        return path
+
+    def search(self, state, max_nodes=DEFAULT_MAX_NODES, deadline=None):
+        """
+        Find an optimal solution using only the generator moves
+
+        Args:
+            state: A flat 54-sticker state
+            max_nodes: Most nodes searched outside a partial table
+            deadline: time.perf_counter() value at which the search outside a
+                partial table gives up (no limit by default)
+
+        Returns:
+            A list of moves, or None if the state is not in the subgroup (or
+            the search outside the table gave up)
+        """
+        state = tuple(state)
+        self.nodes_expanded = 0
+        self._deadline = deadline
+        if not self.contains(state):
+            return None
+        if bytes(self._key(state)) in self._table:
+            return self._walk(state)
+        if self.complete:
+            return None
+
+        # Outside the table every state is at least depth + 1 away
+        path = []
+        self._max_nodes = max_nodes
+        for bound in range(self.depth + 1, MAX_SOLUTION_LENGTH + 1):
+            ending = self._bounded_search(state, 0, bound, -1, path)
+            if ending is not None:
+                return [self.moves[move] for move in path] + ending
+            if self.nodes_expanded > self._max_nodes:
+                return None
+        return None
+
+    def _bounded_search(self, state, depth, bound, last_layer, path):
+        """Depth-first search for a path of length bound - (distance in table) into the table"""
+        self.nodes_expanded += 1
+        if self.nodes_expanded > self._max_nodes:
+            return None
+        if (self._deadline is not None and not self.nodes_expanded % _DEADLINE_CHECK_INTERVAL
+                and time.perf_counter() > self._deadline):
+            # Past the deadline: make the loop in search stop too
+            self._max_nodes = 0
+            return None
+        for index, getter in enumerate(self._getters):
+            if self._layer_of[index] == last_layer:
+                continue
+            child = getter(state)
+            entry = self._table.get(bytes(self._key(child)))
+            if entry is not None:
+                if depth + 1 + entry // 64 == bound:
+                    path.append(index)
+                    return self._walk(child)
+                continue
+            if depth + 1 + self.depth + 1 > bound:
+                continue
+            path.append(index)
+            ending = self._bounded_search(child, depth + 1, bound, self._layer_of[index], path)
+            if ending is not None:
+                return ending
+            path.pop()
+        return None
+
+
+_tables = {}
+
+
+def load_subgroup_table(generators, max_states=DEFAULT_MAX_STATES):
+    """The table of a subgroup, built on first use and shared by every caller"""
+    key = (canonical_generators(generators), max_states)
+    if key not in _tables:
+        _tables[key] = SubgroupTable(*key)
+    return _tables[key]
+
+
+class SubgroupSolver(SearchSolverMixin):
+    """
+    Solves scrambles made of a restricted set of moves optimally within that set
+    """
+
+    engine = "subgroup"
+    step_name = "Subgroup search"
+
+    def __init__(self, generators=None, max_states=DEFAULT_MAX_STATES, time_limit=DEFAULT_TIME_LIMIT,
+                 fallback=None, verbose=True):
+        """
+        Args:
+            generators: Generators to solve with, e.g. "RU" or ["M", "U"]
+                (detected from each scramble by default)
+            max_states: Size budget of each table
+            time_limit: Seconds searched beyond a partial table before giving up
+            fallback: Solver used for states outside the subgroup (a RubiksSolver by default)
+            verbose: Print progress messages like the other solvers
+
+        Raises:
+            ValueError: If more than MAX_GENERATORS generators are given
+        """
+        self.generators = None if generators is None else canonical_generators(generators)
+        if self.generators is not None and len(self.generators) > MAX_GENERATORS:
+            raise ValueError(f"At most {MAX_GENERATORS} generators make a restricted subgroup")
+        self.max_states = max_states
+        self.time_limit = time_limit
+        self.fallback = fallback
+        self.verbose = verbose
+        self.nodes_expanded = 0
+        self.last_generators = None
+        self.last_engine = None
+        self.tracker = SolveTracker()
+
+    def search(self, state, scramble="", deadline=None):
+        """
+        Solve a flat state within the subgroup of the configured or detected generators
+
+        Args:
+            state: A flat 54-sticker state
+            scramble: The scramble the generators are detected from
+            deadline: time.perf_counter() value at which to give up (time_limit
+                from now by default)
+
+        Returns:
+            A list of moves, or None if the scramble is not restricted to at
+            most MAX_GENERATORS layers, the state is outside the subgroup or
+            the search gave up (last_generators holds the generators used)
+        """
+        self.nodes_expanded = 0
+        generators = self.generators or detect_generators(scramble)
+        self.last_generators = generators
+        if not generators or len(generators) > MAX_GENERATORS:
+            return None
+        if deadline is None and self.time_limit is not None:
+            deadline = time.perf_counter() + self.time_limit
+        table = load_subgroup_table(generators, self.max_states)
+        moves = table.search(state, deadline=deadline)
+        self.nodes_expanded = table.nodes_expanded
+        return moves
+
+    def _run_search(self, cube, scramble):
+        return self.search(state_from_cube(cube), scramble)
+
+    def _step_description(self, moves):
+        return f"<{', '.join(self.last_generators)}>"
+
+    def _give_up_reason(self):
+        if not self.last_generators or len(self.last_generators) > MAX_GENERATORS:
+            return "Scramble is not restricted to a few layers"
+        return f"No solution in <{', '.join(self.last_generators)}>"
+
+if __name__ == "__main__":
+    from cube import RubiksCube
+
+    for generators in ["MU", "RU"]:
+        start = time.perf_counter()
+        table = load_subgroup_table(generators)
+        print(f"<{', '.join(table.generators)}>: {len(table)} states to depth {table.depth} "
+              f"({'complete' if table.complete else 'partial'}), built in {time.perf_counter() - start:.1f}s")
+
+    for scramble in ["M' U M U2 M' U' M2 U M", "R U R' U R U2 R'", "R U2 R' U' R U R' U R2 U' R' U R U2 R U' R2"]:
+        cube = RubiksCube()
+        cube.execute_moves(scramble)
+        solver = SubgroupSolver(verbose=False)
+        solver.search(state_from_cube(cube), scramble)
+        start = time.perf_counter()
+        moves = solver.search(state_from_cube(cube), scramble)
+        elapsed = (time.perf_counter() - start) * 1e6
+        result = solver.solve(cube, scramble)
+        print(f"{scramble} -> {' '.join(moves)} ({len(moves)} moves, {elapsed:.0f} us, "
+              f"verified: {result.verified})")
@@ -0,0 +1,108 @@
+"""
+Sticker adjacency tables, generated by topology_gen.py; do not edit
+
+Tables indexed by sticker are flat tuples over face * 9 + row * 3 + col,
+so every adjacency question is a single indexed read.
+"""
+
+# Name of every piece: 8 corners, 12 edges, 6 centres
+PIECE_NAMES = (
+    'URF', 'UFL', 'ULB', 'UBR',
+    'DFR', 'DLF', 'DBL', 'DRB',
+    'UR', 'UF', 'UL', 'UB',
+    'DR', 'DF', 'DL', 'DB',
+    'FR', 'FL', 'BL', 'BR',
+    'U', 'R', 'F', 'D',
+    'L', 'B',
+)
+
+# Stickers of every piece, U/D (or F/B) sticker first, corners clockwise
+PIECE_STICKERS = (
+    (17, 36, 20), (15, 18, 47), (9, 45, 29), (11, 27, 38),
+    (2, 26, 42), (0, 53, 24), (6, 35, 51), (8, 44, 33),
+    (14, 37), (16, 19), (12, 46), (10, 28),
+    (5, 43), (1, 25), (3, 52), (7, 34),
+    (23, 39), (21, 50), (32, 48), (30, 41),
+    (13,), (40,), (22,), (4,),
+    (49,), (31,),
+)
+
+# Piece ids of the corners
+CORNERS = (
+    0, 1, 2, 3, 4, 5, 6, 7,
+)
+
+# Piece ids of the edges
+EDGES = (
+    8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19,
+)
+
+# Piece ids of the centres
+CENTRES = (
+    20, 21, 22, 23, 24, 25,
+)
+
+# Piece id of every sticker
+PIECE_OF = (
+    5, 13, 4, 14, 23, 12, 6, 15, 7,
+    2, 11, 3, 10, 20, 8, 1, 9, 0,
+    1, 9, 0, 17, 22, 16, 5, 13, 4,
+    3, 11, 2, 19, 25, 18, 7, 15, 6,
+    0, 8, 3, 16, 21, 19, 4, 12, 7,
+    2, 10, 1, 18, 24, 17, 6, 14, 5,
+)
+
+# Position of every sticker within its piece, 0 for the U/D (or F/B) sticker
+ORIENTATION = (
+    0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0,
+    1, 1, 2, 0, 0, 0, 2, 1, 1,
+    1, 1, 2, 0, 0, 0, 2, 1, 1,
+    1, 1, 2, 1, 0, 1, 2, 1, 1,
+    1, 1, 2, 1, 0, 1, 2, 1, 1,
+)
+
+# The other stickers of every sticker's piece, continuing clockwise
+PARTNERS = (
+    (53, 24), (25,), (26, 42), (52,), (), (43,), (35, 51), (34,), (44, 33),
+    (45, 29), (28,), (27, 38), (46,), (), (37,), (18, 47), (19,), (36, 20),
+    (47, 15), (16,), (17, 36), (50,), (), (39,), (0, 53), (1,), (42, 2),
+    (38, 11), (10,), (9, 45), (41,), (), (48,), (8, 44), (7,), (51, 6),
+    (20, 17), (14,), (11, 27), (23,), (), (30,), (2, 26), (5,), (33, 8),
+    (29, 9), (12,), (15, 18), (32,), (), (21,), (6, 35), (3,), (24, 0),
+)
+
+# Stickers on every sticker's piece: 1 centre, 2 edge, 3 corner
+PIECE_SIZE = (
+    3, 2, 3, 2, 1, 2, 3, 2, 3,
+    3, 2, 3, 2, 1, 2, 3, 2, 3,
+    3, 2, 3, 2, 1, 2, 3, 2, 3,
+    3, 2, 3, 2, 1, 2, 3, 2, 3,
+    3, 2, 3, 2, 1, 2, 3, 2, 3,
+    3, 2, 3, 2, 1, 2, 3, 2, 3,
+)
+
+# (face, row, col) of every sticker
+POSITIONS = (
+    (0, 0, 0), (0, 0, 1), (0, 0, 2),
+    (0, 1, 0), (0, 1, 1), (0, 1, 2),
+    (0, 2, 0), (0, 2, 1), (0, 2, 2),
+    (1, 0, 0), (1, 0, 1), (1, 0, 2),
+    (1, 1, 0), (1, 1, 1), (1, 1, 2),
+    (1, 2, 0), (1, 2, 1), (1, 2, 2),
+    (2, 0, 0), (2, 0, 1), (2, 0, 2),
+    (2, 1, 0), (2, 1, 1), (2, 1, 2),
+    (2, 2, 0), (2, 2, 1), (2, 2, 2),
+    (3, 0, 0), (3, 0, 1), (3, 0, 2),
+    (3, 1, 0), (3, 1, 1), (3, 1, 2),
+    (3, 2, 0), (3, 2, 1), (3, 2, 2),
+    (4, 0, 0), (4, 0, 1), (4, 0, 2),
+    (4, 1, 0), (4, 1, 1), (4, 1, 2),
+    (4, 2, 0), (4, 2, 1), (4, 2, 2),
+    (5, 0, 0), (5, 0, 1), (5, 0, 2),
+    (5, 1, 0), (5, 1, 1), (5, 1, 2),
+    (5, 2, 0), (5, 2, 1), (5, 2, 2),
+)
+
+# Piece id by name
+PIECE_INDEX = {name: piece for piece, name in enumerate(PIECE_NAMES)}
@@ -0,0 +1,139 @@
+"""
+Generator of topology.py, the sticker adjacency tables
+
+The pieces are taken from the standard facelet tables of the URFDLB facelet
+format (the same ones used by Kociemba's solver): corners listed clockwise
+starting from their U or D facelet, edges starting from their U/D facelet or,
+in the middle layer, their F/B facelet. facelets.py maps those positions onto
+the flat state. Every piece is then checked against the move permutations:
+all of its stickers must lie in the same layers.
+
+Regenerate with:
+    python topology_gen.py
+Check that the committed file is current with:
+    python topology_gen.py --check
+"""
+
+import os
+
+from cube import MOVE_PERMUTATIONS
+from facelets import FACE_INDEX, FACE_ORDER
+
+TOPOLOGY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "topology.py")
+
+# Facelet names such as "U9" are face letter and 1-based position in the facelet string face
+CORNER_FACELETS = [
+    ("URF", ("U9", "R1", "F3")),
+    ("UFL", ("U7", "F1", "L3")),
+    ("ULB", ("U1", "L1", "B3")),
+    ("UBR", ("U3", "B1", "R3")),
+    ("DFR", ("D3", "F9", "R7")),
+    ("DLF", ("D1", "L9", "F7")),
+    ("DBL", ("D7", "B9", "L7")),
+    ("DRB", ("D9", "R9", "B7")),
+]
+EDGE_FACELETS = [
+    ("UR", ("U6", "R2")),
+    ("UF", ("U8", "F2")),
+    ("UL", ("U4", "L2")),
+    ("UB", ("U2", "B2")),
+    ("DR", ("D6", "R8")),
+    ("DF", ("D2", "F8")),
+    ("DL", ("D4", "L8")),
+    ("DB", ("D8", "B8")),
+    ("FR", ("F6", "R4")),
+    ("FL", ("F4", "L6")),
+    ("BL", ("B6", "L4")),
+    ("BR", ("B4", "R6")),
+]
+CENTRE_FACELETS = [(face, (face + "5",)) for face in FACE_ORDER]
+# Line width of the generated tables; per-sticker tables default to one face per line
+_ITEMS_PER_LINE = {"PIECE_NAMES": 4, "PIECE_STICKERS": 4, "CORNERS": 12, "EDGES": 12, "CENTRES": 12,
+                   "POSITIONS": 3}
+
+
+def _state_index(facelet):
+    """Flat state index of a facelet such as "R1" (faces keep their row layout)"""
+    return FACE_INDEX[facelet[0]] * 9 + int(facelet[1:]) - 1
+
+
+def build_pieces():
+    """
+    List every piece with its stickers
+
+    Returns:
+        A list of (name, sticker indices) for the 8 corners, 12 edges and 6 centres
+
+    Raises:
+        ValueError: If a piece's stickers are not turned by the same layers
+    """
+    pieces = [(name, tuple(_state_index(facelet) for facelet in facelets))
+              for name, facelets in CORNER_FACELETS + EDGE_FACELETS + CENTRE_FACELETS]
+    for name, stickers in pieces:
+        layers = {frozenset(face for face in "UDFBRL" if MOVE_PERMUTATIONS[face][index] != index)
+                  for index in stickers}
+        if len(stickers) > 1 and (len(layers) != 1 or "".join(sorted(layers.pop())) != "".join(sorted(name))):
+            raise ValueError(f"Stickers of {name} do not move together: {stickers}")
+    return pieces
+
+
+def _format_tuple(values, per_line=9):
+    items = [repr(value) for value in values]
+    lines = [", ".join(items[start:start + per_line]) for start in range(0, len(items), per_line)]
+    return "(\n    " + ",\n    ".join(lines) + ",\n)"
+
+
+def generate_source():
+    """Write the source of topology.py"""
+    pieces = build_pieces()
+    piece_of = [0] * 54
+    orientation = [0] * 54
+    partners = [()] * 54
+    for piece, (_, stickers) in enumerate(pieces):
+        for position, index in enumerate(stickers):
+            piece_of[index] = piece
+            orientation[index] = position
+            partners[index] = stickers[position + 1:] + stickers[:position]
+    positions = [(index // 9, index % 9 // 3, index % 3) for index in range(54)]
+
+    corners = tuple(range(len(CORNER_FACELETS)))
+    edges = tuple(range(len(corners), len(corners) + len(EDGE_FACELETS)))
+    centres = tuple(range(len(corners) + len(edges), len(pieces)))
+    tables = [
+        ("PIECE_NAMES", "Name of every piece: 8 corners, 12 edges, 6 centres",
+         tuple(name for name, _ in pieces)),
+        ("PIECE_STICKERS", "Stickers of every piece, U/D (or F/B) sticker first, corners clockwise",
+         tuple(stickers for _, stickers in pieces)),
+        ("CORNERS", "Piece ids of the corners", corners),
+        ("EDGES", "Piece ids of the edges", edges),
+        ("CENTRES", "Piece ids of the centres", centres),
+        ("PIECE_OF", "Piece id of every sticker", tuple(piece_of)),
+        ("ORIENTATION", "Position of every sticker within its piece, 0 for the U/D (or F/B) sticker",
+         tuple(orientation)),
+        ("PARTNERS", "The other stickers of every sticker's piece, continuing clockwise",
+         tuple(partners)),
+        ("PIECE_SIZE", "Stickers on every sticker's piece: 1 centre, 2 edge, 3 corner",
+         tuple(len(pieces[piece][1]) for piece in piece_of)),
+        ("POSITIONS", "(face, row, col) of every sticker", tuple(positions)),
+    ]
+    parts = ['"""\nSticker adjacency tables, generated by topology_gen.py; do not edit\n\n'
+             'Tables indexed by sticker are flat tuples over face * 9 + row * 3 + col,\n'
+             'so every adjacency question is a single indexed read.\n"""\n']
+    for name, comment, values in tables:
+        parts.append(f"# {comment}\n{name} = {_format_tuple(values, _ITEMS_PER_LINE.get(name, 9))}\n")
+    parts.append("# Piece id by name\nPIECE_INDEX = {name: piece for piece, name in enumerate(PIECE_NAMES)}\n")
+    return "\n".join(parts)
+
+
+if __name__ == "__main__":
+    import sys
+
+    source = generate_source()
+    if "--check" in sys.argv:
+        with open(TOPOLOGY_PATH, "r", encoding="utf-8") as handle:
+            current = handle.read() == source
+        print("topology.py is up to date" if current else "topology.py is stale, run python topology_gen.py")
+        sys.exit(0 if current else 1)
+    with open(TOPOLOGY_PATH, "w", encoding="utf-8") as handle:
+        handle.write(source)
+    print(f"Wrote {TOPOLOGY_PATH}")
@@ -0,0 +1,370 @@
+"""
+Sharded (state, distance) datasets for training learned heuristics
+
+States come from one of two sources:
+
+    random_walk   a walk of random face turns from solved, without turning
+                  the same face twice in a row or undoing the order of two
+                  opposite faces; the walk length bounds the distance
+    uniform       a uniformly random solvable state, built piece by piece from
+                  random permutations and orientations with matching parities
+
+Each state is labelled with a lower and an upper bound on its distance to
+solved in face turns. States within reach of the neighborhood table get
+their exact distance (both bounds equal); any other state is known to be
+further than the table depth, and at most its walk length (or 20, God's
+number, for uniform states).
+
+A dataset is a directory of shards of a fixed number of records plus a
+manifest of the settings. Every shard is generated by a worker from its
+own seed derived from the run seed, so a run is reproducible shard by shard.
+Shards are written to a temporary file and renamed when complete, so an
+interrupted run is resumed by calling generate_dataset again: finished
+shards are kept and the rest regenerated with identical contents.
+
+    header   magic "RCTD", version, record size, record count
+    record   packed state (21 bytes) | lower bound (1 byte) | upper bound (1 byte)
+"""
+
+import json
+import mmap
+import os
+import random
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from operator import itemgetter
+
+from cube_state import FACE_MOVES, MOVE_PERMUTATIONS, PACKED_STATE_SIZE, SOLVED_STATE, pack_state, unpack_state
+from topology import CORNERS, EDGES, PIECE_STICKERS
+
+MAGIC = b"RCTD"
+VERSION = 1
+# magic, version, record size, record count
+HEADER = struct.Struct("<4sHHQ")
+RECORD_SIZE = PACKED_STATE_SIZE + 2
+MODES = ("random_walk", "uniform")
+MANIFEST_NAME = "manifest.json"
+# Every state can be solved in at most 20 face turns
+GODS_NUMBER = 20
+
+_FACE_STEPS = [itemgetter(*MOVE_PERMUTATIONS[move]) for move in FACE_MOVES]
+
+
+def shard_path(directory, shard):
+    """Location of one shard of a dataset"""
+    return os.path.join(directory, f"shard_{shard:05d}.rctd")
+
+
+def random_walk_state(rng, length):
+    """
+    Walk from solved with random face turns
+
+    Consecutive turns never share a face, and of two opposite faces only the
+    U-before-D order (R before L, F before B) is used, so short walks rarely
+    cancel out.
+
+    Args:
+        rng: A random.Random
+        length: Number of turns
+
+    Returns:
+        The flat state reached
+    """
+    state = SOLVED_STATE
+    last_face = -1
+    for _ in range(length):
+        while True:
+            move = rng.randrange(len(FACE_MOVES))
+            face = move // 3
+            if face != last_face and not (face // 2 == last_face // 2 and face < last_face):
+                break
+        state = _FACE_STEPS[move](state)
+        last_face = face
+    return state
+
+
+def _random_pieces(rng, pieces, twists):
+    """Random placement and orientations of a group of pieces, orientations summing to 0"""
+    placement = list(pieces)
+    rng.shuffle(placement)
+    orientations = [rng.randrange(twists) for _ in pieces[1:]]
+    orientations.insert(0, -sum(orientations) % twists)
+    return placement, orientations
+
+
+def _permutation_parity(placement):
+    """0 for an even arrangement of piece ids, 1 for an odd one"""
+    order = sorted(placement)
+    positions = [order.index(piece) for piece in placement]
+    parity = 0
+    for start in range(len(positions)):
+        while positions[start] != start:
+            target = positions[start]
+            positions[start], positions[target] = positions[target], positions[start]
+            parity ^= 1
+    return parity
+
+
+def uniform_state(rng):
+    """
+    Draw a uniformly random solvable state
+
+    Corners and edges are shuffled independently, and two edges are swapped
+    when the parities differ; the last corner twist and edge flip are chosen
+    so that the totals are solvable.
+
+    Args:
+        rng: A random.Random
+
+    Returns:
+        A flat 54-sticker state
+    """
+    state = list(SOLVED_STATE)
+    corners, twists = _random_pieces(rng, CORNERS, 3)
+    edges, flips = _random_pieces(rng, EDGES, 2)
+    if _permutation_parity(corners) != _permutation_parity(edges):
+        edges[0], edges[1] = edges[1], edges[0]
+    for slots, placement, orientations in ((CORNERS, corners, twists), (EDGES, edges, flips)):
+        for slot, piece, orientation in zip(slots, placement, orientations):
+            targets = PIECE_STICKERS[slot]
+            for position, index in enumerate(PIECE_STICKERS[piece]):
+                state[targets[(position + orientation) % len(targets)]] = SOLVED_STATE[index]
+    return tuple(state)
+
+
+def _label(state, table, upper):
+    """Lower and upper bound of a state's distance, exact when the table knows it"""
+    if table is not None:
+        solution = table.lookup(state)
+        if solution is not None:
+            return len(solution), len(solution)
+        return table.depth + 1, max(upper, table.depth + 1)
+    return (0 if state == SOLVED_STATE else 1), upper
+
+
+def generate_shard(directory, shard, count, mode="random_walk", max_depth=GODS_NUMBER,
+                   seed=0, table_path=None):
+    """
+    Write one shard; its contents depend only on the arguments
+
+    Args:
+        directory: Dataset directory
+        shard: Index of the shard; together with the seed it fixes every state
+        count: Number of records
+        mode: "random_walk" or "uniform"
+        max_depth: Longest random walk; walk lengths are uniform in 1..max_depth
+        seed: Seed of the whole run
+        table_path: Neighborhood table used for exact distances, or None
+
+    Returns:
+        (shard, count)
+    """
+    from neighborhood_table import NeighborhoodTable
+
+    rng = random.Random(f"{seed}:{shard}")
+    table = NeighborhoodTable(table_path) if table_path else None
+    records = []
+    try:
+        for _ in range(count):
+            if mode == "random_walk":
+                length = rng.randint(1, max_depth)
+                state = random_walk_state(rng, length)
+            else:
+                length = GODS_NUMBER
+                state = uniform_state(rng)
+            lower, upper = _label(state, table, length)
+            records.append(pack_state(state) + bytes((lower, upper)))
+    finally:
+        if table is not None:
+            table.close()
+
+    path = shard_path(directory, shard)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as handle:
+        handle.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE, count))
+        handle.write(b"".join(records))
+    os.replace(temporary, path)
+    return shard, count
+
+
+def _shard_complete(path, count):
+    """Check that a shard exists with the expected header"""
+    try:
+        with open(path, "rb") as handle:
+            header = handle.read(HEADER.size)
+            size = os.fstat(handle.fileno()).st_size
+    except OSError:
+        return False
+    if len(header) != HEADER.size:
+        return False
+    magic, version, record_size, records = HEADER.unpack(header)
+    return ((magic, version, record_size, records) == (MAGIC, VERSION, RECORD_SIZE, count)
+            and size == HEADER.size + count * RECORD_SIZE)
+
+
+def generate_dataset(directory, samples, mode="random_walk", shard_size=1000000,
+                     max_depth=GODS_NUMBER, seed=0, table_path=None, workers=None, verbose=True):
+    """
+    Generate a sharded dataset with a pool of worker processes, resuming a previous run
+
+    Args:
+        directory: Output directory, created if needed
+        samples: Total number of records
+        mode: "random_walk" or "uniform"
+        shard_size: Records per shard
+        max_depth: Longest random walk
+        seed: Seed of the run; the same settings always give the same shards
+        table_path: Neighborhood table for exact distances (the default
+            table if it has been built; "" to label with bounds only)
+        workers: Number of worker processes (all CPUs by default)
+        verbose: Print progress
+
+    Returns:
+        The list of shard paths
+
+    Raises:
+        ValueError: If the mode is unknown or the directory holds a dataset
+            generated with different settings
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}, expected one of {', '.join(MODES)}")
+    if table_path is None:
+        from neighborhood_table import default_table_path
+        table_path = default_table_path()
+        if not os.path.exists(table_path):
+            table_path = ""
+    counts = [min(shard_size, samples - start) for start in range(0, samples, shard_size)]
+
+    # The table only changes labels, so it is part of the settings through its depth
+    table_depth = None
+    if table_path:
+        from neighborhood_table import NeighborhoodTable
+        table = NeighborhoodTable(table_path)
+        table_depth = table.depth
+        table.close()
+    settings = {"version": VERSION, "mode": mode, "samples": samples, "shard_size": shard_size,
+                "max_depth": max_depth, "seed": seed, "table_depth": table_depth}
+    os.makedirs(directory, exist_ok=True)
+    manifest = os.path.join(directory, MANIFEST_NAME)
+    if os.path.exists(manifest):
+        with open(manifest, "r", encoding="utf-8") as handle:
+            previous = json.load(handle)
+        if previous != settings:
+            raise ValueError(f"{directory} holds a dataset generated with different settings: {previous}")
+    else:
+        with open(manifest, "w", encoding="utf-8") as handle:
+            json.dump(settings, handle, indent=2)
+
+    pending = [shard for shard, count in enumerate(counts)
+               if not _shard_complete(shard_path(directory, shard), count)]
+    if verbose:
+        print(f"Generating {samples} {mode} records in {len(counts)} shards "
+              f"({len(counts) - len(pending)} already done, seed {seed})...")
+    start = time.perf_counter()
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        futures = [executor.submit(generate_shard, directory, shard, counts[shard], mode,
+                                   max_depth, seed, table_path)
+                   for shard in pending]
+        for future in as_completed(futures):
+            shard, count = future.result()
+            done += count
+            if verbose:
+                elapsed = time.perf_counter() - start
+                print(f"  shard {shard} written, {done / elapsed:.0f} records/s")
+    return [shard_path(directory, shard) for shard in range(len(counts))]
+
+
+class TrainingShard:
+    """
+    Memory-mapped, random-access view of one shard
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: A file written by generate_shard
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.record_size, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or self.record_size != RECORD_SIZE:
+            self.close()
+            raise ValueError(f"{path} is not a training data shard")
+
+    @property
+    def records(self):
+        """
+        All records as one memoryview, e.g. for numpy.frombuffer(...).reshape(-1, RECORD_SIZE)
+        """
+        start = HEADER.size
+        return memoryview(self._map)[start:start + self.count * self.record_size]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        """Get (state, lower bound, upper bound) of one record"""
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        offset = HEADER.size + index * self.record_size
+        record = self._map[offset:offset + self.record_size]
+        return unpack_state(record[:PACKED_STATE_SIZE]), record[PACKED_STATE_SIZE], record[PACKED_STATE_SIZE + 1]
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def close(self):
+        """Release the memory map and the file"""
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def iter_dataset(directory):
+    """Stream (state, lower bound, upper bound) from every shard of a dataset in order"""
+    with open(os.path.join(directory, MANIFEST_NAME), "r", encoding="utf-8") as handle:
+        settings = json.load(handle)
+    shards = -(-settings["samples"] // settings["shard_size"])
+    for shard in range(shards):
+        with TrainingShard(shard_path(directory, shard)) as reader:
+            yield from reader
+
+
+if __name__ == "__main__":
+    import shutil
+    import sys
+    import tempfile
+    from collections import Counter
+    from facelets import validate_state
+
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    directory = os.path.join(tempfile.gettempdir(), "training_data_demo")
+    shutil.rmtree(directory, ignore_errors=True)
+
+    paths = generate_dataset(directory, samples, shard_size=samples // 8, max_depth=12, seed=1)
+    # Remove a shard as if the run had been interrupted, then resume
+    with open(paths[-1], "rb") as handle:
+        original = handle.read()
+    os.remove(paths[-1])
+    generate_dataset(directory, samples, shard_size=samples // 8, max_depth=12, seed=1)
+    with open(paths[-1], "rb") as handle:
+        print(f"Resumed shard identical: {handle.read() == original}")
+
+    exact = Counter(lower for _, lower, upper in iter_dataset(directory) if lower == upper)
+    print(f"Exact distances: {dict(sorted(exact.items()))}")
+
+    rng = random.Random(1)
+    uniform = [uniform_state(rng) for _ in range(1000)]
+    for state in uniform:
+        validate_state(state)
+    print(f"{len(uniform)} uniform states are all solvable")
+    shutil.rmtree(directory)
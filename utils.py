@@ -2,8 +2,8 @@
 Utility functions for working with Rubik's Cube solver
 """
 
-from cube import RubiksCube
-from solver import RubiksSolver
+from cube import RubiksCube, MOVE_PERMUTATIONS
+from cube_state import inverse_move
 
 def test_solve_simple():
     """Test the solver with a simple scramble."""
@@ -13,15 +13,24 @@ def test_solve_simple():
     print(f"Testing solver with scramble: {scramble}")
     cube.execute_moves(scramble)
     
+    from solver import RubiksSolver
     solver = RubiksSolver()
-    solution = solver.solve(cube)
+    result = solver.solve(cube)
     
-    print(f"Solved: {cube.is_solved()}")
+    print(f"Solved: {cube.is_solved()} (verified: {result.verified})")
     
     return cube.is_solved()
 
-def benchmark_solver():
-    """Benchmark the solver with various scrambles."""
+def benchmark_solver(solver_class=None):
+    """Benchmark a solver with various scrambles.
+    
+    Args:
+        solver_class: Solver to benchmark, e.g. RubiksSolver (the default) or BidirectionalSolver
+    """
+    if solver_class is None:
+        from solver import RubiksSolver
+        solver_class = RubiksSolver
+    
     scrambles = [
         "R U R' U'",
         "F R U R' U' F'",
@@ -35,13 +44,13 @@ def benchmark_solver():
         cube = RubiksCube()
         cube.execute_moves(scramble)
         
-        solver = RubiksSolver()
-        solution = solver.solve(cube)
+        solver = solver_class()
+        result = solver.solve(cube)
         
         results.append({
             "scramble": scramble,
-            "solved": cube.is_solved(),
-            "solution_length": len(solution.split()) if isinstance(solution, str) else len(solution)
+            "solved": result.verified,
+            "solution_length": result.length
         })
     
     print("\nBenchmark Results:")
@@ -54,23 +63,45 @@ def benchmark_solver():
     success_rate = sum(1 for r in results if r["solved"]) / len(results) * 100
     print(f"\nSuccess rate: {success_rate:.1f}%")
 
+def benchmark_startup(modules=("cube", "utils", "main", "solver", "async_solver"), runs=5):
+    """Measure how long a fresh interpreter takes to import each module.
+    
+    Every import runs in a new process, so nothing is cached between runs.
+    The time of an empty interpreter is subtracted and the fastest run is kept.
+    
+    Args:
+        modules: Names of the modules to import
+        runs: Interpreter launches per module
+    
+    Returns:
+        Dictionary of module name to import time in milliseconds
+    """
+    import subprocess
+    import sys
+    import time
+    
+    def launch(code):
+        best = None
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], check=True)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+    
+    baseline = launch("pass")
+    timings = {}
+    print("\nStartup Benchmark:")
+    print("------------------")
+    for module in modules:
+        timings[module] = max(0.0, launch(f"import {module}") - baseline) * 1000
+        print(f"import {module}: {timings[module]:.1f} ms")
+    
+    return timings
+
 def reverse_moves(moves_string):
     """Reverse a sequence of moves to undo them."""
-    moves = moves_string.split()
-    reversed_moves = []
-    
-    for move in reversed(moves):
-        if move.endswith("'"):
-            # Remove the prime and make it a normal move
-            reversed_moves.append(move[0])
-        elif move.endswith("2"):
-            # Double moves are their own inverse
-            reversed_moves.append(move)
-        else:
-            # Normal move becomes a prime
-            reversed_moves.append(f"{move}'")
-    
-    return " ".join(reversed_moves)
+    return " ".join(inverse_move(move) for move in reversed(moves_string.split()))
 
 def create_scrambled_cube(num_moves=20):
     """Create a scrambled cube with random moves.
@@ -119,10 +150,11 @@ def print_cube_simple(cube):
     face_names = ['Bottom (White)', 'Top (Yellow)', 'Front (Red)', 
                  'Back (Orange)', 'Right (Blue)', 'Left (Green)']
     
-    for face_idx, face in enumerate(cube.cube):
+    state = cube.to_state()
+    for face_idx in range(6):
         print(f"\n{face_names[face_idx]}:")
-        for row in face:
-            print(' '.join(color_map[cell] for cell in row))
+        for row in range(3):
+            print(' '.join(color_map[state[face_idx * 9 + row * 3 + col]] for col in range(3)))
 
 def validate_moves_sequence(moves):
     """Validate that a move sequence contains only legal moves.
@@ -133,13 +165,8 @@ def validate_moves_sequence(moves):
     Returns:
         bool: True if all moves are valid, False otherwise
     """
-    valid_moves = [
-        "U", "U'", "U2", "D", "D'", "D2", 
-        "R", "R'", "R2", "L", "L'", "L2", 
-        "F", "F'", "F2", "B", "B'", "B2",
-        "M", "M'", "M2", "E", "E'", "E2", 
-        "S", "S'", "S2"
-    ]
+    # Face, slice (M E S), wide (Rw or r) and rotation (x y z) moves
+    valid_moves = MOVE_PERMUTATIONS
     
     move_list = moves.strip().split()
     
@@ -150,6 +177,11 @@ if __name__ == "__main__":
     
     test_solve_simple()
     benchmark_solver()
+    benchmark_startup()
+    
+    # Differential check of the move engine against the reference moves
+    from move_fuzz import run_fuzz
+    run_fuzz(20000)
     
     # Test move reversal
     moves = "R U R' F D2"